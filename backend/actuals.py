@@ -0,0 +1,242 @@
+import re
+import sys
+import time
+from datetime import date
+from pathlib import Path
+from typing import Optional, Tuple
+
+from sqlalchemy import update
+
+try:
+    from .constants import SPECIFIC_ARTICLES
+    from .database import SessionLocal
+    from .models import Article, Employee, PlanItem
+    from .plan_intervals import effective_between
+    from .rollup import refresh_daily_summary
+    from .stamplingslogg import (
+        ARTICLE_DESCRIPTION_COLUMN,
+        DATE_COLUMN,
+        EMPLOYEE_NUMBER_COLUMN,
+        QUANTITY_COLUMN,
+        get_watermark,
+        hash_file,
+        iter_log_chunks,
+        parse_decimal,
+        resolve_csv_path,
+        save_watermark,
+    )
+    from .throughput import THROUGHPUT_COLUMNS, ThroughputAggregator, apply_throughput
+except ImportError:
+    from constants import SPECIFIC_ARTICLES
+    from database import SessionLocal
+    from models import Article, Employee, PlanItem
+    from plan_intervals import effective_between
+    from rollup import refresh_daily_summary
+    from stamplingslogg import (
+        ARTICLE_DESCRIPTION_COLUMN,
+        DATE_COLUMN,
+        EMPLOYEE_NUMBER_COLUMN,
+        QUANTITY_COLUMN,
+        get_watermark,
+        hash_file,
+        iter_log_chunks,
+        parse_decimal,
+        resolve_csv_path,
+        save_watermark,
+    )
+    from throughput import THROUGHPUT_COLUMNS, ThroughputAggregator, apply_throughput
+
+WATERMARK_SOURCE = "stamplingslogg_actuals"
+SIDE_PATTERN = re.compile(r"\b(PSL|PSR|DSL|DSR|FDL/FDR|FDL|FDR)\b")
+VOLVO_SILL_PATTERN = re.compile(r"\bsill\b.*\b(LH|RH)\b", re.IGNORECASE)
+ACTUALS_COLUMNS = [EMPLOYEE_NUMBER_COLUMN, ARTICLE_DESCRIPTION_COLUMN, QUANTITY_COLUMN]
+
+
+def match_article_name(description: str) -> Optional[str]:
+    """Map a log `Artikelbenämning` such as "Limmad VW 380 PSL Facelift" to a planner article."""
+    text = " ".join(description.split())
+    upper_text = text.upper()
+
+    if "LAMBORGHINI" in upper_text:
+        name = "Lamborghiniplattor"
+    elif "AS200" in upper_text:
+        name = "AS200 Antenn"
+    elif "120-4" in upper_text:
+        name = "120-4 Antenn"
+    elif "BMW" in upper_text:
+        name = "BMW Emblem"
+    elif "VOLVO" in upper_text:
+        sill = VOLVO_SILL_PATTERN.search(text)
+        if sill:
+            name = f"Volvo Sill {sill.group(1).upper()}"
+        elif "SPLITTER" in upper_text:
+            name = "Volvo Frontsplitter"
+        else:
+            return None
+    else:
+        sides = SIDE_PATTERN.findall(upper_text)
+        # Cut pieces shared by both sides ("PSL/PSR") cannot be attributed to one article.
+        if len(sides) != 1 or re.search(r"\b(PSL/PSR|DSL/DSR)\b", upper_text):
+            return None
+        side = sides[0]
+        if "AU38" in upper_text:
+            name = f"AU38 {side}"
+        elif re.search(r"\bVW ?380\b|\bVW\b", upper_text):
+            name = f"VW Facelift {side}" if "FACELIFT" in upper_text else f"VW {side}"
+        else:
+            return None
+
+    return name if name in SPECIFIC_ARTICLES else None
+
+
+def aggregate_actuals(chunks):
+    """Sum `Antal` per (employee number, date, article) across all chunks."""
+    import pandas as pd
+
+    article_lookup = {}
+    partials = []
+    rows_read = 0
+    last_date = None
+    for chunk in chunks:
+        rows_read += len(chunk)
+        chunk_last_date = chunk[DATE_COLUMN].dropna().max()
+        if isinstance(chunk_last_date, str) and (last_date is None or chunk_last_date > last_date):
+            last_date = chunk_last_date
+        chunk = chunk.dropna(subset=[EMPLOYEE_NUMBER_COLUMN, ARTICLE_DESCRIPTION_COLUMN, DATE_COLUMN])
+        # Match each distinct description once; rows are then mapped with a dict lookup.
+        for description in chunk[ARTICLE_DESCRIPTION_COLUMN].unique():
+            if description not in article_lookup:
+                article_lookup[description] = match_article_name(description)
+
+        frame = pd.DataFrame({
+            "number": chunk[EMPLOYEE_NUMBER_COLUMN].str.strip(),
+            "date": chunk[DATE_COLUMN],
+            "article": chunk[ARTICLE_DESCRIPTION_COLUMN].map(article_lookup),
+            "quantity": parse_decimal(chunk[QUANTITY_COLUMN]),
+        }).dropna(subset=["article"])
+        if not frame.empty:
+            partials.append(frame.groupby(["number", "date", "article"], sort=False)["quantity"].sum())
+
+    if not partials:
+        totals = pd.Series(dtype=float, name="quantity")
+    else:
+        totals = pd.concat(partials).groupby(level=[0, 1, 2]).sum()
+    unmatched = sorted(description for description, name in article_lookup.items() if name is None)
+    if last_date is not None:
+        last_date = date.fromisoformat(last_date)
+    return totals, rows_read, last_date, unmatched
+
+
+def apply_actuals(db, totals) -> Tuple[int, int, int]:
+    """Write aggregated totals to `quantity_done` of plan items dated that day.
+
+    Returns (items updated, carried-forward totals, unplanned totals). A day
+    whose plan was carried forward from an earlier date has no item of its
+    own: writing the total onto the earlier item would overwrite that day's
+    count, so such totals are only counted, like totals with no plan at all."""
+    if totals.empty:
+        return 0, 0, 0
+
+    employee_ids = {number: employee_id for employee_id, number in db.query(Employee.id, Employee.number)}
+    article_ids = {name: article_id for article_id, name in db.query(Article.id, Article.name)}
+    quantities = {}
+    for (number, day, article_name), quantity in totals.items():
+        employee_id = employee_ids.get(number)
+        article_id = article_ids.get(article_name)
+        if employee_id is not None and article_id is not None:
+            quantities[(employee_id, date.fromisoformat(day), article_id)] = int(round(quantity))
+    unknown = len(totals) - len(quantities)
+    if not quantities:
+        return 0, 0, unknown
+
+    days_by_job = {}
+    for employee_id, day, article_id in quantities:
+        days_by_job.setdefault((employee_id, article_id), []).append(day)
+    dates = {day for _, day, _ in quantities}
+    candidates = db.query(
+        PlanItem.id, PlanItem.employee_id, PlanItem.date, PlanItem.valid_to, PlanItem.article_id
+    ).filter(
+        PlanItem.employee_id.in_({employee_id for employee_id, _, _ in quantities}),
+        effective_between(min(dates), max(dates)),
+        PlanItem.article_id.isnot(None),
+    ).order_by(PlanItem.id.asc())
+
+    # If the same article is planned twice on a day, the first item takes the total.
+    updates = {}
+    carried_forward = set()
+    for item_id, employee_id, item_date, valid_to, article_id in candidates:
+        key = (employee_id, item_date, article_id)
+        if key in quantities and key not in updates:
+            updates[key] = {"id": item_id, "quantity_done": quantities[key]}
+        for day in days_by_job.get((employee_id, article_id), ()):
+            if item_date < day <= valid_to:
+                carried_forward.add((employee_id, day, article_id))
+
+    if updates:
+        db.execute(update(PlanItem), list(updates.values()))
+        refresh_daily_summary(db, {(employee_id, day) for employee_id, day, _ in updates})
+    carried_forward -= updates.keys()
+    unplanned = len(quantities) - len(updates) - len(carried_forward) + unknown
+    return len(updates), len(carried_forward), unplanned
+
+
+def import_actuals(db, source, since: date = None) -> dict:
+    started = time.perf_counter()
+    # The throughput index is fed from the same pass over the file.
+    throughput = ThroughputAggregator(match_article_name)
+    chunks = throughput.tap(iter_log_chunks(source, ACTUALS_COLUMNS + THROUGHPUT_COLUMNS, since))
+    totals, rows_read, last_date, unmatched = aggregate_actuals(chunks)
+    updated, carried_forward, unplanned = apply_actuals(db, totals)
+    throughput_rows = apply_throughput(db, throughput)
+    elapsed = time.perf_counter() - started
+    return {
+        "rows": rows_read,
+        "last_date": last_date,
+        "totals": len(totals),
+        "updated": updated,
+        "carried_forward_totals": carried_forward,
+        "unplanned_totals": unplanned,
+        "throughput_rows": throughput_rows,
+        "unmatched_articles": unmatched,
+        "seconds": round(elapsed, 3),
+    }
+
+
+def main():
+    csv_path = Path(sys.argv[1]) if len(sys.argv) > 1 else resolve_csv_path()
+    db = SessionLocal()
+    try:
+        file_hash = hash_file(csv_path)
+        watermark = get_watermark(db, WATERMARK_SOURCE)
+        if watermark is not None and watermark.file_hash == file_hash:
+            print(f"{csv_path.name} was already imported, nothing to do.")
+            return
+
+        # Totals are recomputed for whole days, so re-reading the watermark day is safe.
+        since = watermark.last_date if watermark is not None else None
+        summary = import_actuals(db, csv_path, since)
+        save_watermark(db, WATERMARK_SOURCE, file_hash, summary["last_date"], summary["rows"])
+        db.commit()
+        print(
+            f"Read {summary['rows']} rows, {summary['totals']} employee/day/article totals, "
+            f"updated {summary['updated']} plan items and {summary['throughput_rows']} throughput rows "
+            f"in {summary['seconds']}s "
+            f"({summary['rows'] / max(summary['seconds'], 1e-9):.0f} rows/s)."
+        )
+        if summary["carried_forward_totals"] or summary["unplanned_totals"]:
+            print(
+                f"Not written: {summary['carried_forward_totals']} totals on days whose plan was "
+                f"carried forward from an earlier date, {summary['unplanned_totals']} with no "
+                "plan item for that employee and article."
+            )
+        if summary["unmatched_articles"]:
+            print(
+                f"{len(summary['unmatched_articles'])} article descriptions "
+                "did not match a planner article."
+            )
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+import argparse
+import asyncio
+import logging
+import os
+import sqlite3
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+try:
+    from .database import BASE_DIR, BUSY_TIMEOUT_MS, DATABASE_PATH
+    from .metrics import metrics
+except ImportError:
+    from database import BASE_DIR, BUSY_TIMEOUT_MS, DATABASE_PATH
+    from metrics import metrics
+
+# Backups use SQLite's online backup API a few pages at a time, pausing between
+# steps, so displays keep reading and planners keep saving while it runs.
+BACKUP_DIR = Path(os.environ.get("PLANNER_BACKUP_DIR", BASE_DIR / "backups"))
+BACKUP_INTERVAL_MINUTES = float(os.environ.get("PLANNER_BACKUP_INTERVAL_MINUTES", 0))
+BACKUP_KEEP = int(os.environ.get("PLANNER_BACKUP_KEEP", 14))
+BACKUP_PAGES_PER_STEP = int(os.environ.get("PLANNER_BACKUP_PAGES_PER_STEP", 256))
+BACKUP_STEP_PAUSE_MS = float(os.environ.get("PLANNER_BACKUP_STEP_PAUSE_MS", 5))
+# integrity_check reads every index entry and is most of a backup's CPU time;
+# quick_check skips the index-to-table cross checks and is several times faster.
+BACKUP_CHECKS = {"integrity": "integrity_check", "quick": "quick_check"}
+BACKUP_CHECK = os.environ.get("PLANNER_BACKUP_CHECK", "integrity")
+if BACKUP_CHECK not in BACKUP_CHECKS:
+    raise ValueError(f"Unknown PLANNER_BACKUP_CHECK {BACKUP_CHECK!r}, expected one of {sorted(BACKUP_CHECKS)}")
+# Without WAL, a write by another connection restarts a stepped backup from
+# the first page; after this many restarts it is copied in one step.
+MAX_RESTARTS = 3
+BACKUP_PREFIX = "planner-"
+BACKUP_SUFFIX = ".db"
+
+logger = logging.getLogger("planner.backups")
+
+metrics.describe("planner_backups_total", "counter", "Database backups by result.")
+metrics.describe("planner_backup_duration_seconds", "histogram", "Time to copy and check one backup.")
+BACKUP_DURATION_BUCKETS = (0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+class BackupError(Exception):
+    pass
+
+
+@dataclass
+class BackupResult:
+    path: Path
+    size: int
+    pages: int
+    steps: int
+    restarts: int
+    seconds: float
+
+
+class RestartCounter:
+    """Progress callback that pauses between steps and notices restarts."""
+
+    def __init__(self, pause_seconds: float):
+        self.pause_seconds = pause_seconds
+        self.steps = 0
+        self.restarts = 0
+        self.pages = 0
+        self._remaining = None
+
+    def __call__(self, _status, remaining, total):
+        self.steps += 1
+        self.pages = total
+        if self._remaining is not None and remaining > self._remaining:
+            self.restarts += 1
+            if self.restarts > MAX_RESTARTS:
+                raise BackupError("restarted")
+        self._remaining = remaining
+        if remaining and self.pause_seconds:
+            time.sleep(self.pause_seconds)
+
+
+def connect(path: Path) -> sqlite3.Connection:
+    return sqlite3.connect(str(path), timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+
+
+def check_integrity(path: Path, check: str = BACKUP_CHECK) -> list:
+    """Problems the integrity or quick check reports for path; empty when it is sound."""
+    connection = sqlite3.connect(f"file:{path.as_posix()}?mode=ro", uri=True)
+    try:
+        problems = [row[0] for row in connection.execute(f"PRAGMA {BACKUP_CHECKS[check]}")]
+    except sqlite3.DatabaseError as exc:
+        problems = [str(exc)]
+    finally:
+        connection.close()
+    return [] if problems == ["ok"] else problems
+
+
+def copy_database(source: sqlite3.Connection, target: sqlite3.Connection,
+                  pages: int = BACKUP_PAGES_PER_STEP, pause_ms: float = BACKUP_STEP_PAUSE_MS) -> RestartCounter:
+    progress = RestartCounter(pause_ms / 1000)
+    wal = source.execute("PRAGMA journal_mode").fetchone()[0].lower() == "wal"
+    if wal:
+        # A read transaction held across the steps pins one WAL snapshot: the
+        # copy is consistent, never restarts, and writers are not blocked.
+        source.execute("BEGIN")
+        source.execute("SELECT 1 FROM sqlite_master LIMIT 1")
+    try:
+        source.backup(target, pages=pages, progress=progress)
+    except BackupError:
+        # Without WAL, steady writes kept restarting the stepped copy; finish in one step.
+        source.backup(target, pages=-1)
+        progress.steps += 1
+    finally:
+        if wal:
+            source.execute("COMMIT")
+    return progress
+
+
+def backup_path(directory: Path, moment: datetime) -> Path:
+    return directory / f"{BACKUP_PREFIX}{moment:%Y%m%d-%H%M%S}{BACKUP_SUFFIX}"
+
+
+def list_backups(directory: Path = BACKUP_DIR) -> list:
+    """Finished backups, newest first."""
+    if not directory.is_dir():
+        return []
+    return sorted(directory.glob(f"{BACKUP_PREFIX}*{BACKUP_SUFFIX}"), reverse=True)
+
+
+def rotate_backups(directory: Path = BACKUP_DIR, keep: int = BACKUP_KEEP) -> list:
+    removed = list_backups(directory)[keep:]
+    for path in removed:
+        path.unlink(missing_ok=True)
+    return removed
+
+
+def backup_database(database_path: Path = DATABASE_PATH, directory: Path = BACKUP_DIR,
+                    keep: Optional[int] = BACKUP_KEEP) -> BackupResult:
+    """Copy database_path to a new file in directory, check it and keep the
+    newest `keep` backups (all of them when keep is None).
+
+    The copy is written next to its final name and only renamed once the
+    integrity check passes, so every planner-*.db in directory is usable."""
+    directory.mkdir(parents=True, exist_ok=True)
+    started = time.perf_counter()
+    path = backup_path(directory, datetime.now())
+    partial = path.with_name(path.name + ".partial")
+    partial.unlink(missing_ok=True)
+
+    source, target = connect(database_path), connect(partial)
+    try:
+        progress = copy_database(source, target)
+        # The copy inherits WAL mode from its source; a backup should be one file.
+        target.execute("PRAGMA journal_mode=DELETE")
+    except sqlite3.Error:
+        metrics.increment("planner_backups_total", (("result", "error"),))
+        partial.unlink(missing_ok=True)
+        raise
+    finally:
+        target.close()
+        source.close()
+
+    problems = check_integrity(partial)
+    if problems:
+        metrics.increment("planner_backups_total", (("result", "corrupt"),))
+        partial.unlink(missing_ok=True)
+        raise BackupError(f"Integrity check of the backup failed: {problems[:5]}")
+    partial.replace(path)
+    if keep is not None:
+        rotate_backups(directory, keep)
+
+    seconds = time.perf_counter() - started
+    metrics.increment("planner_backups_total", (("result", "ok"),))
+    metrics.observe("planner_backup_duration_seconds", (), seconds, BACKUP_DURATION_BUCKETS)
+    result = BackupResult(path, path.stat().st_size, progress.pages, progress.steps, progress.restarts, seconds)
+    logger.info(
+        "Backed up %s to %s: %d pages in %d steps, %d restarts, %.2f s",
+        database_path, path.name, result.pages, result.steps, result.restarts, seconds,
+    )
+    return result
+
+
+def restore_backup(backup: Path, database_path: Path = DATABASE_PATH,
+                   directory: Path = BACKUP_DIR) -> Optional[BackupResult]:
+    """Replace database_path with backup after checking it.
+
+    The current database is backed up first (returned), so a restore can be
+    undone. Nothing is rotated: the backup being restored may be the oldest
+    one kept, and the next backup rotates as usual. Stop the backend before
+    restoring: running workers keep cached responses and reference data
+    from the replaced database."""
+    problems = check_integrity(backup, "integrity")
+    if problems:
+        raise BackupError(f"{backup} fails its integrity check: {problems[:5]}")
+    previous = backup_database(database_path, directory, keep=None) if database_path.exists() else None
+
+    source, target = connect(backup), connect(database_path)
+    try:
+        # Copying through the backup API rather than the file system keeps the
+        # target's WAL and journal consistent with the new contents.
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
+    return previous
+
+
+def newest_backup_age(directory: Path = BACKUP_DIR) -> Optional[float]:
+    backups = list_backups(directory)
+    return time.time() - backups[0].stat().st_mtime if backups else None
+
+
+class BackupScheduler:
+    """Backs up the database every interval from the running backend.
+
+    Each worker runs one; a worker skips its turn while another holds the
+    backup lock or when a backup from the last half interval already exists."""
+
+    def __init__(self, interval_minutes: float = BACKUP_INTERVAL_MINUTES):
+        self.interval_seconds = interval_minutes * 60
+
+    def due(self) -> bool:
+        age = newest_backup_age()
+        return age is None or age >= self.interval_seconds / 2
+
+    def run_once(self) -> Optional[BackupResult]:
+        lock = sqlite3.connect(str(BACKUP_DIR / ".backup-lock"), timeout=0, isolation_level=None)
+        try:
+            try:
+                lock.execute("BEGIN EXCLUSIVE")
+            except sqlite3.OperationalError:
+                return None  # another worker is backing up
+            return backup_database() if self.due() else None
+        finally:
+            lock.close()
+
+    async def run(self):
+        BACKUP_DIR.mkdir(parents=True, exist_ok=True)
+        while True:
+            try:
+                await asyncio.to_thread(self.run_once)
+            except (BackupError, OSError, sqlite3.Error) as exc:
+                logger.error("Scheduled backup failed: %s", exc)
+            await asyncio.sleep(self.interval_seconds)
+
+
+backup_scheduler = BackupScheduler()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Back up the planner database while it is in use, list or check backups, "
+        "or restore one.",
+    )
+    parser.add_argument("command", choices=("backup", "list", "check", "restore"))
+    parser.add_argument("backup", nargs="?", help="backup file to check or restore")
+    parser.add_argument("--database", default=str(DATABASE_PATH), help="SQLite file (default %(default)s)")
+    parser.add_argument("--directory", default=str(BACKUP_DIR), help="backup directory (default %(default)s)")
+    parser.add_argument("--keep", type=int, default=BACKUP_KEEP, help="backups to keep after a backup (default %(default)s)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    database_path, directory = Path(args.database), Path(args.directory)
+    if args.command in ("check", "restore") and not args.backup:
+        sys.exit(f"{args.command} needs a backup file.")
+
+    if args.command == "backup":
+        result = backup_database(database_path, directory, args.keep)
+        print(
+            f"Wrote {result.path} ({result.size / 1024 / 1024:.1f} MB, {result.pages} pages in "
+            f"{result.steps} steps, {result.restarts} restarts) in {result.seconds:.2f} s."
+        )
+    elif args.command == "list":
+        for path in list_backups(directory):
+            stat = path.stat()
+            print(f"{path.name}  {stat.st_size / 1024 / 1024:8.1f} MB  "
+                  f"{datetime.fromtimestamp(stat.st_mtime):%Y-%m-%d %H:%M:%S}")
+    elif args.command == "check":
+        problems = check_integrity(Path(args.backup), "integrity")
+        for problem in problems:
+            print(problem)
+        print(f"{args.backup}: {'ok' if not problems else f'{len(problems)} problems'}")
+        return 1 if problems else 0
+    else:
+        try:
+            previous = restore_backup(Path(args.backup), database_path, directory)
+        except BackupError as error:
+            sys.exit(f"Restore failed, database unchanged: {error}")
+        saved = f"; the replaced database was saved as {previous.path}" if previous else ""
+        print(f"Restored {database_path} from {args.backup}{saved}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
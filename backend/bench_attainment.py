@@ -0,0 +1,79 @@
+import argparse
+import statistics
+import time
+from datetime import date, timedelta
+
+try:
+    from .harness import app_client, scratch_database
+except ImportError:
+    from harness import app_client, scratch_database
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Compare /analytics/attainment (daily_summary rollup) against "
+        "resolving the effective plan from plan_items on a synthetic multi-year dataset.",
+    )
+    parser.add_argument("--employees", type=int, default=60)
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--change-rate", type=float, default=0.3,
+                        help="probability that an employee's plan changes on a weekday")
+    parser.add_argument("--repeat", type=int, default=20)
+    return parser.parse_args()
+
+
+def timed(function, repeat):
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        durations.append((time.perf_counter() - started) * 1000)
+    return statistics.median(durations)
+
+
+def main():
+    args = parse_args()
+    with scratch_database("planner-attainment-", response_cache_size=0):
+        with app_client() as client:
+            run_benchmark(args, client)
+
+
+def run_benchmark(args, client):
+    from backend.database import engine
+    from backend.rollup import build_summary_rows, load_plan_rows, rebuild_all
+    from backend.synthetic_data import generate
+
+    with engine.begin() as connection:
+        dataset = generate(connection, args.employees, args.years, args.change_rate)
+        started = time.perf_counter()
+        rebuild_all(connection)
+        rebuild_seconds = time.perf_counter() - started
+    print(f"Generated {dataset['plan_items']} plan items over {args.years} years.")
+    print(f"Full rollup rebuild: {rebuild_seconds:.2f} s")
+
+    range_end = date.today()
+    range_start = range_end - timedelta(days=365)
+
+    def from_rollup():
+        response = client.get(
+            f"/analytics/attainment?from={range_start}&to={range_end}&group_by=month"
+        )
+        response.raise_for_status()
+
+    def from_plan_items():
+        with engine.connect() as connection:
+            totals = {}
+            plan_rows = load_plan_rows(connection, range_start, range_end)
+            for row in build_summary_rows(plan_rows, range_start, range_end):
+                month = row["date"].strftime("%Y-%m")
+                goal, quantity_done = totals.get(month, (0, 0))
+                totals[month] = (goal + row["goal"], quantity_done + row["quantity_done"])
+
+    rollup_ms = timed(from_rollup, args.repeat)
+    raw_ms = timed(from_plan_items, args.repeat)
+    print(f"12 months by month, rollup endpoint: {rollup_ms:.1f} ms (median of {args.repeat})")
+    print(f"12 months by month, effective plan from plan_items: {raw_ms:.1f} ms (median of {args.repeat})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+import argparse
+import math
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from pathlib import Path
+
+try:
+    from .harness import app_client, planning_ids, scratch_database
+except ImportError:
+    from harness import app_client, planning_ids, scratch_database
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Measure online backups of a populated database and how much they slow "
+        "TV reads and planner writes running at the same time.",
+    )
+    parser.add_argument("--database", help="existing database to reuse; generated when empty")
+    parser.add_argument("--employees", type=int, default=500)
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--seconds", type=float, default=15.0, help="length of each phase")
+    parser.add_argument("--tv-displays", type=int, default=4)
+    parser.add_argument("--planners", type=int, default=2)
+    parser.add_argument("--poll-interval", type=float, default=0.05,
+                        help="seconds each client waits between requests")
+    return parser.parse_args()
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    rank = max(math.ceil(fraction * len(sorted_values)) - 1, 0)
+    return sorted_values[rank]
+
+
+def run_load(client, args, ids, seconds, during=None):
+    """Poll and save for `seconds`, calling `during(stop)` in another thread."""
+    durations = defaultdict(list)
+    errors = []
+    lock = threading.Lock()
+    stop = threading.Event()
+    today = date.today()
+
+    def timed(name, send):
+        started = time.perf_counter()
+        response = send()
+        elapsed = (time.perf_counter() - started) * 1000
+        with lock:
+            durations[name].append(elapsed)
+            if response.status_code >= 500:
+                errors.append(f"{name}: HTTP {response.status_code}")
+
+    def tv_display():
+        while not stop.is_set():
+            # Planner saves keep invalidating the response cache, so most polls query.
+            timed("GET /plan", lambda: client.get(f"/plan?target_date={today}"))
+            stop.wait(args.poll_interval)
+
+    def planner(seed):
+        rng = random.Random(seed)
+        while not stop.is_set():
+            timed("POST /plan", lambda: client.post("/plan", json={
+                "employee_id": rng.choice(ids.employees),
+                "article_id": rng.choice(ids.articles),
+                "machine_group_id": rng.choice(ids.machine_groups),
+                "goal": rng.randint(0, 200),
+                "date": str(today + timedelta(days=rng.randint(1, 30))),
+                "status": "planned",
+            }))
+            stop.wait(args.poll_interval)
+
+    threads = [threading.Thread(target=tv_display) for _ in range(args.tv_displays)]
+    threads += [threading.Thread(target=planner, args=(index,)) for index in range(args.planners)]
+    if during is not None:
+        threads.append(threading.Thread(target=during, args=(stop,)))
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return {name: sorted(values) for name, values in durations.items()}, errors
+
+
+def main():
+    args = parse_args()
+    # The synthetic dataset is written in bulk inserts that would be logged as slow SQL.
+    with scratch_database("planner-backup-", args.database, slow_query_ms=0) as database_path:
+        with tempfile.TemporaryDirectory(prefix="planner-backups-") as backup_dir:
+            return run_benchmark(args, database_path, Path(backup_dir))
+
+
+def run_benchmark(args, database_path: Path, backup_dir: Path):
+    from sqlalchemy import func, select
+
+    from backend import models
+    from backend.backups import backup_database
+    from backend.database import engine
+    from backend.main import initialize_database
+    from backend.synthetic_data import generate
+
+    initialize_database()
+    with engine.begin() as connection:
+        if not connection.execute(select(func.count()).select_from(models.PlanItem)).scalar():
+            generate(connection, args.employees, args.years, seed=0)
+    print(f"Database: {database_path} ({database_path.stat().st_size / 1024 / 1024:.1f} MB)")
+
+    backups = []
+
+    def back_up_repeatedly(stop):
+        while not stop.is_set():
+            backups.append(backup_database(database_path, backup_dir, keep=1))
+
+    with app_client() as client:
+        ids = planning_ids(client.get("/data").json())
+        baseline, baseline_errors = run_load(client, args, ids, args.seconds)
+        during, during_errors = run_load(client, args, ids, args.seconds, back_up_repeatedly)
+
+    print(f"{'endpoint':<12} {'phase':<8} {'requests':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for name in sorted(baseline):
+        for phase, durations in (("idle", baseline[name]), ("backup", during.get(name, []))):
+            if not durations:
+                continue
+            print(
+                f"{name:<12} {phase:<8} {len(durations):>8} {percentile(durations, 0.5):>8.2f} "
+                f"{percentile(durations, 0.95):>8.2f} {percentile(durations, 0.99):>8.2f} {durations[-1]:>8.2f}"
+            )
+    if backups:
+        seconds = sorted(backup.seconds for backup in backups)
+        print(
+            f"backups={len(backups)} median={percentile(seconds, 0.5):.2f} s max={seconds[-1]:.2f} s "
+            f"size={backups[-1].size / 1024 / 1024:.1f} MB restarts={sum(b.restarts for b in backups)}"
+        )
+    errors = baseline_errors + during_errors
+    print(f"errors={len(errors)}")
+    for error in errors[:10]:
+        print(f"  {error}")
+    return 1 if errors or not backups else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
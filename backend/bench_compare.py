@@ -0,0 +1,55 @@
+import argparse
+import json
+from pathlib import Path
+
+METRICS = ("throughput_rps", "p50_ms", "p95_ms", "p99_ms")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Compare two bench_load.py result files endpoint by endpoint.",
+    )
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    return parser.parse_args()
+
+
+def load(path):
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def describe(result):
+    config = result["config"]
+    return (
+        f"{result['timestamp']} commit={result['git_commit']} db_mode={config.get('db_mode', 'sync')} "
+        f"tv_displays={config['tv_displays']} planners={config['planners']}"
+    )
+
+
+def change(before, after):
+    if not before:
+        return ""
+    return f"{(after - before) / before:+.0%}"
+
+
+def main():
+    args = parse_args()
+    baseline, candidate = load(args.baseline), load(args.candidate)
+    print(f"baseline:  {describe(baseline)}")
+    print(f"candidate: {describe(candidate)}")
+    print(f"{'endpoint':<20} {'metric':<15} {'baseline':>10} {'candidate':>10} {'change':>8}")
+    for name in sorted(set(baseline["endpoints"]) | set(candidate["endpoints"])):
+        before = baseline["endpoints"].get(name)
+        after = candidate["endpoints"].get(name)
+        if before is None or after is None:
+            print(f"{name:<20} only in {'candidate' if before is None else 'baseline'}")
+            continue
+        for metric in METRICS:
+            print(
+                f"{name:<20} {metric:<15} {before[metric]:>10} {after[metric]:>10} "
+                f"{change(before[metric], after[metric]):>8}"
+            )
+
+
+if __name__ == "__main__":
+    main()
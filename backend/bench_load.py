@@ -0,0 +1,243 @@
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+try:
+    from .harness import ROOT_DIR, app_client, planning_ids, scratch_database
+except ImportError:
+    from harness import ROOT_DIR, app_client, planning_ids, scratch_database
+
+RESULTS_DIR = Path(__file__).resolve().parent / "bench_results"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Load the backend in-process with polling TV displays and writing "
+        "planners, and report latency percentiles and throughput per endpoint.",
+    )
+    parser.add_argument("--database", help="existing database to reuse; generated when empty")
+    parser.add_argument("--employees", type=int, default=500)
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tv-displays", type=int, default=8)
+    parser.add_argument("--planners", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=20.0)
+    parser.add_argument("--poll-interval", type=float, default=0.0,
+                        help="seconds each TV display waits between polls")
+    parser.add_argument("--db-mode", choices=["sync", "async"],
+                        default=os.environ.get("PLANNER_DB_MODE", "sync"))
+    parser.add_argument("--no-cache", action="store_true",
+                        help="disable the response cache and ETag revalidation")
+    parser.add_argument("--output", help="result file (default: backend/bench_results/load-<time>.json)")
+    return parser.parse_args()
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    rank = max(math.ceil(fraction * len(sorted_values)) - 1, 0)
+    return sorted_values[rank]
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.durations = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.errors = []
+
+    def call(self, name, send):
+        started = time.perf_counter()
+        try:
+            response = send()
+        except Exception as exc:
+            with self.lock:
+                self.errors.append(f"{name}: {exc}")
+            return None
+        elapsed = (time.perf_counter() - started) * 1000
+        with self.lock:
+            self.durations[name].append(elapsed)
+            self.statuses[name][response.status_code] += 1
+            if response.status_code >= 500:
+                self.errors.append(f"{name}: HTTP {response.status_code}")
+        return response
+
+    def summary(self, seconds):
+        endpoints = {}
+        for name in sorted(self.durations):
+            values = sorted(self.durations[name])
+            endpoints[name] = {
+                "requests": len(values),
+                "throughput_rps": round(len(values) / seconds, 1),
+                "p50_ms": round(percentile(values, 0.50), 2),
+                "p95_ms": round(percentile(values, 0.95), 2),
+                "p99_ms": round(percentile(values, 0.99), 2),
+                "max_ms": round(values[-1], 2),
+                "statuses": {str(code): count for code, count in sorted(self.statuses[name].items())},
+            }
+        return endpoints
+
+
+def main():
+    args = parse_args()
+    with scratch_database(
+        "planner-load-",
+        args.database,
+        db_mode=args.db_mode,
+        response_cache_size=0 if args.no_cache else None,
+    ) as database_path:
+        return run_load(args, database_path)
+
+
+def run_load(args, database_path: Path):
+    from sqlalchemy import func, select
+
+    from backend import models
+    from backend.database import engine
+    from backend.main import initialize_database
+    from backend.synthetic_data import generate
+
+    initialize_database()
+    with engine.begin() as connection:
+        if connection.execute(select(func.count()).select_from(models.PlanItem)).scalar():
+            dataset = {"reused": str(database_path)}
+        else:
+            started = time.perf_counter()
+            dataset = generate(connection, args.employees, args.years, seed=args.seed)
+            dataset["generation_seconds"] = round(time.perf_counter() - started, 1)
+        dataset["plan_items"] = connection.execute(
+            select(func.count()).select_from(models.PlanItem)
+        ).scalar()
+    print(f"Dataset: {dataset}")
+
+    # One shared client runs every request on a single event loop, like one
+    # uvicorn worker, so sync endpoints go through the threadpool.
+    with app_client() as client:
+        ids = planning_ids(client.get("/data").json())
+
+        today = date.today()
+        week_start = today - timedelta(days=today.weekday())
+        recorder = Recorder()
+        stop = threading.Event()
+
+        def tv_display():
+            # Browsers revalidate with If-None-Match, so the displays do too.
+            etags = {}
+
+            def poll(name, url):
+                headers = {} if args.no_cache or url not in etags else {"If-None-Match": etags[url]}
+                response = recorder.call(name, lambda: client.get(url, headers=headers))
+                if response is not None and "etag" in response.headers:
+                    etags[url] = response.headers["etag"]
+
+            while not stop.is_set():
+                poll("GET /data", "/data")
+                poll("GET /plan/range", f"/plan/range?start={week_start}&days=7")
+                if args.poll_interval:
+                    stop.wait(args.poll_interval)
+
+        def planner(seed):
+            rng = random.Random(seed)
+            created = []
+            while not stop.is_set():
+                action = rng.random()
+                if action < 0.15:
+                    recorder.call("GET /plan", lambda: client.get(
+                        f"/plan?target_date={today + timedelta(days=rng.randint(0, 6))}"
+                    ))
+                elif action < 0.7 or not created:
+                    article_id = rng.choice(ids.articles)
+                    machine_group_id = rng.choice(ids.machine_groups)
+                    recorder.call("GET /default-goal", lambda: client.get(
+                        f"/default-goal?article_id={article_id}&machine_group_id={machine_group_id}"
+                    ))
+                    response = recorder.call("POST /plan", lambda: client.post("/plan", json={
+                        "employee_id": rng.choice(ids.employees),
+                        "article_id": article_id,
+                        "machine_group_id": machine_group_id,
+                        "goal": rng.randint(0, 200),
+                        "date": str(today + timedelta(days=rng.randint(0, 6))),
+                        "status": "planned",
+                    }))
+                    if response is not None and response.status_code == 201:
+                        created.append(response.json()["id"])
+                elif action < 0.9:
+                    item_id = rng.choice(created)
+                    recorder.call("PUT /plan/{id}", lambda: client.put(
+                        f"/plan/{item_id}", json={"status": "active", "goal": rng.randint(0, 200)}
+                    ))
+                else:
+                    item_id = created.pop(rng.randrange(len(created)))
+                    recorder.call("DELETE /plan/{id}", lambda: client.delete(f"/plan/{item_id}"))
+
+        threads = [threading.Thread(target=tv_display) for _ in range(args.tv_displays)]
+        threads += [threading.Thread(target=planner, args=(args.seed + index,)) for index in range(args.planners)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        time.sleep(args.seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+    result = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "config": {
+            "tv_displays": args.tv_displays,
+            "planners": args.planners,
+            "seconds": args.seconds,
+            "poll_interval": args.poll_interval,
+            "db_mode": args.db_mode,
+            "response_cache": not args.no_cache,
+            "sqlite_profile": os.environ.get("PLANNER_SQLITE_PROFILE", "wal"),
+        },
+        "dataset": dataset,
+        "duration_seconds": round(elapsed, 2),
+        "errors": recorder.errors[:20],
+        "endpoints": recorder.summary(elapsed),
+    }
+
+    print(f"{'endpoint':<20} {'requests':>8} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for name, stats in result["endpoints"].items():
+        print(
+            f"{name:<20} {stats['requests']:>8} {stats['throughput_rps']:>8} "
+            f"{stats['p50_ms']:>8} {stats['p95_ms']:>8} {stats['p99_ms']:>8}"
+        )
+    print(f"errors={len(recorder.errors)}")
+
+    output = Path(args.output) if args.output else (
+        RESULTS_DIR / f"load-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2), encoding="utf-8")
+    print(f"Results written to {output}")
+    return 1 if recorder.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+import argparse
+import gzip
+import statistics
+import time
+from datetime import date
+
+try:
+    from .harness import scratch_database
+except ImportError:
+    from harness import scratch_database
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Compare payload size and serialization CPU of the full and compact "
+        "/plan and /plan/range formats, with and without gzip, on a synthetic dataset.",
+    )
+    parser.add_argument("--employees", type=int, default=500)
+    parser.add_argument("--years", type=int, default=1)
+    parser.add_argument("--days", type=int, default=7, help="length of the /plan/range window")
+    parser.add_argument("--repeat", type=int, default=20)
+    return parser.parse_args()
+
+
+def cpu_ms(function, repeat):
+    durations = []
+    for _ in range(repeat):
+        started = time.process_time()
+        function()
+        durations.append((time.process_time() - started) * 1000)
+    return statistics.median(durations)
+
+
+def main():
+    args = parse_args()
+    # The synthetic dataset is written in bulk inserts that would be logged as slow SQL.
+    with scratch_database("planner-payload-", slow_query_ms=0):
+        run_benchmark(args)
+
+
+def run_benchmark(args):
+    from backend.cache import gzip_body
+    from typing import Dict, List
+
+    from pydantic import TypeAdapter
+
+    from backend.compact import compact_plan, compact_plan_range, full_plan, full_plan_range, orjson
+    from backend.database import SessionLocal, engine
+    from backend.main import PlanItemResponse, dump_json, initialize_database, query_plan, query_plan_range
+    from backend.synthetic_data import generate
+
+    initialize_database()
+    with engine.begin() as connection:
+        dataset = generate(connection, args.employees, args.years)
+    print(f"Generated {dataset['plan_items']} plan items for {dataset['employees']} employees.")
+    print(f"Encoder: {'orjson' if orjson is not None else 'json (orjson not installed)'}")
+
+    today = date.today()
+    with SessionLocal() as db:
+        plan = query_plan(db, today)
+        plan_range = query_plan_range(db, today, args.days)
+
+    # The full format is built by hand; it must match the declared response model.
+    for name, body, adapter, value in (
+        ("/plan", full_plan(plan), TypeAdapter(List[PlanItemResponse]), plan),
+        ("/plan/range", full_plan_range(plan_range), TypeAdapter(Dict[date, List[PlanItemResponse]]), plan_range),
+    ):
+        matches = body == dump_json(adapter, value)
+        print(f"{name} full body matches PlanItemResponse: {'yes' if matches else 'NO'}")
+
+    payloads = [
+        (f"/plan ({len(plan)} items)", [
+            ("full", lambda: full_plan(plan)),
+            ("compact", lambda: compact_plan(plan)),
+        ]),
+        (f"/plan/range ({args.days} days)", [
+            ("full", lambda: full_plan_range(plan_range)),
+            ("compact", lambda: compact_plan_range(plan_range)),
+        ]),
+    ]
+    for title, variants in payloads:
+        print(title)
+        for name, build in variants:
+            body = build()
+            # gzip_body() honours PLANNER_GZIP_MIN_BYTES; compress directly here.
+            compressed = gzip_body(body) or gzip.compress(body, compresslevel=6, mtime=0)
+            build_ms = cpu_ms(build, args.repeat)
+            gzip_ms = cpu_ms(lambda: gzip.compress(body, compresslevel=6, mtime=0), args.repeat)
+            print(
+                f"  {name:<8} {len(body) / 1024:8.1f} KiB  {build_ms:6.2f} ms CPU | "
+                f"gzip {len(compressed) / 1024:7.1f} KiB  +{gzip_ms:5.2f} ms CPU"
+            )
+
+
+if __name__ == "__main__":
+    main()
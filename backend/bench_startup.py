@@ -0,0 +1,74 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+# Runs in a fresh interpreter so module import cost is measured from scratch.
+PROBE = """
+import json, time
+from fastapi.testclient import TestClient
+started = time.perf_counter()
+from backend.main import app
+imported = time.perf_counter()
+with TestClient(app) as client:
+    ready = time.perf_counter()
+    client.get("/data").raise_for_status()
+    answered = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "startup_ms": (ready - imported) * 1000,
+    "first_request_ms": (answered - ready) * 1000,
+    "total_ms": (answered - started) * 1000,
+}))
+"""
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Measure backend import, startup and first-request latency in fresh processes.",
+    )
+    parser.add_argument("--runs", type=int, default=5)
+    return parser.parse_args()
+
+
+def probe(database_path: Path) -> dict:
+    env = dict(os.environ, PLANNER_DATABASE_PATH=str(database_path))
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=ROOT_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def report(label: str, samples):
+    print(label)
+    for key in ("import_ms", "startup_ms", "first_request_ms", "total_ms"):
+        values = [sample[key] for sample in samples]
+        print(f"  {key:<17} median {statistics.median(values):7.1f}  max {max(values):7.1f}")
+
+
+def main():
+    args = parse_args()
+    with tempfile.TemporaryDirectory(prefix="planner-startup-") as directory:
+        scratch_dir = Path(directory)
+        cold = [probe(scratch_dir / f"cold-{run}.db") for run in range(args.runs)]
+        warm_database = scratch_dir / "warm.db"
+        probe(warm_database)
+        warm = [probe(warm_database) for _ in range(args.runs)]
+
+    report(f"First boot on an empty database ({args.runs} runs)", cold)
+    report(f"Restart on a migrated database ({args.runs} runs)", warm)
+
+
+if __name__ == "__main__":
+    main()
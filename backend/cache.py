@@ -0,0 +1,99 @@
+import gzip
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable, NamedTuple, Optional
+
+DEFAULT_RESPONSE_CACHE_SIZE = 128
+DEFAULT_GZIP_MIN_BYTES = 1024
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    etag: str
+    # Compressed once when the entry is built, not on every poll.
+    gzip_body: Optional[bytes] = None
+
+
+class DataVersion:
+    """Counter bumped by every write so cached reads can tell they are stale."""
+
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    @property
+    def value(self) -> int:
+        return self._value
+
+    def bump(self) -> int:
+        with self._lock:
+            self._value += 1
+            return self._value
+
+
+class ResponseCache:
+    """Thread-safe LRU of serialized response bodies."""
+
+    def __init__(self, max_entries: int = DEFAULT_RESPONSE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key: Hashable, build_body: Callable[[], bytes]) -> CachedResponse:
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                return cached
+
+        body = build_body()
+        cached = CachedResponse(body=body, etag=make_etag(body), gzip_body=gzip_body(body))
+        if self.max_entries <= 0:
+            return cached
+
+        with self._lock:
+            self._entries[key] = cached
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return cached
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def gzip_body(body: bytes) -> Optional[bytes]:
+    if GZIP_MIN_BYTES <= 0 or len(body) < GZIP_MIN_BYTES:
+        return None
+    return gzip.compress(body, compresslevel=6, mtime=0)
+
+
+def make_etag(body: bytes) -> str:
+    return f'"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == "*" or candidate == etag:
+            return True
+    return False
+
+
+def resolve_cache_size() -> int:
+    return int(os.environ.get("PLANNER_RESPONSE_CACHE_SIZE", DEFAULT_RESPONSE_CACHE_SIZE))
+
+
+GZIP_MIN_BYTES = int(os.environ.get("PLANNER_GZIP_MIN_BYTES", DEFAULT_GZIP_MIN_BYTES))
+data_version = DataVersion()
+response_cache = ResponseCache(resolve_cache_size())
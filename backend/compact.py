@@ -0,0 +1,121 @@
+import json
+from datetime import date
+from typing import Dict, List
+
+try:
+    import orjson  # listed in requirements.txt; the standard library encoder is the fallback
+except ImportError:
+    orjson = None
+
+try:
+    from .models import TaskStatus
+except ImportError:
+    from models import TaskStatus
+
+# Both /plan formats are encoded here with json_dumps(). The full format
+# matches PlanItemResponse field for field; building the dicts directly skips
+# pydantic validation, which took most of the serialization time.
+#
+# ?format=compact sends each employee, article and machine group once and
+# every plan item as a row of ids; field order is given in "fields".
+COMPACT_FIELDS = {
+    "items": [
+        "id", "date", "employee_id", "article_id", "machine_group_id",
+        "goal", "quantity_done", "status", "comment",
+    ],
+    "employees": ["id", "number", "name"],
+    "articles": ["id", "name"],
+    "machine_groups": ["id", "name"],
+}
+
+
+def json_dumps(value) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def full_item(item) -> dict:
+    article, machine_group = item.article, item.machine_group
+    return {
+        "id": item.id,
+        "date": item.date.isoformat(),
+        "employee": {"id": item.employee.id, "number": item.employee.number, "name": item.employee.name},
+        "article": None if article is None else {"id": article.id, "name": article.name},
+        "machine_group": None if machine_group is None else {"id": machine_group.id, "name": machine_group.name},
+        "goal": item.goal,
+        "quantity_done": item.quantity_done,
+        "status": TaskStatus(item.status).value,
+        "comment": item.comment,
+    }
+
+
+def full_plan(items) -> bytes:
+    return json_dumps([full_item(item) for item in items])
+
+
+def full_plan_range(plan_by_date: Dict[date, List]) -> bytes:
+    # An item carried over several days is built once and repeated.
+    built = {}
+    body = {}
+    for day, day_items in plan_by_date.items():
+        for item in day_items:
+            if item.id not in built:
+                built[item.id] = full_item(item)
+        body[day.isoformat()] = [built[item.id] for item in day_items]
+    return json_dumps(body)
+
+
+def compact_references(items) -> dict:
+    employees, articles, machine_groups = {}, {}, {}
+    for item in items:
+        employees[item.employee.id] = [item.employee.id, item.employee.number, item.employee.name]
+        if item.article is not None:
+            articles[item.article.id] = [item.article.id, item.article.name]
+        if item.machine_group is not None:
+            machine_groups[item.machine_group.id] = [item.machine_group.id, item.machine_group.name]
+    return {
+        "employees": list(employees.values()),
+        "articles": list(articles.values()),
+        "machine_groups": list(machine_groups.values()),
+    }
+
+
+def compact_item(item) -> list:
+    return [
+        item.id,
+        item.date.isoformat(),
+        item.employee_id,
+        item.article_id,
+        item.machine_group_id,
+        item.goal,
+        item.quantity_done,
+        TaskStatus(item.status).value,
+        item.comment,
+    ]
+
+
+def compact_plan(items) -> bytes:
+    return json_dumps({
+        "fields": COMPACT_FIELDS,
+        **compact_references(items),
+        "items": [compact_item(item) for item in items],
+    })
+
+
+def compact_plan_range(plan_by_date: Dict[date, List]) -> bytes:
+    """Items carried over several days are sent once; "days" lists item ids."""
+    unique_items = {}
+    for day_items in plan_by_date.values():
+        for item in day_items:
+            unique_items.setdefault(item.id, item)
+    items = sorted(unique_items.values(), key=lambda item: item.id)
+    return json_dumps({
+        "fields": COMPACT_FIELDS,
+        **compact_references(items),
+        "items": [compact_item(item) for item in items],
+        "days": {
+            day.isoformat(): [item.id for item in day_items]
+            for day, day_items in plan_by_date.items()
+        },
+    })
@@ -0,0 +1,94 @@
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from datetime import date, timedelta
+
+try:
+    from .harness import app_client, planning_ids, scratch_database
+except ImportError:
+    from harness import app_client, planning_ids, scratch_database
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Run parallel plan readers and writers against a scratch database "
+        "and report any lock errors.",
+    )
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--profile", default=os.environ.get("PLANNER_SQLITE_PROFILE", "wal"))
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    with scratch_database("planner-concurrency-", sqlite_profile=args.profile, response_cache_size=0):
+        with app_client() as client:
+            return check_concurrency(args, client)
+
+
+def check_concurrency(args, client):
+    ids = planning_ids(client.get("/data").json())
+    start_date = date.today()
+    deadline = time.monotonic() + args.seconds
+    counts = {"reads": 0, "writes": 0, "rejected": 0}
+    errors = []
+    lock = threading.Lock()
+
+    def record(key):
+        with lock:
+            counts[key] += 1
+
+    def reader():
+        while time.monotonic() < deadline:
+            try:
+                response = client.get(f"/plan/range?start={start_date}&days=7")
+                response.raise_for_status()
+                record("reads")
+            except Exception as exc:
+                errors.append(f"read: {exc}")
+
+    def writer(seed):
+        rng = random.Random(seed)
+        while time.monotonic() < deadline:
+            payload = {
+                "employee_id": rng.choice(ids.employees),
+                "article_id": rng.choice(ids.articles),
+                "machine_group_id": rng.choice(ids.machine_groups),
+                "goal": rng.randint(0, 200),
+                "date": str(start_date + timedelta(days=rng.randint(0, 6))),
+                "status": "active",
+            }
+            try:
+                response = client.post("/plan", json=payload)
+                if response.status_code == 400:
+                    record("rejected")
+                    continue
+                response.raise_for_status()
+                record("writes")
+            except Exception as exc:
+                errors.append(f"write: {exc}")
+
+    threads = [threading.Thread(target=reader) for _ in range(args.readers)]
+    threads += [threading.Thread(target=writer, args=(seed,)) for seed in range(args.writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    print(
+        f"profile={args.profile} readers={args.readers} writers={args.writers} "
+        f"reads={counts['reads']} writes={counts['writes']} "
+        f"rejected_max_jobs={counts['rejected']} errors={len(errors)}"
+    )
+    for error in errors[:10]:
+        print(f"  {error}")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
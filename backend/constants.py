@@ -11,3 +11,6 @@ SPECIFIC_GROUPS = [
     "Skärning", "Injicering", "Limning", "Fräsning", "Slipning",
     "Lackering", "Slutkontroll", "Packning", "Arbetsledning", "Sjuk",
 ]
+
+# Machine groups that record an absence or supervision rather than a job.
+SPECIAL_MACHINE_GROUP_NAMES = {"Sjuk", "Arbetsledning"}
@@ -1,15 +1,47 @@
+import os
 from pathlib import Path
 
 from sqlalchemy import create_engine, event
 from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import QueuePool
 
 BASE_DIR = Path(__file__).resolve().parent.parent
-DATABASE_PATH = BASE_DIR / "planner.db"
+DATABASE_PATH = Path(os.environ.get("PLANNER_DATABASE_PATH", BASE_DIR / "planner.db"))
 SQLALCHEMY_DATABASE_URL = f"sqlite:///{DATABASE_PATH.as_posix()}"
 
+# "wal" lets TV readers keep reading while a planner writes; "rollback" keeps
+# SQLite's default journal for filesystems where WAL is not supported.
+SQLITE_PROFILES = {
+    "wal": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 256 * 1024 * 1024,
+        "cache_size": -64 * 1024,
+        "temp_store": "MEMORY",
+    },
+    "rollback": {
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+    },
+}
+SQLITE_PROFILE = os.environ.get("PLANNER_SQLITE_PROFILE", "wal")
+if SQLITE_PROFILE not in SQLITE_PROFILES:
+    raise ValueError(
+        f"Unknown PLANNER_SQLITE_PROFILE {SQLITE_PROFILE!r}, expected one of {sorted(SQLITE_PROFILES)}"
+    )
+
+BUSY_TIMEOUT_MS = int(os.environ.get("PLANNER_SQLITE_BUSY_TIMEOUT_MS", 5000))
+# Sync endpoints run in Starlette's threadpool (40 threads by default), so the
+# pool should let every worker thread hold a connection without waiting.
+POOL_SIZE = int(os.environ.get("PLANNER_DB_POOL_SIZE", 40))
+POOL_MAX_OVERFLOW = int(os.environ.get("PLANNER_DB_POOL_MAX_OVERFLOW", 10))
+
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False},
+    connect_args={"check_same_thread": False, "timeout": BUSY_TIMEOUT_MS / 1000},
+    poolclass=QueuePool,
+    pool_size=POOL_SIZE,
+    max_overflow=POOL_MAX_OVERFLOW,
 )
 
 
@@ -17,9 +49,43 @@ engine = create_engine(
 def set_sqlite_pragma(dbapi_connection, _connection_record):
     cursor = dbapi_connection.cursor()
     cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    for pragma, value in SQLITE_PROFILES[SQLITE_PROFILE].items():
+        cursor.execute(f"PRAGMA {pragma}={value}")
     cursor.close()
 
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+def begin_immediate(db):
+    """Take SQLite's write lock before the session's first statement.
+
+    The driver only begins a transaction at the first write, so a check read
+    before it (such as the max-jobs count) could be stale by the time the
+    write commits. Call it first thing in a write endpoint."""
+    db.connection().exec_driver_sql("BEGIN IMMEDIATE")
+
+# "sync" serves endpoints from Starlette's threadpool with blocking sessions;
+# "async" runs them on the event loop with aiosqlite, so the number of
+# concurrent requests is no longer capped by the threadpool size.
+DB_MODES = {"sync", "async"}
+DB_MODE = os.environ.get("PLANNER_DB_MODE", "sync")
+if DB_MODE not in DB_MODES:
+    raise ValueError(f"Unknown PLANNER_DB_MODE {DB_MODE!r}, expected one of {sorted(DB_MODES)}")
+
+async_engine = None
+AsyncSessionLocal = None
+if DB_MODE == "async":
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_engine = create_async_engine(
+        f"sqlite+aiosqlite:///{DATABASE_PATH.as_posix()}",
+        connect_args={"timeout": BUSY_TIMEOUT_MS / 1000},
+        pool_size=POOL_SIZE,
+        max_overflow=POOL_MAX_OVERFLOW,
+    )
+    event.listen(async_engine.sync_engine, "connect", set_sqlite_pragma)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False)
+
 Base = declarative_base()
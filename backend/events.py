@@ -0,0 +1,118 @@
+import asyncio
+import json
+import os
+import threading
+from typing import AsyncIterator, Optional
+
+DEFAULT_MAX_CLIENTS = 100
+DEFAULT_QUEUE_SIZE = 32
+DEFAULT_HEARTBEAT_SECONDS = 15.0
+
+RESYNC_EVENT = {"type": "resync"}
+# Sent first on every stream, so clients know events actually reach them and
+# are not held back by a buffering proxy.
+CONNECTED_EVENT = {"type": "connected"}
+
+
+class TooManyClients(Exception):
+    pass
+
+
+class Subscriber:
+    def __init__(self, loop: asyncio.AbstractEventLoop, queue_size: int):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=queue_size)
+
+    def offer(self, event: dict):
+        # Runs on the subscriber's loop. A client that cannot keep up loses its
+        # backlog and is told to reload everything instead of growing unbounded.
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC_EVENT)
+
+
+class EventBroker:
+    """Fans change notifications out to connected Server-Sent Events clients."""
+
+    def __init__(
+        self,
+        max_clients: int = DEFAULT_MAX_CLIENTS,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        heartbeat_seconds: float = DEFAULT_HEARTBEAT_SECONDS,
+    ):
+        self.max_clients = max_clients
+        self.queue_size = queue_size
+        self.heartbeat_seconds = heartbeat_seconds
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    @property
+    def client_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> Subscriber:
+        subscriber = Subscriber(asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            if len(self._subscribers) >= self.max_clients:
+                raise TooManyClients()
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def publish(self, event: dict):
+        """Thread-safe; called from the sync endpoints' worker threads."""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.loop.call_soon_threadsafe(subscriber.offer, event)
+            except RuntimeError:
+                # The client's loop has shut down; drop it.
+                self.unsubscribe(subscriber)
+
+    async def stream(self, subscriber: Subscriber) -> AsyncIterator[str]:
+        try:
+            yield "retry: 3000\n\n"
+            yield format_event(CONNECTED_EVENT)
+            while True:
+                try:
+                    event = await asyncio.wait_for(
+                        subscriber.queue.get(),
+                        timeout=self.heartbeat_seconds,
+                    )
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                yield format_event(event)
+        finally:
+            self.unsubscribe(subscriber)
+
+
+def format_event(event: dict, event_id: Optional[int] = None) -> str:
+    if event_id is None:
+        event_id = event.get("version")
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event['type']}")
+    lines.append(f"data: {json.dumps(event, separators=(',', ':'), default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def create_broker_from_env() -> EventBroker:
+    return EventBroker(
+        max_clients=int(os.environ.get("PLANNER_EVENTS_MAX_CLIENTS", DEFAULT_MAX_CLIENTS)),
+        queue_size=int(os.environ.get("PLANNER_EVENTS_QUEUE_SIZE", DEFAULT_QUEUE_SIZE)),
+        heartbeat_seconds=float(
+            os.environ.get("PLANNER_EVENTS_HEARTBEAT_SECONDS", DEFAULT_HEARTBEAT_SECONDS)
+        ),
+    )
+
+
+event_broker = create_broker_from_env()
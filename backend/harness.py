@@ -0,0 +1,80 @@
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List, NamedTuple, Optional
+
+try:
+    from .constants import SPECIAL_MACHINE_GROUP_NAMES
+except ImportError:
+    from constants import SPECIAL_MACHINE_GROUP_NAMES
+
+# Setup shared by the check, benchmark and maintenance scripts in this
+# directory, which import the backend as the `backend` package.
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+
+class PlanningIds(NamedTuple):
+    """Ids a script can plan with; machine groups exclude the leave groups."""
+
+    employees: List[int]
+    articles: List[int]
+    machine_groups: List[int]
+
+
+def use_database(database_path, **settings):
+    """Point the backend at database_path, setting each keyword as a
+    PLANNER_<NAME> environment variable (None leaves it alone).
+
+    The engine and most settings are read when backend modules are imported,
+    so call this before importing any of them."""
+    os.environ["PLANNER_DATABASE_PATH"] = str(Path(database_path).resolve())
+    for name, value in settings.items():
+        if value is not None:
+            os.environ[f"PLANNER_{name.upper()}"] = str(value)
+    if str(ROOT_DIR) not in sys.path:
+        sys.path.insert(0, str(ROOT_DIR))
+
+
+@contextmanager
+def scratch_database(prefix: str, database: Optional[str] = None, **settings):
+    """use_database() on database, or on a new one in a temporary directory
+    that is removed on exit. Yields the database path."""
+    if database:
+        use_database(database, **settings)
+        yield Path(database).resolve()
+        return
+    with tempfile.TemporaryDirectory(prefix=prefix) as directory:
+        database_path = Path(directory) / "planner.db"
+        use_database(database_path, **settings)
+        try:
+            yield database_path
+        finally:
+            database_module = sys.modules.get("backend.database")
+            if database_module is not None:
+                # Pooled connections would keep the files open.
+                database_module.engine.dispose()
+
+
+@contextmanager
+def app_client():
+    """A TestClient for the app, with startup (migrations, background tasks) run."""
+    from fastapi.testclient import TestClient
+
+    from backend.main import app
+
+    with TestClient(app) as client:
+        yield client
+
+
+def planning_ids(reference_data: dict) -> PlanningIds:
+    """PlanningIds from a GET /data response body."""
+    return PlanningIds(
+        employees=[employee["id"] for employee in reference_data["employees"]],
+        articles=[article["id"] for article in reference_data["articles"]],
+        machine_groups=[
+            group["id"] for group in reference_data["machine_groups"]
+            if group["name"] not in SPECIAL_MACHINE_GROUP_NAMES
+        ],
+    )
@@ -1,71 +1,127 @@
-import os
+import time
+from datetime import date
 from pathlib import Path
 
-import pandas as pd
+from sqlalchemy import insert
 
 try:
     from .constants import SPECIFIC_ARTICLES, SPECIFIC_GROUPS
-    from .database import Base, SessionLocal, engine
+    from .database import DATABASE_PATH, Base, SessionLocal, engine
+    from .migrations import run_migrations
     from .models import Article, Employee, MachineGroup
+    from .seed import repair_mojibake
+    from .stamplingslogg import (
+        DATE_COLUMN,
+        EMPLOYEE_NAME_COLUMN,
+        EMPLOYEE_NUMBER_COLUMN,
+        get_watermark,
+        hash_file,
+        iter_log_chunks,
+        resolve_csv_path,
+        save_watermark,
+    )
+    from .workers import initialization_lock
 except ImportError:
     from constants import SPECIFIC_ARTICLES, SPECIFIC_GROUPS
-    from database import Base, SessionLocal, engine
+    from database import DATABASE_PATH, Base, SessionLocal, engine
+    from migrations import run_migrations
     from models import Article, Employee, MachineGroup
-
-Base.metadata.create_all(bind=engine)
-
-ROOT_DIR = Path(__file__).resolve().parent.parent
-DEFAULT_CSV_PATH = ROOT_DIR / "Stämplingslogg-2026-01-15.csv"
-EMPLOYEE_NUMBER_COLUMN = "Anställningsnummer"
-EMPLOYEE_NAME_COLUMN = "Namn"
-
-
-def resolve_csv_path():
-    csv_path = Path(os.environ.get("PLANNER_IMPORT_CSV", DEFAULT_CSV_PATH))
-    if not csv_path.is_absolute():
-        csv_path = ROOT_DIR / csv_path
-    return csv_path
+    from seed import repair_mojibake
+    from stamplingslogg import (
+        DATE_COLUMN,
+        EMPLOYEE_NAME_COLUMN,
+        EMPLOYEE_NUMBER_COLUMN,
+        get_watermark,
+        hash_file,
+        iter_log_chunks,
+        resolve_csv_path,
+        save_watermark,
+    )
+    from workers import initialization_lock
+
+with initialization_lock(DATABASE_PATH):
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+
+WATERMARK_SOURCE = "stamplingslogg"
+
+
+def import_employees(db, csv_path: Path, since: date = None):
+    """Insert employees not seen before; returns (rows read, employees added, last Datum)."""
+    seen_employees = {number for (number,) in db.query(Employee.number)}
+    rows_read = 0
+    employees_added = 0
+    last_date = None
+    started = time.perf_counter()
+
+    for chunk in iter_log_chunks(csv_path, [EMPLOYEE_NUMBER_COLUMN, EMPLOYEE_NAME_COLUMN], since):
+        rows_read += len(chunk)
+        chunk_last_date = chunk[DATE_COLUMN].dropna().max()
+        if isinstance(chunk_last_date, str) and (last_date is None or chunk_last_date > last_date):
+            last_date = chunk_last_date
+
+        employees = chunk[[EMPLOYEE_NUMBER_COLUMN, EMPLOYEE_NAME_COLUMN]].dropna().drop_duplicates()
+        new_employees = []
+        for number, name in employees.itertuples(index=False):
+            number = number.strip()
+            # The repair migration runs once per database, so later imports repair here.
+            name = repair_mojibake(name.strip())
+            if not number or not name or number in seen_employees:
+                continue
+            new_employees.append({"number": number, "name": name})
+            seen_employees.add(number)
+
+        if new_employees:
+            db.execute(insert(Employee), new_employees)
+            employees_added += len(new_employees)
+
+        elapsed = time.perf_counter() - started
+        print(f"  {rows_read} rows read ({rows_read / max(elapsed, 1e-9):.0f} rows/s)")
+
+    if last_date is not None:
+        last_date = date.fromisoformat(last_date)
+    return rows_read, employees_added, last_date
+
+
+def import_reference_names(db, model, names):
+    seen_names = {name for (name,) in db.query(model.name)}
+    names = [repair_mojibake(name) for name in names]
+    new_rows = [{"name": name} for name in names if name not in seen_names]
+    if new_rows:
+        db.execute(insert(model), new_rows)
 
 
 def import_data():
     db = SessionLocal()
+    started = time.perf_counter()
+    rows_read = 0
     try:
         csv_path = resolve_csv_path()
-        try:
-            df = pd.read_csv(csv_path, encoding="utf-8-sig", dtype=str)
-        except FileNotFoundError:
+        if csv_path.is_file():
+            file_hash = hash_file(csv_path)
+            watermark = get_watermark(db, WATERMARK_SOURCE)
+            if watermark is not None and watermark.file_hash == file_hash:
+                print(f"{csv_path.name} was already imported, skipping employee import.")
+            else:
+                # Rows on the watermark date itself may have been extended since the
+                # last export, so re-read that day; employee inserts are idempotent.
+                since = watermark.last_date if watermark is not None else None
+                print(f"Importing {csv_path.name}" + (f" from {since}" if since else ""))
+                rows_read, employees_added, last_date = import_employees(db, csv_path, since)
+                save_watermark(db, WATERMARK_SOURCE, file_hash, last_date, rows_read)
+                print(f"Added {employees_added} employees.")
+        else:
             print(f"CSV file not found at {csv_path}, skipping employee import.")
-            df = pd.DataFrame()
-
-        if not df.empty:
-            employees = df[[EMPLOYEE_NUMBER_COLUMN, EMPLOYEE_NAME_COLUMN]].drop_duplicates()
-            seen_employees = {employee.number for employee in db.query(Employee).all()}
-
-            for _, row in employees.iterrows():
-                number = str(row[EMPLOYEE_NUMBER_COLUMN]).strip()
-                name = str(row[EMPLOYEE_NAME_COLUMN]).strip()
-
-                if not number or not name or pd.isna(number) or pd.isna(name):
-                    continue
-
-                if number not in seen_employees:
-                    db.add(Employee(number=number, name=name))
-                    seen_employees.add(number)
-
-        seen_articles = {article.name for article in db.query(Article).all()}
-        for name in SPECIFIC_ARTICLES:
-            if name not in seen_articles:
-                db.add(Article(name=name))
-                seen_articles.add(name)
 
-        seen_groups = {group.name for group in db.query(MachineGroup).all()}
-        for name in SPECIFIC_GROUPS:
-            if name not in seen_groups:
-                db.add(MachineGroup(name=name))
-                seen_groups.add(name)
+        import_reference_names(db, Article, SPECIFIC_ARTICLES)
+        import_reference_names(db, MachineGroup, SPECIFIC_GROUPS)
 
         db.commit()
-        print("Data import successful!")
+        elapsed = time.perf_counter() - started
+        print(
+            f"Data import successful! {rows_read} rows in {elapsed:.2f}s "
+            f"({rows_read / max(elapsed, 1e-9):.0f} rows/s)"
+        )
     except Exception as exc:
         print(f"Error importing data: {exc}")
         db.rollback()
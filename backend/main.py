@@ -1,25 +1,139 @@
-import json
-from datetime import date
+import asyncio
+import functools
+import inspect
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from datetime import date, timedelta
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Literal, Optional
 
-from fastapi import Depends, FastAPI, HTTPException
+from fastapi import Depends, FastAPI, File, HTTPException, Query, Request, Response, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
-from pydantic import BaseModel, Field
-from sqlalchemy import and_, func
-from sqlalchemy.orm import Session
+from fastapi.responses import FileResponse, StreamingResponse
+from pydantic import BaseModel, Field, TypeAdapter
+from sqlalchemy import Integer, and_, cast, delete, func, insert, literal_column, null, select, tuple_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm.util import object_state
 
 try:
     from . import models
-    from .database import Base, SessionLocal, engine
+    from .actuals import import_actuals
+    from .backups import BACKUP_INTERVAL_MINUTES, backup_scheduler
+    from .compact import compact_plan, compact_plan_range, full_plan, full_plan_range
+    from .constants import SPECIAL_MACHINE_GROUP_NAMES
+    from .cache import data_version, etag_matches, response_cache
+    from .database import (
+        DATABASE_PATH,
+        DB_MODE,
+        AsyncSessionLocal,
+        Base,
+        SessionLocal,
+        async_engine,
+        begin_immediate,
+        engine,
+    )
+    from .events import RESYNC_EVENT, TooManyClients, event_broker
+    from .metrics import MetricsMiddleware, instrument_engine, metrics
+    from .migrations import run_migrations
+    from .profiling import (
+        PROFILE_HEADER,
+        PROFILING_ENABLED,
+        ProfilingMiddleware,
+        capture_statements,
+        list_profiles,
+        profile_path,
+        profiled,
+        token_matches,
+    )
+    from .plan_intervals import (
+        effective_between,
+        refresh_plan_intervals,
+        refresh_plan_intervals_from,
+    )
+    from .reference import ReferenceSnapshot, reference_registry
+    from .rollup import extend_daily_summary, refresh_daily_summary, refresh_daily_summary_range
+    from .static_files import StaticAsset, StaticSite, accepted_encodings, choose_variant
+    from .throughput import forget_employee_throughput, suggest_goal
+    from .workers import change_watcher, initialization_lock, read_data_stamp
 except ImportError:
     import models
-    from database import Base, SessionLocal, engine
-
-Base.metadata.create_all(bind=engine)
-
-app = FastAPI()
+    from actuals import import_actuals
+    from backups import BACKUP_INTERVAL_MINUTES, backup_scheduler
+    from compact import compact_plan, compact_plan_range, full_plan, full_plan_range
+    from constants import SPECIAL_MACHINE_GROUP_NAMES
+    from cache import data_version, etag_matches, response_cache
+    from database import (
+        DATABASE_PATH,
+        DB_MODE,
+        AsyncSessionLocal,
+        Base,
+        SessionLocal,
+        async_engine,
+        begin_immediate,
+        engine,
+    )
+    from events import RESYNC_EVENT, TooManyClients, event_broker
+    from metrics import MetricsMiddleware, instrument_engine, metrics
+    from migrations import run_migrations
+    from profiling import (
+        PROFILE_HEADER,
+        PROFILING_ENABLED,
+        ProfilingMiddleware,
+        capture_statements,
+        list_profiles,
+        profile_path,
+        profiled,
+        token_matches,
+    )
+    from plan_intervals import (
+        effective_between,
+        refresh_plan_intervals,
+        refresh_plan_intervals_from,
+    )
+    from reference import ReferenceSnapshot, reference_registry
+    from rollup import extend_daily_summary, refresh_daily_summary, refresh_daily_summary_range
+    from static_files import StaticAsset, StaticSite, accepted_encodings, choose_variant
+    from throughput import forget_employee_throughput, suggest_goal
+    from workers import change_watcher, initialization_lock, read_data_stamp
+
+
+def initialize_database():
+    # Every worker process runs this at startup; the first one does the work.
+    with initialization_lock(DATABASE_PATH):
+        Base.metadata.create_all(bind=engine)
+        run_migrations(engine)
+
+
+def read_current_data_stamp() -> int:
+    with engine.connect() as connection:
+        return read_data_stamp(connection)
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    # Schema changes, seeding and data repairs are versioned migrations, so
+    # after the first boot this is a single schema_version lookup.
+    initialize_database()
+    frontend_site.load()
+    # Runs in every mode: besides other workers, imports, restores and the
+    # actuals CLI write to the database without going through this process.
+    tasks = [asyncio.create_task(
+        change_watcher.run(read_current_data_stamp, event_broker, RESYNC_EVENT)
+    )]
+    if BACKUP_INTERVAL_MINUTES > 0:
+        tasks.append(asyncio.create_task(backup_scheduler.run()))
+    yield
+    for task in tasks:
+        task.cancel()
+    if async_engine is not None:
+        await async_engine.dispose()
+
+
+app = FastAPI(lifespan=lifespan)
+if PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+app.add_middleware(MetricsMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -28,11 +142,21 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+instrument_engine(engine)
+if async_engine is not None:
+    instrument_engine(async_engine.sync_engine)
+if PROFILING_ENABLED:
+    capture_statements(engine)
+    if async_engine is not None:
+        capture_statements(async_engine.sync_engine)
+
 FRONTEND_DIST_DIR = Path(__file__).resolve().parent.parent / "frontend" / "dist"
-REFERENCE_DATA_PATH = (
-    Path(__file__).resolve().parent.parent / "frontend" / "src" / "data" / "initialData.json"
-)
-SPECIAL_MACHINE_GROUP_NAMES = {"Sjuk", "Arbetsledning"}
+frontend_site = StaticSite(FRONTEND_DIST_DIR)
+MAX_PLAN_RANGE_DAYS = 62
+MAX_JOBS_PER_DAY = 4
+MAX_BATCH_OPERATIONS = 2000
+DEFAULT_HISTORY_PAGE_SIZE = 50
+MAX_HISTORY_PAGE_SIZE = 500
 
 
 def get_db():
@@ -43,6 +167,30 @@ def get_db():
         db.close()
 
 
+def database_endpoint(endpoint):
+    """Run an endpoint that takes `db: Session` in the configured PLANNER_DB_MODE.
+
+    In sync mode the endpoint is returned unchanged and FastAPI runs it in the
+    threadpool. In async mode the same body runs on the event loop through
+    AsyncSession.run_sync, so validation and queries are shared."""
+    if PROFILING_ENABLED:
+        endpoint = profiled(endpoint)
+    if DB_MODE != "async":
+        return endpoint
+
+    signature = inspect.signature(endpoint)
+
+    @functools.wraps(endpoint)
+    async def run_endpoint(**kwargs):
+        async with AsyncSessionLocal() as session:
+            return await session.run_sync(lambda db: endpoint(**kwargs, db=db))
+
+    run_endpoint.__signature__ = signature.replace(
+        parameters=[parameter for name, parameter in signature.parameters.items() if name != "db"]
+    )
+    return run_endpoint
+
+
 class ORMModel(BaseModel):
     class Config:
         from_attributes = True
@@ -92,6 +240,28 @@ class PlanItemUpdate(BaseModel):
     comment: Optional[str] = None
 
 
+class PlanItemBatchUpdate(PlanItemUpdate):
+    id: int
+
+
+class PlanBatchRequest(BaseModel):
+    # Applied in this order: deletes, then updates, then creates.
+    delete: List[int] = Field(default_factory=list)
+    update: List[PlanItemBatchUpdate] = Field(default_factory=list)
+    create: List[PlanItemCreate] = Field(default_factory=list)
+
+
+class PlanCopyRequest(BaseModel):
+    source_start: date
+    target_start: date
+    days: int = Field(default=7, ge=1, le=MAX_PLAN_RANGE_DAYS)
+
+
+class PlanCopyResponse(BaseModel):
+    deleted: int
+    created: int
+
+
 class PlanItemResponse(ORMModel):
     id: int
     date: date
@@ -104,6 +274,65 @@ class PlanItemResponse(ORMModel):
     comment: Optional[str] = None
 
 
+class PlanBatchResponse(BaseModel):
+    deleted: List[int]
+    updated: List[PlanItemResponse]
+    created: List[PlanItemResponse]
+
+
+class PlanHistoryPage(BaseModel):
+    # Newest first; pass next_before as `before` to get the next, older page.
+    items: List[PlanItemResponse]
+    next_before: Optional[str] = None
+
+
+class AttainmentRow(BaseModel):
+    key: Optional[str] = None
+    name: Optional[str] = None
+    goal: int
+    quantity_done: int
+    attainment: Optional[float] = None
+    items: int
+    planned: int
+    active: int
+    done: int
+
+
+# "compact" sends reference entities once and items as rows (see compact.py).
+ResponseFormat = Literal["full", "compact"]
+
+ATTAINMENT_ADAPTER = TypeAdapter(List[AttainmentRow])
+PLAN_HISTORY_ADAPTER = TypeAdapter(PlanHistoryPage)
+ATTAINMENT_PERIOD_FORMATS = {
+    "day": "%Y-%m-%d",
+    "month": "%Y-%m",
+    "year": "%Y",
+}
+ATTAINMENT_PERIODS = ("day", "week", "month", "year")
+ATTAINMENT_ENTITIES = {
+    "employee": (models.DailySummary.employee_id, models.Employee),
+    "machine_group": (models.DailySummary.machine_group_id, models.MachineGroup),
+    "article": (models.DailySummary.article_id, models.Article),
+}
+
+
+def attainment_period(group_by: str, column):
+    if group_by != "week":
+        return func.strftime(literal_column(f"'{ATTAINMENT_PERIOD_FORMATS[group_by]}'"), column)
+    # ISO 8601 week such as 2026-W53; SQLite only has %G-W%V from 3.46 on.
+    # A week's Thursday lies in its ISO year, and its day of the year gives the week.
+    thursday = func.date(column, literal_column("'weekday 0'"), literal_column("'-3 days'"))
+    return func.printf(
+        literal_column("'%s-W%02d'"),
+        func.strftime(literal_column("'%Y'"), thursday),
+        (cast(func.strftime(literal_column("'%j'"), thursday), Integer) + 6) // 7,
+    )
+
+
+def dump_json(adapter: TypeAdapter, value) -> bytes:
+    return adapter.dump_json(adapter.validate_python(value, from_attributes=True))
+
+
 def normalize_optional_text(value: Optional[str]) -> Optional[str]:
     if value is None:
         return None
@@ -111,96 +340,52 @@ def normalize_optional_text(value: Optional[str]) -> Optional[str]:
     return value or None
 
 
-def repair_mojibake(value: Optional[str]) -> Optional[str]:
-    if value is None or "\u00c3" not in value:
-        return value
-
-    try:
-        return value.encode("latin1").decode("utf-8")
-    except (UnicodeEncodeError, UnicodeDecodeError):
-        return value
-
+def record_change(db: Session, entity: str, action: str, **payload):
+    version = data_version.bump()
+    if event_broker.client_count:
+        # Our own write; the change watcher must not announce it again.
+        change_watcher.note(read_data_stamp(db))
+    event_broker.publish({"type": entity, "action": action, "version": version, **payload})
 
-def seed_reference_data():
-    if not REFERENCE_DATA_PATH.exists():
-        return
 
-    db = SessionLocal()
-    try:
-        changed = False
-        with REFERENCE_DATA_PATH.open(encoding="utf-8") as handle:
-            reference_data = json.load(handle)
-
-        if db.query(models.Employee).count() == 0:
-            for employee in reference_data["employees"]:
-                db.add(
-                    models.Employee(
-                        id=employee["id"],
-                        name=employee["name"],
-                        number=employee["number"],
-                    )
-                )
-            changed = True
-
-        if db.query(models.Article).count() == 0:
-            for article in reference_data["articles"]:
-                db.add(models.Article(id=article["id"], name=article["name"]))
-            changed = True
-
-        if db.query(models.MachineGroup).count() == 0:
-            for machine_group in reference_data["machine_groups"]:
-                db.add(models.MachineGroup(id=machine_group["id"], name=machine_group["name"]))
-            changed = True
-
-        for employee in db.query(models.Employee).all():
-            repaired_name = repair_mojibake(employee.name)
-            if repaired_name != employee.name:
-                employee.name = repaired_name
-                changed = True
-
-        for article in db.query(models.Article).all():
-            repaired_name = repair_mojibake(article.name)
-            if repaired_name != article.name:
-                article.name = repaired_name
-                changed = True
-
-        for machine_group in db.query(models.MachineGroup).all():
-            repaired_name = repair_mojibake(machine_group.name)
-            if repaired_name != machine_group.name:
-                machine_group.name = repaired_name
-                changed = True
-
-        if changed:
-            db.commit()
-    finally:
-        db.close()
+def current_data_version(db: Session) -> int:
+    # The trigger-maintained stamp also sees writes made outside the API
+    # (actuals and employee imports, snapshot restores) and by other workers.
+    return read_data_stamp(db)
 
 
-seed_reference_data()
+def cached_json_response(request: Request, db: Session, cache_key: tuple, build_body) -> Response:
+    cached = response_cache.get_or_build((*cache_key, current_data_version(db)), build_body)
+    body, etag = cached.body, cached.etag
+    headers = {"Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if cached.gzip_body is not None and "gzip" in accepted_encodings(
+        request.headers.get("accept-encoding")
+    ):
+        body, etag = cached.gzip_body, f'{cached.etag[:-1]}-gzip"'
+        headers["Content-Encoding"] = "gzip"
+    headers["ETag"] = etag
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
-def validate_plan_item_references(
-    db: Session,
+def check_plan_item_references(
+    references: ReferenceSnapshot,
     employee_id: int,
     article_id: Optional[int],
     machine_group_id: Optional[int],
 ):
-    employee = db.query(models.Employee).filter(models.Employee.id == employee_id).first()
-    if not employee:
+    if employee_id not in references.employees:
         raise HTTPException(status_code=404, detail="Employee not found")
 
     machine_group = None
     if machine_group_id is not None:
-        machine_group = db.query(models.MachineGroup).filter(
-            models.MachineGroup.id == machine_group_id
-        ).first()
+        machine_group = references.machine_groups.get(machine_group_id)
         if not machine_group:
             raise HTTPException(status_code=404, detail="Machine group not found")
 
-    if article_id is not None:
-        article = db.query(models.Article).filter(models.Article.id == article_id).first()
-        if not article:
-            raise HTTPException(status_code=404, detail="Article not found")
+    if article_id is not None and article_id not in references.articles:
+        raise HTTPException(status_code=404, detail="Article not found")
 
     if machine_group_id is None and article_id is not None:
         raise HTTPException(
@@ -219,19 +404,44 @@ def validate_plan_item_references(
         )
 
 
+def apply_plan_item_update(db_item: models.PlanItem, item: PlanItemUpdate):
+    update_data = item.model_dump(exclude_unset=True, exclude={"id"})
+    if "goal" in update_data and update_data["goal"] is None:
+        raise HTTPException(status_code=422, detail="Goal cannot be null.")
+    if "quantity_done" in update_data and update_data["quantity_done"] is None:
+        raise HTTPException(status_code=422, detail="Quantity done cannot be null.")
+    if "status" in update_data and update_data["status"] is None:
+        raise HTTPException(status_code=422, detail="Status cannot be null.")
+
+    if "comment" in update_data:
+        update_data["comment"] = normalize_optional_text(update_data["comment"])
+    if "status" in update_data:
+        update_data["status"] = update_data["status"].value
+
+    for key, value in update_data.items():
+        setattr(db_item, key, value)
+
+
 @app.get("/data", response_model=ReferenceData)
-def get_reference_data(db: Session = Depends(get_db)):
-    employees = db.query(models.Employee).order_by(models.Employee.name.asc()).all()
-    articles = db.query(models.Article).order_by(models.Article.name.asc()).all()
-    machine_groups = db.query(models.MachineGroup).order_by(models.MachineGroup.name.asc()).all()
-    return {
-        "employees": employees,
-        "articles": articles,
-        "machine_groups": machine_groups,
-    }
+@database_endpoint
+def get_reference_data(request: Request, db: Session = Depends(get_db)):
+    references = reference_registry.snapshot(db)
+
+    def build_body():
+        return ReferenceData.model_validate(
+            {
+                "employees": list(references.employees.values()),
+                "articles": list(references.articles.values()),
+                "machine_groups": list(references.machine_groups.values()),
+            },
+            from_attributes=True,
+        ).model_dump_json().encode()
+
+    return cached_json_response(request, db, ("data", references.version), build_body)
 
 
 @app.post("/employees", response_model=EmployeeBase, status_code=201)
+@database_endpoint
 def create_employee(employee: EmployeeCreate, db: Session = Depends(get_db)):
     name = employee.name.strip()
     number = employee.number.strip()
@@ -248,185 +458,762 @@ def create_employee(employee: EmployeeCreate, db: Session = Depends(get_db)):
     db.add(db_employee)
     db.commit()
     db.refresh(db_employee)
+    reference_registry.invalidate()
+    record_change(db, "employee", "created", id=db_employee.id)
     return db_employee
 
 
 @app.delete("/employees/{employee_id}")
+@database_endpoint
 def delete_employee(employee_id: int, db: Session = Depends(get_db)):
     db_employee = db.query(models.Employee).filter(models.Employee.id == employee_id).first()
     if not db_employee:
         raise HTTPException(status_code=404, detail="Employee not found")
 
+    db.query(models.DailySummary).filter(
+        models.DailySummary.employee_id == employee_id
+    ).delete(synchronize_session=False)
     db.query(models.PlanItem).filter(
         models.PlanItem.employee_id == employee_id
     ).delete(synchronize_session=False)
+    forget_employee_throughput(db, employee_id)
     db.delete(db_employee)
     db.commit()
+    reference_registry.invalidate()
+    record_change(db, "employee", "deleted", id=employee_id)
     return {"ok": True}
 
 
+def plan_item_query(db: Session):
+    # Eager-load the nested response objects so serializing a plan costs one query.
+    return db.query(models.PlanItem).options(
+        joinedload(models.PlanItem.employee),
+        joinedload(models.PlanItem.article),
+        joinedload(models.PlanItem.machine_group),
+    )
+
+
+def load_plan_item(db: Session, item_id: int):
+    return plan_item_query(db).filter(models.PlanItem.id == item_id).populate_existing().one()
+
+
+def query_plan(db: Session, target_date: date):
+    # Interval lookup: past plans end before target_date, so the scan only
+    # touches current and future rows however long the history is. Sorting in
+    # SQL would make SQLite walk the primary key over the whole table instead.
+    items = plan_item_query(db).filter(
+        effective_between(target_date, target_date),
+        models.PlanItem.machine_group_id.isnot(None),
+    ).all()
+    return sorted(items, key=lambda item: item.id)
+
+
+def query_plan_range(db: Session, start: date, days: int):
+    end = start + timedelta(days=days - 1)
+    items = plan_item_query(db).filter(
+        effective_between(start, end),
+        models.PlanItem.machine_group_id.isnot(None),
+    ).all()
+
+    plan_by_date = {start + timedelta(days=offset): [] for offset in range(days)}
+    for item in sorted(items, key=lambda item: item.id):
+        first_day = max(item.date, start)
+        last_day = min(item.valid_to, end)
+        for offset in range((last_day - first_day).days + 1):
+            plan_by_date[first_day + timedelta(days=offset)].append(item)
+    return plan_by_date
+
+
 @app.get("/plan", response_model=List[PlanItemResponse])
-def get_plan(target_date: Optional[date] = None, db: Session = Depends(get_db)):
+@database_endpoint
+def get_plan(
+    request: Request,
+    target_date: Optional[date] = None,
+    response_format: ResponseFormat = Query(default="full", alias="format"),
+    db: Session = Depends(get_db),
+):
     if target_date is None:
         target_date = date.today()
 
-    subq = db.query(
-        models.PlanItem.employee_id,
-        func.max(models.PlanItem.date).label("max_date"),
-    ).filter(models.PlanItem.date <= target_date).group_by(models.PlanItem.employee_id).subquery()
+    def build_body():
+        items = query_plan(db, target_date)
+        if response_format == "compact":
+            return compact_plan(items)
+        return full_plan(items)
+
+    return cached_json_response(request, db, ("plan", target_date, response_format), build_body)
+
+
+@app.get("/plan/range", response_model=Dict[date, List[PlanItemResponse]])
+@database_endpoint
+def get_plan_range(
+    request: Request,
+    start: Optional[date] = None,
+    days: int = Query(default=7, ge=1, le=MAX_PLAN_RANGE_DAYS),
+    response_format: ResponseFormat = Query(default="full", alias="format"),
+    db: Session = Depends(get_db),
+):
+    if start is None:
+        start = date.today()
+
+    def build_body():
+        plan_by_date = query_plan_range(db, start, days)
+        if response_format == "compact":
+            return compact_plan_range(plan_by_date)
+        return full_plan_range(plan_by_date)
+
+    return cached_json_response(request, db, ("plan_range", start, days, response_format), build_body)
+
+
+def parse_history_cursor(before: Optional[str]):
+    """A cursor is "<date>_<id>" of the last item on the previous page."""
+    if before is None:
+        return None
+    day, _, item_id = before.partition("_")
+    try:
+        return date.fromisoformat(day), int(item_id)
+    except ValueError:
+        raise HTTPException(status_code=422, detail="'before' must be a cursor from next_before.")
+
+
+def query_plan_history(db: Session, filters: list, before, limit: int) -> dict:
+    # Keyset pagination: the (date, id) row value seeks into the
+    # (<filter column>, date) index, so a page deep in the history costs the
+    # same as the first one. One extra row tells whether another page follows.
+    query = plan_item_query(db).filter(models.PlanItem.machine_group_id.isnot(None), *filters)
+    if before is not None:
+        query = query.filter(tuple_(models.PlanItem.date, models.PlanItem.id) < tuple_(*before))
+    items = query.order_by(models.PlanItem.date.desc(), models.PlanItem.id.desc()).limit(limit + 1).all()
 
-    items = db.query(models.PlanItem).join(
-        subq,
-        and_(
-            models.PlanItem.employee_id == subq.c.employee_id,
-            models.PlanItem.date == subq.c.max_date,
+    next_before = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_before = f"{items[-1].date.isoformat()}_{items[-1].id}"
+    return {"items": items, "next_before": next_before}
+
+
+@app.get("/employees/{employee_id}/plan-history", response_model=PlanHistoryPage)
+@database_endpoint
+def get_employee_plan_history(
+    request: Request,
+    employee_id: int,
+    before: Optional[str] = None,
+    limit: int = Query(default=DEFAULT_HISTORY_PAGE_SIZE, ge=1, le=MAX_HISTORY_PAGE_SIZE),
+    db: Session = Depends(get_db),
+):
+    cursor = parse_history_cursor(before)
+    if employee_id not in reference_registry.snapshot(db).employees:
+        raise HTTPException(status_code=404, detail="Employee not found")
+
+    return cached_json_response(
+        request,
+        db,
+        ("employee_plan_history", employee_id, cursor, limit),
+        lambda: dump_json(
+            PLAN_HISTORY_ADAPTER,
+            query_plan_history(db, [models.PlanItem.employee_id == employee_id], cursor, limit),
         ),
-    ).order_by(models.PlanItem.id.asc()).all()
+    )
 
-    return [item for item in items if item.machine_group_id is not None]
+
+@app.get("/plan/history", response_model=PlanHistoryPage)
+@database_endpoint
+def get_plan_history(
+    request: Request,
+    machine_group_id: Optional[int] = None,
+    article_id: Optional[int] = None,
+    before: Optional[str] = None,
+    limit: int = Query(default=DEFAULT_HISTORY_PAGE_SIZE, ge=1, le=MAX_HISTORY_PAGE_SIZE),
+    db: Session = Depends(get_db),
+):
+    cursor = parse_history_cursor(before)
+    filters = []
+    if machine_group_id is not None:
+        filters.append(models.PlanItem.machine_group_id == machine_group_id)
+    if article_id is not None:
+        filters.append(models.PlanItem.article_id == article_id)
+
+    return cached_json_response(
+        request,
+        db,
+        ("plan_history", machine_group_id, article_id, cursor, limit),
+        lambda: dump_json(PLAN_HISTORY_ADAPTER, query_plan_history(db, filters, cursor, limit)),
+    )
+
+
+def plan_item_response(references: ReferenceSnapshot, item_id: int, values: dict) -> dict:
+    """Response for a just-inserted item, built from what was written and the
+    reference snapshot instead of reading the row back."""
+    article_id, machine_group_id = values["article_id"], values["machine_group_id"]
+    return {
+        "id": item_id,
+        "date": values["date"],
+        "employee": references.employees[values["employee_id"]]._asdict(),
+        "article": references.articles[article_id]._asdict() if article_id is not None else None,
+        "machine_group": (
+            references.machine_groups[machine_group_id]._asdict()
+            if machine_group_id is not None
+            else None
+        ),
+        "goal": values["goal"],
+        "quantity_done": 0,
+        "status": values["status"],
+        "comment": values["comment"],
+    }
 
 
 @app.post("/plan", response_model=PlanItemResponse, status_code=201)
+@database_endpoint
 def create_plan_item(item: PlanItemCreate, db: Session = Depends(get_db)):
-    validate_plan_item_references(db, item.employee_id, item.article_id, item.machine_group_id)
-    normalized_comment = normalize_optional_text(item.comment)
+    # The write lock is held from the job count to the commit, so concurrent
+    # planners cannot both see three jobs and both add a fourth.
+    begin_immediate(db)
+    references = reference_registry.snapshot(db)
+    check_plan_item_references(references, item.employee_id, item.article_id, item.machine_group_id)
+
+    day = and_(models.PlanItem.employee_id == item.employee_id, models.PlanItem.date == item.date)
+    day_groups = db.execute(select(models.PlanItem.machine_group_id).where(day)).scalars().all()
+    is_job = item.machine_group_id is not None
+    if is_job:
+        if sum(group_id is not None for group_id in day_groups) >= MAX_JOBS_PER_DAY:
+            raise HTTPException(status_code=400, detail="Max 4 jobs per day allowed.")
+        # A job replaces a leave entry on the same day.
+        if None in day_groups:
+            db.execute(delete(models.PlanItem).where(day, models.PlanItem.machine_group_id.is_(None)))
+    elif day_groups:
+        # A leave entry replaces the whole day.
+        db.execute(delete(models.PlanItem).where(day))
+
+    values = {
+        "employee_id": item.employee_id,
+        "article_id": item.article_id if is_job else None,
+        "machine_group_id": item.machine_group_id,
+        "goal": item.goal if is_job else 0,
+        "date": item.date,
+        "status": item.status.value,
+        "comment": normalize_optional_text(item.comment),
+    }
+    item_id = db.execute(
+        insert(models.PlanItem).values(**values, quantity_done=0).returning(models.PlanItem.id)
+    ).scalar_one()
+
+    if is_job and item.article_id is not None:
+        # One upsert on the (article, machine group) unique index instead of a
+        # read-modify-write that two planners could race.
+        upsert = sqlite_insert(models.DefaultGoal).values(
+            article_id=item.article_id, machine_group_id=item.machine_group_id, goal=item.goal
+        )
+        db.execute(upsert.on_conflict_do_update(
+            index_elements=[models.DefaultGoal.article_id, models.DefaultGoal.machine_group_id],
+            set_={"goal": upsert.excluded.goal},
+        ))
 
-    existing_count = db.query(models.PlanItem).filter(
-        models.PlanItem.employee_id == item.employee_id,
-        models.PlanItem.date == item.date,
-        models.PlanItem.machine_group_id.isnot(None),
-    ).count()
+    refresh_plan_intervals(db, [(item.employee_id, item.date)])
+    refresh_daily_summary(db, [(item.employee_id, item.date)])
+    db.commit()
+    record_change(db, "plan_item", "created", id=item_id, employee_id=item.employee_id, date=item.date)
+    return plan_item_response(references, item_id, values)
 
-    if item.machine_group_id is None:
-        db.query(models.PlanItem).filter(
-            models.PlanItem.employee_id == item.employee_id,
-            models.PlanItem.date == item.date,
-        ).delete(synchronize_session=False)
 
+def batch_error(operation: str, index: int, exc: HTTPException) -> HTTPException:
+    return HTTPException(status_code=exc.status_code, detail=f"{operation}[{index}]: {exc.detail}")
+
+
+def discard_plan_item(db: Session, db_item: models.PlanItem):
+    if object_state(db_item).pending:
+        db.expunge(db_item)
+    else:
+        db.delete(db_item)
+
+
+@app.post("/plan/batch", response_model=PlanBatchResponse)
+@database_endpoint
+def apply_plan_batch(batch: PlanBatchRequest, db: Session = Depends(get_db)):
+    if len(batch.delete) + len(batch.update) + len(batch.create) > MAX_BATCH_OPERATIONS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"At most {MAX_BATCH_OPERATIONS} operations per batch.",
+        )
+
+    # Like create_plan_item: the day reads below must not go stale before commit.
+    begin_immediate(db)
+    references = reference_registry.snapshot(db)
+    for index, item in enumerate(batch.create):
+        try:
+            check_plan_item_references(
+                references, item.employee_id, item.article_id, item.machine_group_id
+            )
+        except HTTPException as exc:
+            raise batch_error("create", index, exc)
+
+    touched_ids = set(batch.delete) | {item.id for item in batch.update}
+    existing_items = {}
+    if touched_ids:
+        existing_items = {
+            item.id: item
+            for item in db.query(models.PlanItem).filter(models.PlanItem.id.in_(touched_ids))
+        }
+
+    # Everything already planned on the (employee, date) pairs being created,
+    # so the max-jobs rule and replacement logic can run in memory.
+    day_keys = {(item.employee_id, item.date) for item in batch.create}
+    day_items = defaultdict(list)
+    if day_keys:
+        for db_item in db.query(models.PlanItem).filter(
+            models.PlanItem.employee_id.in_({employee_id for employee_id, _ in day_keys}),
+            models.PlanItem.date.in_({item_date for _, item_date in day_keys}),
+        ):
+            key = (db_item.employee_id, db_item.date)
+            if key in day_keys:
+                day_items[key].append(db_item)
+
+    goal_keys = {
+        (item.article_id, item.machine_group_id)
+        for item in batch.create
+        if item.article_id is not None and item.machine_group_id is not None
+    }
+    default_goals = {}
+    if goal_keys:
+        default_goals = {
+            (goal.article_id, goal.machine_group_id): goal
+            for goal in db.query(models.DefaultGoal).filter(
+                models.DefaultGoal.article_id.in_({article_id for article_id, _ in goal_keys}),
+                models.DefaultGoal.machine_group_id.in_(
+                    {machine_group_id for _, machine_group_id in goal_keys}
+                ),
+            )
+        }
+
+    deleted_ids = []
+    for index, item_id in enumerate(batch.delete):
+        db_item = existing_items.get(item_id)
+        if db_item is None:
+            raise batch_error("delete", index, HTTPException(404, "Plan item not found"))
+        if item_id in deleted_ids:
+            continue
+        db.delete(db_item)
+        deleted_ids.append(item_id)
+        key = (db_item.employee_id, db_item.date)
+        day_keys.add(key)
+        if db_item in day_items.get(key, ()):
+            day_items[key].remove(db_item)
+
+    updated_ids = []
+    for index, item in enumerate(batch.update):
+        db_item = existing_items.get(item.id)
+        if db_item is None or item.id in deleted_ids:
+            raise batch_error("update", index, HTTPException(404, "Plan item not found"))
+        try:
+            apply_plan_item_update(db_item, item)
+        except HTTPException as exc:
+            raise batch_error("update", index, exc)
+        if item.id not in updated_ids:
+            updated_ids.append(item.id)
+        day_keys.add((db_item.employee_id, db_item.date))
+
+    created_items = []
+    for index, item in enumerate(batch.create):
+        current_items = day_items[(item.employee_id, item.date)]
+        if item.machine_group_id is None:
+            replaced_items = list(current_items)
+        else:
+            job_count = sum(1 for db_item in current_items if db_item.machine_group_id is not None)
+            if job_count >= MAX_JOBS_PER_DAY:
+                raise batch_error(
+                    "create", index, HTTPException(400, "Max 4 jobs per day allowed.")
+                )
+            replaced_items = [
+                db_item for db_item in current_items if db_item.machine_group_id is None
+            ]
+
+        for db_item in replaced_items:
+            discard_plan_item(db, db_item)
+            current_items.remove(db_item)
+            if db_item in created_items:
+                created_items.remove(db_item)
+            # An item updated earlier in the batch no longer exists to return.
+            if db_item.id in updated_ids:
+                updated_ids.remove(db_item.id)
+
+        is_job = item.machine_group_id is not None
         db_item = models.PlanItem(
             employee_id=item.employee_id,
-            article_id=None,
-            machine_group_id=None,
-            goal=0,
+            article_id=item.article_id if is_job else None,
+            machine_group_id=item.machine_group_id,
+            goal=item.goal if is_job else 0,
             date=item.date,
             status=item.status.value,
-            comment=normalized_comment,
+            comment=normalize_optional_text(item.comment),
         )
         db.add(db_item)
-        db.commit()
-        db.refresh(db_item)
-        return db_item
-
-    if existing_count >= 4:
-        raise HTTPException(status_code=400, detail="Max 4 jobs per day allowed.")
-
-    db.query(models.PlanItem).filter(
-        models.PlanItem.employee_id == item.employee_id,
-        models.PlanItem.date == item.date,
-        models.PlanItem.machine_group_id.is_(None),
-    ).delete(synchronize_session=False)
-
-    db_item = models.PlanItem(
-        employee_id=item.employee_id,
-        article_id=item.article_id,
-        machine_group_id=item.machine_group_id,
-        goal=item.goal,
-        date=item.date,
-        status=item.status.value,
-        comment=normalized_comment,
-    )
-    db.add(db_item)
-
-    if item.article_id is not None and item.machine_group_id is not None:
-        default_goal = db.query(models.DefaultGoal).filter(
-            models.DefaultGoal.article_id == item.article_id,
-            models.DefaultGoal.machine_group_id == item.machine_group_id,
-        ).first()
-        if default_goal:
-            default_goal.goal = item.goal
-        else:
-            db.add(
-                models.DefaultGoal(
+        current_items.append(db_item)
+        created_items.append(db_item)
+
+        if item.article_id is not None and is_job:
+            goal_key = (item.article_id, item.machine_group_id)
+            default_goal = default_goals.get(goal_key)
+            if default_goal:
+                default_goal.goal = item.goal
+            else:
+                default_goals[goal_key] = models.DefaultGoal(
                     article_id=item.article_id,
                     machine_group_id=item.machine_group_id,
                     goal=item.goal,
                 )
+                db.add(default_goals[goal_key])
+
+    db.flush()
+    created_ids = [db_item.id for db_item in created_items]
+    refresh_plan_intervals(db, day_keys)
+    refresh_daily_summary(db, day_keys)
+    db.commit()
+
+    loaded_items = {}
+    if created_ids or updated_ids:
+        loaded_items = {
+            db_item.id: db_item
+            for db_item in plan_item_query(db).filter(
+                models.PlanItem.id.in_(created_ids + updated_ids)
             )
+        }
+    record_change(
+        db,
+        "plan_item",
+        "batch",
+        created=len(created_ids),
+        updated=len(updated_ids),
+        deleted=len(deleted_ids),
+    )
+    return {
+        "deleted": deleted_ids,
+        "updated": [loaded_items[item_id] for item_id in updated_ids],
+        "created": [loaded_items[item_id] for item_id in created_ids],
+    }
+
 
+def plan_signature(items) -> tuple:
+    return tuple(sorted(
+        (
+            item.machine_group_id,
+            item.article_id or 0,
+            item.goal or 0,
+            item.status or "",
+            item.comment or "",
+        )
+        for item in items
+    ))
+
+
+@app.post("/plan/copy", response_model=PlanCopyResponse)
+@database_endpoint
+def copy_plan_range(copy: PlanCopyRequest, db: Session = Depends(get_db)):
+    if copy.source_start == copy.target_start:
+        raise HTTPException(status_code=422, detail="Source and target ranges are the same.")
+
+    # The reads below decide what is written, so nobody may change them before commit.
+    begin_immediate(db)
+    source_plan = query_plan_range(db, copy.source_start, copy.days)
+    # What each employee would carry into the target range if it were empty.
+    carried_items = defaultdict(list)
+    for db_item in query_plan(db, copy.target_start - timedelta(days=1)):
+        carried_items[db_item.employee_id].append(db_item)
+    previous_signatures = {
+        employee_id: plan_signature(items) for employee_id, items in carried_items.items()
+    }
+
+    target_end = copy.target_start + timedelta(days=copy.days - 1)
+    # The copied last day carries forward, so remember what each employee had
+    # after the range; days that have their own rows there are not affected.
+    day_after = target_end + timedelta(days=1)
+    following_plans = defaultdict(list)
+    for db_item in query_plan(db, day_after):
+        following_plans[db_item.employee_id].append(db_item)
+    following_signatures = {
+        employee_id: plan_signature(items) for employee_id, items in following_plans.items()
+    }
+    following_items = {
+        employee_id: [
+            {
+                "article_id": db_item.article_id,
+                "machine_group_id": db_item.machine_group_id,
+                "goal": db_item.goal,
+                "status": db_item.status,
+                "comment": db_item.comment,
+            }
+            for db_item in items
+        ]
+        for employee_id, items in following_plans.items()
+    }
+    explicit_after = {
+        employee_id
+        for (employee_id,) in db.query(models.PlanItem.employee_id).filter(
+            models.PlanItem.date == day_after
+        ).distinct()
+    }
+
+    deleted = db.query(models.PlanItem).filter(
+        models.PlanItem.date >= copy.target_start,
+        models.PlanItem.date <= target_end,
+    ).delete(synchronize_session=False)
+
+    # Only write a day when an employee's plan changes; carry-forward fills the rest.
+    new_items = []
+    for offset, source_date in enumerate(sorted(source_plan)):
+        target_date = copy.target_start + timedelta(days=offset)
+        items_by_employee = defaultdict(list)
+        for db_item in source_plan[source_date]:
+            items_by_employee[db_item.employee_id].append(db_item)
+
+        for employee_id in set(items_by_employee) | set(previous_signatures):
+            employee_items = items_by_employee.get(employee_id, [])
+            signature = plan_signature(employee_items)
+            if signature == previous_signatures.get(employee_id, ()):
+                continue
+            previous_signatures[employee_id] = signature
+
+            if not employee_items:
+                new_items.append(
+                    models.PlanItem(
+                        employee_id=employee_id,
+                        date=target_date,
+                        goal=0,
+                        status=models.TaskStatus.PLANNED.value,
+                    )
+                )
+            for db_item in employee_items:
+                new_items.append(
+                    models.PlanItem(
+                        employee_id=employee_id,
+                        article_id=db_item.article_id,
+                        machine_group_id=db_item.machine_group_id,
+                        goal=db_item.goal,
+                        date=target_date,
+                        status=db_item.status,
+                        comment=db_item.comment,
+                    )
+                )
+
+    # Restore the plan after the range where the copy would change it.
+    for employee_id in (set(previous_signatures) | set(following_signatures)) - explicit_after:
+        if previous_signatures.get(employee_id, ()) == following_signatures.get(employee_id, ()):
+            continue
+        restored = following_items.get(employee_id) or [
+            {"goal": 0, "status": models.TaskStatus.PLANNED.value}
+        ]
+        new_items.extend(
+            models.PlanItem(employee_id=employee_id, date=day_after, **values) for values in restored
+        )
+
+    db.add_all(new_items)
+    db.flush()
+    refresh_plan_intervals_from(db, copy.target_start)
+    refresh_daily_summary_range(db, copy.target_start)
     db.commit()
-    db.refresh(db_item)
-    return db_item
+    record_change(
+        db,
+        "plan_item",
+        "copied",
+        source_start=copy.source_start,
+        target_start=copy.target_start,
+        days=copy.days,
+    )
+    return {"deleted": deleted, "created": len(new_items)}
 
 
 @app.put("/plan/{item_id}", response_model=PlanItemResponse)
+@database_endpoint
 def update_plan_item(item_id: int, item: PlanItemUpdate, db: Session = Depends(get_db)):
     db_item = db.query(models.PlanItem).filter(models.PlanItem.id == item_id).first()
     if not db_item:
         raise HTTPException(status_code=404, detail="Plan item not found")
 
-    update_data = item.model_dump(exclude_unset=True)
-    if "goal" in update_data and update_data["goal"] is None:
-        raise HTTPException(status_code=422, detail="Goal cannot be null.")
-    if "quantity_done" in update_data and update_data["quantity_done"] is None:
-        raise HTTPException(status_code=422, detail="Quantity done cannot be null.")
-    if "status" in update_data and update_data["status"] is None:
-        raise HTTPException(status_code=422, detail="Status cannot be null.")
-
-    if "comment" in update_data:
-        update_data["comment"] = normalize_optional_text(update_data["comment"])
-    if "status" in update_data:
-        update_data["status"] = update_data["status"].value
-
-    for key, value in update_data.items():
-        setattr(db_item, key, value)
-
+    apply_plan_item_update(db_item, item)
+    db.flush()
+    refresh_daily_summary(db, [(db_item.employee_id, db_item.date)])
     db.commit()
-    db.refresh(db_item)
+    db_item = load_plan_item(db, item_id)
+    record_change(
+        db, "plan_item", "updated", id=item_id, employee_id=db_item.employee_id, date=db_item.date
+    )
     return db_item
 
 
 @app.delete("/plan/{item_id}")
+@database_endpoint
 def delete_plan_item(item_id: int, db: Session = Depends(get_db)):
     db_item = db.query(models.PlanItem).filter(models.PlanItem.id == item_id).first()
     if not db_item:
         raise HTTPException(status_code=404, detail="Plan item not found")
 
+    employee_id, item_date = db_item.employee_id, db_item.date
     db.delete(db_item)
+    db.flush()
+    refresh_plan_intervals(db, [(employee_id, item_date)])
+    refresh_daily_summary(db, [(employee_id, item_date)])
     db.commit()
+    record_change(db, "plan_item", "deleted", id=item_id, employee_id=employee_id, date=item_date)
     return {"ok": True}
 
 
 @app.get("/default-goal")
-def get_default_goal(article_id: int, machine_group_id: int, db: Session = Depends(get_db)):
+@database_endpoint
+def get_default_goal(
+    article_id: int,
+    machine_group_id: int,
+    employee_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+):
+    # "goal" is the last goal saved for the pair; the suggestion comes from
+    # the stamping log's pieces per hour (see throughput.py).
     default_goal = db.query(models.DefaultGoal).filter(
         models.DefaultGoal.article_id == article_id,
         models.DefaultGoal.machine_group_id == machine_group_id,
     ).first()
-    if default_goal:
-        return {"goal": default_goal.goal}
-    return {"goal": 0}
+    return {
+        # None, not 0: a saved goal of 0 must not fall back to the suggestion.
+        "goal": default_goal.goal if default_goal else None,
+        **suggest_goal(db, article_id, machine_group_id, employee_id),
+    }
 
 
-def resolve_frontend_file(relative_path: str):
-    candidate = (FRONTEND_DIST_DIR / relative_path).resolve()
+def query_attainment(db: Session, from_date: date, to_date: date, group_by: str):
+    # The rollup stops at the last materialized day; catch it up to today first.
+    if extend_daily_summary(db, date.today()):
+        db.commit()
+
+    summary = models.DailySummary
+    totals = (
+        func.sum(summary.goal),
+        func.sum(summary.quantity_done),
+        func.sum(summary.item_count),
+        func.sum(summary.planned_count),
+        func.sum(summary.active_count),
+        func.sum(summary.done_count),
+    )
+    in_range = and_(summary.date >= from_date, summary.date <= to_date)
+
+    if group_by in ATTAINMENT_PERIODS:
+        period = attainment_period(group_by, summary.date)
+        rows = db.query(period, null(), *totals).filter(in_range).group_by(period).order_by(period)
+    else:
+        entity_id, entity_model = ATTAINMENT_ENTITIES[group_by]
+        rows = db.query(entity_id, entity_model.name, *totals).outerjoin(
+            entity_model, entity_model.id == entity_id
+        ).filter(in_range).group_by(entity_id, entity_model.name).order_by(entity_model.name)
+
+    return [
+        {
+            "key": None if key is None else str(key),
+            "name": name,
+            "goal": goal or 0,
+            "quantity_done": quantity_done or 0,
+            "attainment": round(quantity_done / goal, 4) if goal else None,
+            "items": items or 0,
+            "planned": planned or 0,
+            "active": active or 0,
+            "done": done or 0,
+        }
+        for key, name, goal, quantity_done, items, planned, active, done in rows
+    ]
+
+
+@app.get("/analytics/attainment", response_model=List[AttainmentRow])
+@database_endpoint
+def get_attainment(
+    request: Request,
+    from_date: date = Query(alias="from"),
+    to_date: date = Query(alias="to"),
+    group_by: Literal["day", "week", "month", "year", "employee", "machine_group", "article"] = "day",
+    db: Session = Depends(get_db),
+):
+    if to_date < from_date:
+        raise HTTPException(status_code=422, detail="'to' must not be before 'from'.")
+
+    return cached_json_response(
+        request,
+        db,
+        ("attainment", from_date, to_date, group_by, date.today()),
+        lambda: dump_json(ATTAINMENT_ADAPTER, query_attainment(db, from_date, to_date, group_by)),
+    )
+
+
+# Bulk imports stay in the threadpool in both modes so they never block the event loop.
+@app.post("/import/actuals")
+def upload_actuals(file: UploadFile = File(...), db: Session = Depends(get_db)):
     try:
-        candidate.relative_to(FRONTEND_DIST_DIR)
-    except ValueError:
-        return None
-    if candidate.is_file():
-        return candidate
-    return None
+        summary = import_actuals(db, file.file)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=f"Could not read the stamping log: {exc}")
+    db.commit()
+    if summary["updated"]:
+        record_change(db, "plan_item", "actuals_imported", updated=summary["updated"])
+    return summary
+
+
+@app.get("/events")
+async def stream_events():
+    try:
+        subscriber = event_broker.subscribe()
+    except TooManyClients:
+        raise HTTPException(status_code=503, detail="Too many event stream clients.")
+
+    return StreamingResponse(
+        event_broker.stream(subscriber),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/metrics", include_in_schema=False)
+def get_metrics():
+    return Response(content=metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+def require_profile_token(request: Request):
+    if not token_matches(request.headers.get(PROFILE_HEADER)):
+        raise HTTPException(status_code=403, detail="Profile token required")
+
+
+if PROFILING_ENABLED:
+    @app.get("/profiles", include_in_schema=False, dependencies=[Depends(require_profile_token)])
+    def get_profiles():
+        return list_profiles()
+
+
+    @app.get("/profiles/{file_name}", include_in_schema=False, dependencies=[Depends(require_profile_token)])
+    def get_profile(file_name: str):
+        path = profile_path(file_name)
+        if path is None:
+            raise HTTPException(status_code=404, detail="Profile not found")
+        media_type = "application/json" if path.suffix == ".json" else "application/octet-stream"
+        return FileResponse(path, media_type=media_type, filename=path.name)
+
+
+def frontend_response(request: Request, asset: StaticAsset) -> Response:
+    encoding, variant = choose_variant(asset, request.headers.get("accept-encoding"))
+    headers = {
+        "ETag": variant.etag,
+        "Cache-Control": asset.cache_control,
+        "Vary": "Accept-Encoding",
+    }
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    if etag_matches(request.headers.get("if-none-match"), variant.etag):
+        return Response(status_code=304, headers=headers)
+    if variant.body is not None:
+        return Response(content=variant.body, media_type=asset.media_type, headers=headers)
+    return FileResponse(variant.path, media_type=asset.media_type, headers=headers)
 
 
 if FRONTEND_DIST_DIR.exists():
     @app.get("/", include_in_schema=False)
-    def serve_frontend_index():
-        return FileResponse(FRONTEND_DIST_DIR / "index.html")
+    def serve_frontend_index(request: Request):
+        return frontend_response(request, frontend_site.get("index.html"))
 
 
     @app.get("/{full_path:path}", include_in_schema=False)
-    def serve_frontend(full_path: str):
-        dist_file = resolve_frontend_file(full_path)
-        if dist_file is not None:
-            return FileResponse(dist_file)
-        return FileResponse(FRONTEND_DIST_DIR / "index.html")
+    def serve_frontend(full_path: str, request: Request):
+        # Paths come from the manifest, so nothing outside dist can be reached;
+        # unknown paths fall back to index.html for client-side routing.
+        asset = frontend_site.get(full_path) or frontend_site.get("index.html")
+        return frontend_response(request, asset)
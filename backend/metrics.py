@@ -0,0 +1,197 @@
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+
+SLOW_QUERY_MS = float(os.environ.get("PLANNER_SLOW_QUERY_MS", 100))
+# Streams stay open for minutes, which would drown every latency bucket.
+UNTIMED_ROUTES = {"/events", "/metrics"}
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+STATEMENT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+slow_query_logger = logging.getLogger("planner.slow_sql")
+
+
+class RequestStats:
+    __slots__ = ("scope", "statements", "sql_seconds")
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.statements = 0
+        self.sql_seconds = 0.0
+
+    @property
+    def route(self) -> str:
+        # The router stores the matched route in the shared scope before the endpoint runs.
+        route = self.scope.get("route")
+        return getattr(route, "path", None) or "unmatched"
+
+
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def escape_label_value(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    pairs = (f'{name}="{escape_label_value(value)}"' for name, value in labels.items())
+    return "{" + ",".join(pairs) + "}"
+
+
+class Metrics:
+    """Process-wide request and SQL metrics rendered in Prometheus text format."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = defaultdict(lambda: defaultdict(float))
+        self._histograms = defaultdict(dict)
+        self._help = {}
+
+    def describe(self, name: str, kind: str, text: str):
+        self._help[name] = (kind, text)
+
+    def increment(self, name: str, labels: tuple, amount: float = 1):
+        with self._lock:
+            self._counters[name][labels] += amount
+
+    def observe(self, name: str, labels: tuple, value: float, buckets):
+        with self._lock:
+            histogram = self._histograms[name].get(labels)
+            if histogram is None:
+                histogram = self._histograms[name][labels] = Histogram(buckets)
+            histogram.observe(value)
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            for name, (kind, text) in self._help.items():
+                lines.append(f"# HELP {name} {text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in sorted(self._counters.get(name, {}).items()):
+                    lines.append(f"{name}{format_labels(dict(labels))} {value:g}")
+                for labels, histogram in sorted(self._histograms.get(name, {}).items()):
+                    cumulative = 0
+                    for bound, count in zip((*histogram.buckets, "+Inf"), histogram.counts):
+                        cumulative += count
+                        bucket_labels = format_labels({**dict(labels), "le": bound})
+                        lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+                    lines.append(f"{name}_sum{format_labels(dict(labels))} {histogram.sum:g}")
+                    lines.append(f"{name}_count{format_labels(dict(labels))} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+metrics.describe("planner_http_requests_total", "counter", "HTTP requests by route and status.")
+metrics.describe("planner_http_request_duration_seconds", "histogram", "Time to send the full response.")
+metrics.describe("planner_http_response_size_bytes", "histogram", "Response body size.")
+metrics.describe("planner_sql_statements_per_request", "histogram", "SQL statements executed per request.")
+metrics.describe("planner_sql_request_duration_seconds", "histogram", "Time spent in SQL per request.")
+metrics.describe("planner_sql_statements_total", "counter", "SQL statements by route, none outside requests.")
+metrics.describe("planner_sql_slow_statements_total", "counter", "SQL statements slower than PLANNER_SLOW_QUERY_MS.")
+# Each uvicorn worker keeps its own metrics; the pid tells the series apart.
+metrics.describe("planner_worker_info", "gauge", "Always 1, labelled with the worker process id.")
+metrics.increment("planner_worker_info", (("pid", str(os.getpid())),))
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route counts, latency, response size and SQL use."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope)
+        token = current_request.set(stats)
+        started = time.perf_counter()
+        status = 500
+        size = 0
+
+        async def send_with_metrics(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            current_request.reset(token)
+            route = stats.route
+            method = scope["method"]
+            metrics.increment(
+                "planner_http_requests_total",
+                (("method", method), ("route", route), ("status", str(status))),
+            )
+            if route not in UNTIMED_ROUTES:
+                labels = (("method", method), ("route", route))
+                metrics.observe(
+                    "planner_http_request_duration_seconds",
+                    labels,
+                    time.perf_counter() - started,
+                    LATENCY_BUCKETS,
+                )
+                metrics.observe("planner_http_response_size_bytes", labels, size, SIZE_BUCKETS)
+                metrics.observe(
+                    "planner_sql_statements_per_request", labels, stats.statements, STATEMENT_BUCKETS
+                )
+                metrics.observe(
+                    "planner_sql_request_duration_seconds", labels, stats.sql_seconds, LATENCY_BUCKETS
+                )
+
+
+def instrument_engine(engine):
+    """Count and time every statement on a sync engine (for an AsyncEngine pass its sync_engine)."""
+
+    # A connection runs one statement at a time, so a single start time is
+    # enough; a failing statement leaves it to be overwritten by the next one.
+    @event.listens_for(engine, "before_cursor_execute")
+    def start_statement(conn, _cursor, _statement, _parameters, _context, _executemany):
+        conn.info["statement_started"] = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def finish_statement(conn, _cursor, statement, _parameters, _context, _executemany):
+        elapsed = time.perf_counter() - conn.info.pop("statement_started")
+        stats = current_request.get()
+        route = "none"
+        if stats is not None:
+            stats.statements += 1
+            stats.sql_seconds += elapsed
+            route = stats.route
+        metrics.increment("planner_sql_statements_total", (("route", route),))
+        # BEGIN IMMEDIATE (see database.begin_immediate) waits for the write
+        # lock; that is contention, not a slow query.
+        if SLOW_QUERY_MS and elapsed * 1000 >= SLOW_QUERY_MS and not statement.startswith("BEGIN"):
+            metrics.increment("planner_sql_slow_statements_total", (("route", route),))
+            slow_query_logger.warning(
+                "slow query %.1f ms on %s: %s", elapsed * 1000, route, " ".join(statement.split())[:500]
+            )
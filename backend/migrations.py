@@ -0,0 +1,160 @@
+from datetime import datetime
+
+from sqlalchemy import text
+
+try:
+    from .database import engine
+    from .plan_intervals import rebuild_plan_intervals
+    from .reference import REFERENCE_STAMP_TABLE, REFERENCE_TABLE_NAMES
+    from .rollup import get_horizon, rebuild_all as rebuild_daily_summary
+    from .seed import repair_reference_names, seed_reference_data
+    from .workers import DATA_STAMP_TABLE, DATA_STAMP_TABLE_NAMES
+except ImportError:
+    from database import engine
+    from plan_intervals import rebuild_plan_intervals
+    from reference import REFERENCE_STAMP_TABLE, REFERENCE_TABLE_NAMES
+    from rollup import get_horizon, rebuild_all as rebuild_daily_summary
+    from seed import repair_reference_names, seed_reference_data
+    from workers import DATA_STAMP_TABLE, DATA_STAMP_TABLE_NAMES
+
+SCHEMA_VERSION_TABLE = "schema_version"
+
+
+def add_plan_item_indexes(connection):
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_plan_items_employee_id_date "
+        "ON plan_items (employee_id, date)"
+    ))
+
+
+def add_default_goal_unique_index(connection):
+    # Older databases may hold several rows per pair; keep the most recent one.
+    connection.execute(text(
+        "DELETE FROM default_goals WHERE id NOT IN ("
+        "SELECT MAX(id) FROM default_goals GROUP BY article_id, machine_group_id)"
+    ))
+    connection.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_default_goals_article_id_machine_group_id "
+        "ON default_goals (article_id, machine_group_id)"
+    ))
+
+
+def plan_item_columns(connection) -> set:
+    return {row[1] for row in connection.execute(text("PRAGMA table_info(plan_items)"))}
+
+
+def backfill_daily_summary(connection):
+    # The rollup reads plan_items.valid_to; databases created before it existed
+    # get their backfill from add_plan_item_intervals() instead.
+    if "valid_to" in plan_item_columns(connection):
+        rebuild_daily_summary(connection)
+
+
+def create_stamp(connection, stamp_table: str, table_names):
+    """Single-row counter bumped by triggers on every write to table_names."""
+    connection.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {stamp_table} ("
+        "id INTEGER PRIMARY KEY CHECK (id = 1), version INTEGER NOT NULL)"
+    ))
+    connection.execute(text(f"INSERT OR IGNORE INTO {stamp_table} (id, version) VALUES (1, 0)"))
+    for table in table_names:
+        for operation in ("INSERT", "UPDATE", "DELETE"):
+            connection.execute(text(
+                f"CREATE TRIGGER IF NOT EXISTS trg_{table}_{operation.lower()}_{stamp_table} "
+                f"AFTER {operation} ON {table} BEGIN "
+                f"UPDATE {stamp_table} SET version = version + 1 WHERE id = 1; END"
+            ))
+
+
+def add_reference_stamp(connection):
+    create_stamp(connection, REFERENCE_STAMP_TABLE, REFERENCE_TABLE_NAMES)
+
+
+def add_plan_item_intervals(connection):
+    if "valid_to" not in plan_item_columns(connection):
+        connection.execute(text("ALTER TABLE plan_items ADD COLUMN valid_to DATE"))
+    rebuild_plan_intervals(connection)
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_plan_items_valid_to_date ON plan_items (valid_to, date)"
+    ))
+    if get_horizon(connection) is None:
+        rebuild_daily_summary(connection)
+
+
+def add_data_stamp(connection):
+    create_stamp(connection, DATA_STAMP_TABLE, DATA_STAMP_TABLE_NAMES)
+
+
+def add_plan_history_indexes(connection):
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_plan_items_machine_group_id_date "
+        "ON plan_items (machine_group_id, date)"
+    ))
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_plan_items_article_id_date ON plan_items (article_id, date)"
+    ))
+
+
+# Append only: each step runs once, in order, and its version is recorded.
+MIGRATIONS = [
+    (1, "Composite (employee_id, date) index on plan_items", add_plan_item_indexes),
+    (2, "Unique (article_id, machine_group_id) index on default_goals", add_default_goal_unique_index),
+    (3, "Backfill daily_summary from plan_items", backfill_daily_summary),
+    (4, "Seed empty reference tables from initialData.json", seed_reference_data),
+    (5, "Repair mojibake in employee, article and machine group names", repair_reference_names),
+    (6, "Reference stamp bumped by triggers on the reference tables", add_reference_stamp),
+    (7, "valid_to intervals on plan_items with a (valid_to, date) index", add_plan_item_intervals),
+    (8, "Data stamp bumped by triggers on plan and reference tables", add_data_stamp),
+    (9, "(machine_group_id, date) and (article_id, date) indexes for plan history", add_plan_history_indexes),
+]
+
+def ensure_schema_version_table(connection):
+    connection.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {SCHEMA_VERSION_TABLE} ("
+        "version INTEGER PRIMARY KEY, description VARCHAR NOT NULL, applied_at VARCHAR NOT NULL)"
+    ))
+
+
+def get_schema_version(connection) -> int:
+    ensure_schema_version_table(connection)
+    version = connection.execute(text(f"SELECT MAX(version) FROM {SCHEMA_VERSION_TABLE}")).scalar()
+    return version or 0
+
+
+def run_migrations(bind=engine):
+    """Apply pending migrations in order; returns the list of versions applied."""
+    applied = []
+    with bind.begin() as connection:
+        current_version = get_schema_version(connection)
+
+    for version, description, migrate in MIGRATIONS:
+        if version <= current_version:
+            continue
+        with bind.begin() as connection:
+            migrate(connection)
+            connection.execute(
+                text(
+                    f"INSERT INTO {SCHEMA_VERSION_TABLE} (version, description, applied_at) "
+                    "VALUES (:version, :description, :applied_at)"
+                ),
+                {
+                    "version": version,
+                    "description": description,
+                    "applied_at": datetime.now().isoformat(timespec="seconds"),
+                },
+            )
+        applied.append(version)
+    return applied
+
+
+if __name__ == "__main__":
+    try:
+        from .database import Base
+        from . import models  # noqa: F401
+    except ImportError:
+        from database import Base
+        import models  # noqa: F401
+
+    Base.metadata.create_all(bind=engine)
+    applied_versions = run_migrations(engine)
+    print(f"Applied migrations: {applied_versions or 'none'}")
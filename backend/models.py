@@ -1,4 +1,6 @@
-from sqlalchemy import Column, Integer, String, Date, ForeignKey, Enum
+from datetime import date as calendar_date
+
+from sqlalchemy import Column, Integer, String, Date, Float, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 import enum
 
@@ -31,11 +33,25 @@ class MachineGroup(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, unique=True, index=True)
 
+# valid_to of the plan an employee has not changed since.
+PLAN_OPEN_END = calendar_date(9999, 12, 31)
+
 class PlanItem(Base):
     __tablename__ = "plan_items"
+    __table_args__ = (
+        Index("ix_plan_items_employee_id_date", "employee_id", "date"),
+        Index("ix_plan_items_valid_to_date", "valid_to", "date"),
+        # History pages walk these newest first; SQLite appends the rowid (id)
+        # to every index, so a (date, id) cursor seeks straight to the page.
+        Index("ix_plan_items_machine_group_id_date", "machine_group_id", "date"),
+        Index("ix_plan_items_article_id_date", "article_id", "date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
+    # A plan carries forward until the employee's next change: the item is
+    # effective from `date` through `valid_to`, maintained by plan_intervals.py.
     date = Column(Date, index=True)
+    valid_to = Column(Date, default=PLAN_OPEN_END)
 
     employee_id = Column(Integer, ForeignKey("employees.id"))
     article_id = Column(Integer, ForeignKey("articles.id"))
@@ -52,8 +68,92 @@ class PlanItem(Base):
 
 class DefaultGoal(Base):
     __tablename__ = "default_goals"
+    __table_args__ = (
+        Index(
+            "uq_default_goals_article_id_machine_group_id",
+            "article_id",
+            "machine_group_id",
+            unique=True,
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     article_id = Column(Integer, ForeignKey("articles.id"))
     machine_group_id = Column(Integer, ForeignKey("machine_groups.id"))
     goal = Column(Integer)
+
+class ImportWatermark(Base):
+    __tablename__ = "import_watermarks"
+
+    id = Column(Integer, primary_key=True, index=True)
+    source = Column(String, unique=True, index=True)
+    file_hash = Column(String)
+    last_date = Column(Date, nullable=True)
+    rows_imported = Column(Integer, default=0)
+
+class DailySummary(Base):
+    """Per day rollup of planned jobs, maintained by the plan write endpoints."""
+
+    __tablename__ = "daily_summary"
+    __table_args__ = (
+        Index("ix_daily_summary_date_employee_id", "date", "employee_id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    date = Column(Date, nullable=False)
+    employee_id = Column(Integer, ForeignKey("employees.id"), nullable=False)
+    machine_group_id = Column(Integer, ForeignKey("machine_groups.id"), nullable=False)
+    article_id = Column(Integer, ForeignKey("articles.id"), nullable=True)
+
+    goal = Column(Integer, default=0)
+    quantity_done = Column(Integer, default=0)
+    item_count = Column(Integer, default=0)
+    planned_count = Column(Integer, default=0)
+    active_count = Column(Integer, default=0)
+    done_count = Column(Integer, default=0)
+
+class ThroughputDay(Base):
+    """Stamped pieces and hours per day, employee, article and machine group.
+
+    Rebuilt from the stamping log for the days each import covers; employee_id
+    is empty for log employee numbers the planner does not know."""
+
+    __tablename__ = "throughput_daily"
+    __table_args__ = (
+        Index("ix_throughput_daily_date", "date"),
+        Index("ix_throughput_daily_article_id_machine_group_id", "article_id", "machine_group_id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    date = Column(Date, nullable=False)
+    employee_id = Column(Integer, ForeignKey("employees.id"), nullable=True)
+    article_id = Column(Integer, ForeignKey("articles.id"), nullable=False)
+    machine_group_id = Column(Integer, ForeignKey("machine_groups.id"), nullable=False)
+
+    quantity = Column(Float, default=0.0)
+    hours = Column(Float, default=0.0)
+    samples = Column(Integer, default=0)
+
+class ThroughputRate(Base):
+    """Pieces per hour over all of throughput_daily, per article and machine
+    group for everyone (employee_id empty) and per employee."""
+
+    __tablename__ = "throughput_rates"
+    __table_args__ = (
+        Index(
+            "ix_throughput_rates_article_id_machine_group_id_employee_id",
+            "article_id",
+            "machine_group_id",
+            "employee_id",
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    article_id = Column(Integer, ForeignKey("articles.id"), nullable=False)
+    machine_group_id = Column(Integer, ForeignKey("machine_groups.id"), nullable=False)
+    employee_id = Column(Integer, ForeignKey("employees.id"), nullable=True)
+
+    quantity = Column(Float, default=0.0)
+    hours = Column(Float, default=0.0)
+    samples = Column(Integer, default=0)
+    pieces_per_hour = Column(Float, nullable=True)
@@ -0,0 +1,187 @@
+import argparse
+import http.client
+import json
+import re
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from datetime import date
+
+try:
+    from .harness import ROOT_DIR, planning_ids, scratch_database
+except ImportError:
+    from harness import ROOT_DIR, planning_ids, scratch_database
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Start uvicorn with several workers on a scratch database and check that "
+        "every worker sees every write: cached reads, /data and /events streams.",
+    )
+    parser.add_argument("--workers", type=int, default=3)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--reads", type=int, default=30,
+                        help="reads per round, each on a new connection so they spread over workers")
+    parser.add_argument("--streams", type=int, default=6, help="/events clients to keep open")
+    return parser.parse_args()
+
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+class Server:
+    def __init__(self, port: int):
+        self.port = port
+
+    def request(self, method: str, path: str, payload=None):
+        # urllib opens a new connection per call, so the kernel picks a worker each time.
+        body = json.dumps(payload).encode() if payload is not None else None
+        request = urllib.request.Request(
+            f"http://127.0.0.1:{self.port}{path}",
+            data=body,
+            method=method,
+            headers={"Content-Type": "application/json"},
+        )
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.read()
+
+    def get_json(self, path: str):
+        return json.loads(self.request("GET", path))
+
+    def worker_pid(self) -> str:
+        text = self.request("GET", "/metrics").decode()
+        return re.search(r'planner_worker_info\{pid="(\d+)"\}', text).group(1)
+
+
+def listen(port: int, received: list, stop: threading.Event):
+    # Heartbeat comments arrive well within the timeout on an idle stream.
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    connection.request("GET", "/events")
+    response = connection.getresponse()
+    while not stop.is_set():
+        line = response.fp.readline()
+        if not line:
+            break
+        # Every stream starts with a connected event; only changes count.
+        if line.startswith(b"event: ") and line[7:].strip() != b"connected":
+            received.append(line[7:].strip().decode())
+    connection.close()
+
+
+def wait_until_ready(server: Server, process: subprocess.Popen, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with code {process.returncode}")
+        try:
+            server.request("GET", "/data")
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("uvicorn did not start in time")
+
+
+def run_checks(args, server: Server) -> list:
+    errors = []
+    pids = {server.worker_pid() for _ in range(args.workers * 10)}
+    print(f"Requests were served by {len(pids)} of {args.workers} worker processes.")
+    if len(pids) < 2:
+        errors.append("only one worker answered; the checks below prove nothing")
+
+    reference_data = server.get_json("/data")
+    article_id = reference_data["articles"][0]["id"]
+    machine_group_id = planning_ids(reference_data).machine_groups[0]
+
+    stop = threading.Event()
+    streams = [[] for _ in range(args.streams)]
+    listeners = [
+        threading.Thread(target=listen, args=(server.port, received, stop), daemon=True)
+        for received in streams
+    ]
+    for listener in listeners:
+        listener.start()
+    time.sleep(1)
+
+    today = date.today().isoformat()
+    for round_number in range(args.rounds):
+        # Warm every worker's response cache before the write.
+        for _ in range(args.reads):
+            server.request("GET", f"/plan?target_date={today}")
+
+        employee = json.loads(server.request(
+            "POST", "/employees", {"number": f"MW{round_number:04d}", "name": f"Worker check {round_number}"},
+        ))
+        item = json.loads(server.request("POST", "/plan", {
+            "employee_id": employee["id"],
+            "article_id": article_id,
+            "machine_group_id": machine_group_id,
+            "goal": 10 + round_number,
+            "date": today,
+            "status": "active",
+        }))
+
+        stale_plans = sum(
+            item["id"] not in {row["id"] for row in server.get_json(f"/plan?target_date={today}")}
+            for _ in range(args.reads)
+        )
+        stale_data = sum(
+            employee["id"] not in {row["id"] for row in server.get_json("/data")["employees"]}
+            for _ in range(args.reads)
+        )
+        if stale_plans or stale_data:
+            errors.append(
+                f"round {round_number}: {stale_plans}/{args.reads} stale /plan and "
+                f"{stale_data}/{args.reads} stale /data reads right after the write"
+            )
+
+    # Other workers announce the writes within PLANNER_CHANGE_POLL_SECONDS.
+    time.sleep(3)
+    stop.set()
+    for index, received in enumerate(streams):
+        if not received:
+            errors.append(f"/events client {index} received no event")
+    print(f"/events clients received {[len(received) for received in streams]} events.")
+    return errors
+
+
+def main():
+    args = parse_args()
+    # The workers inherit the scratch database settings from this process.
+    with scratch_database("planner-workers-", workers=args.workers):
+        return check_workers(args)
+
+
+def check_workers(args):
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--port", str(port),
+         "--workers", str(args.workers), "--log-level", "warning",
+         # Open /events streams would otherwise hold up the shutdown.
+         "--timeout-graceful-shutdown", "2"],
+        cwd=ROOT_DIR,
+    )
+    server = Server(port)
+    try:
+        wait_until_ready(server, process)
+        errors = run_checks(args, server)
+    except urllib.error.HTTPError as exc:
+        errors = [f"{exc.url}: {exc.code} {exc.read().decode(errors='replace')}"]
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+    print(f"workers={args.workers} rounds={args.rounds} errors={len(errors)}")
+    for error in errors[:10]:
+        print(f"  {error}")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,199 @@
+import argparse
+import random
+import sys
+from datetime import date, timedelta
+
+try:
+    from .harness import app_client, planning_ids, scratch_database
+except ImportError:
+    from harness import app_client, planning_ids, scratch_database
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Check what /plan/batch and /plan/copy do to a plan: the max-jobs rule, "
+        "leave entries replacing the day, and that a copy changes exactly the target range.",
+    )
+    parser.add_argument("--copies", type=int, default=40, help="random copies to check")
+    parser.add_argument("--employees", type=int, default=5)
+    parser.add_argument("--days", type=int, default=30, help="length of the planned window")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    with scratch_database("planner-edits-"):
+        with app_client() as client:
+            return check_plan_edits(args, client)
+
+
+def day_signatures(client, start: date, days: int) -> dict:
+    """{day: {employee_id: sorted job tuples}} as /plan/range shows the plan."""
+    response = client.get(f"/plan/range?start={start}&days={days}")
+    response.raise_for_status()
+    signatures = {}
+    for day_text, items in response.json().items():
+        by_employee = {}
+        for item in items:
+            by_employee.setdefault(item["employee"]["id"], []).append((
+                item["machine_group"]["id"],
+                (item["article"] or {}).get("id"),
+                item["goal"],
+                item["status"],
+                item["comment"],
+            ))
+        signatures[date.fromisoformat(day_text)] = {
+            employee_id: sorted(jobs) for employee_id, jobs in by_employee.items()
+        }
+    return signatures
+
+
+def check_batches(client, ids, errors: list):
+    from sqlalchemy import select
+
+    from backend.database import engine
+    from backend.main import MAX_JOBS_PER_DAY
+    from backend.models import PlanItem
+
+    employee_id = ids.employees[0]
+    day = str(date.today() + timedelta(days=1))
+
+    def job(index: int, **values) -> dict:
+        return {
+            "employee_id": employee_id,
+            "article_id": ids.articles[index % len(ids.articles)],
+            "machine_group_id": ids.machine_groups[index % len(ids.machine_groups)],
+            "goal": 10 + index,
+            "date": day,
+            **values,
+        }
+
+    def day_items() -> list:
+        # Plan history leaves out leave entries, so read the rows themselves.
+        with engine.connect() as connection:
+            return connection.execute(
+                select(PlanItem.id, PlanItem.machine_group_id)
+                .where(PlanItem.employee_id == employee_id, PlanItem.date == date.fromisoformat(day))
+                .order_by(PlanItem.id)
+            ).all()
+
+    def expect(condition: bool, message: str):
+        if not condition:
+            errors.append(f"batch: {message}")
+
+    response = client.post("/plan/batch", json={"create": [job(index) for index in range(MAX_JOBS_PER_DAY + 1)]})
+    expect(response.status_code == 400, f"{MAX_JOBS_PER_DAY + 1} jobs on one day gave HTTP {response.status_code}")
+    expect(not day_items(), "a refused batch still saved items")
+
+    response = client.post("/plan/batch", json={"create": [job(index) for index in range(MAX_JOBS_PER_DAY)]})
+    expect(response.status_code == 200, f"{MAX_JOBS_PER_DAY} jobs on one day gave HTTP {response.status_code}")
+    jobs = [item["id"] for item in response.json().get("created", [])]
+
+    # Deletes run first, so a full day has room for a job created in the same batch.
+    response = client.post("/plan/batch", json={"delete": jobs[:1], "create": [job(9)]})
+    expect(response.status_code == 200, f"delete one and create one on a full day gave HTTP {response.status_code}")
+    response = client.post("/plan/batch", json={"create": [job(10)]})
+    expect(response.status_code == 400, f"a fifth job gave HTTP {response.status_code}")
+    expect(len(day_items()) == MAX_JOBS_PER_DAY, f"the day has {len(day_items())} items")
+
+    # A leave entry replaces the day, including an item updated earlier in the batch.
+    updated_id = day_items()[0].id
+    response = client.post("/plan/batch", json={
+        "update": [{"id": updated_id, "goal": 99}],
+        "create": [job(0, machine_group_id=None, article_id=None)],
+    })
+    expect(response.status_code == 200, f"leave entry after an update gave HTTP {response.status_code}")
+    body = response.json()
+    expect(not body.get("updated"), f"the replaced item {updated_id} was returned as updated")
+    items = day_items()
+    expect(
+        len(items) == 1 and items[0].machine_group_id is None,
+        f"after a leave entry the day has {len(items)} items",
+    )
+
+    # A job replaces the leave entry again.
+    response = client.post("/plan/batch", json={"create": [job(1), job(2)]})
+    expect(response.status_code == 200, f"jobs on a leave day gave HTTP {response.status_code}")
+    items = day_items()
+    expect(
+        len(items) == 2 and all(item.machine_group_id is not None for item in items),
+        f"jobs on a leave day left {len(items)} items, leave entry kept: "
+        f"{any(item.machine_group_id is None for item in items)}",
+    )
+
+
+def check_copies(args, client, ids, errors: list):
+    from backend.main import MAX_PLAN_RANGE_DAYS
+
+    rng = random.Random(args.seed)
+    first_day = date.today()
+    # The first employee's day is left as the batch checks made it.
+    employee_ids = ids.employees[1:args.employees + 1]
+    # Compare beyond the planned window, where the last plans carry forward.
+    compared_days = min(args.days + 14, MAX_PLAN_RANGE_DAYS)
+
+    for employee_id in employee_ids:
+        for offset in sorted(rng.sample(range(args.days), args.days // 4)):
+            create = [{
+                "employee_id": employee_id,
+                "date": str(first_day + timedelta(days=offset)),
+                "goal": rng.randint(0, 200),
+                "status": rng.choice(["planned", "active"]),
+                "comment": rng.choice([None, "Kväll"]),
+            }]
+            if rng.random() < 0.85:
+                create[0]["article_id"] = rng.choice(ids.articles)
+                create[0]["machine_group_id"] = rng.choice(ids.machine_groups)
+                create += [
+                    {**create[0], "article_id": rng.choice(ids.articles), "goal": rng.randint(0, 200)}
+                    for _ in range(rng.randint(0, 2))
+                ]
+            client.post("/plan/batch", json={"create": create}).raise_for_status()
+
+    for round_number in range(args.copies):
+        days = rng.randint(1, 10)
+        source_start = first_day + timedelta(days=rng.randrange(args.days))
+        target_start = first_day + timedelta(days=rng.randrange(args.days))
+        if source_start == target_start:
+            continue
+        target_end = target_start + timedelta(days=days - 1)
+        before = day_signatures(client, first_day, compared_days)
+        source = day_signatures(client, source_start, days)
+
+        response = client.post("/plan/copy", json={
+            "source_start": str(source_start), "target_start": str(target_start), "days": days,
+        })
+        if response.status_code != 200:
+            errors.append(f"copy {round_number}: HTTP {response.status_code} {response.text[:200]}")
+            continue
+
+        after = day_signatures(client, first_day, compared_days)
+        for day, plan in after.items():
+            if target_start <= day <= target_end:
+                expected = source[source_start + (day - target_start)]
+                where = f"target day {day} (source {source_start + (day - target_start)})"
+            else:
+                expected = before[day]
+                where = f"{day}, outside the target {target_start}..{target_end}"
+            for employee_id in set(plan) | set(expected):
+                if plan.get(employee_id, []) != expected.get(employee_id, []):
+                    errors.append(
+                        f"copy {round_number} of {days} days from {source_start}: employee "
+                        f"{employee_id} has a different plan on {where}"
+                    )
+
+
+def check_plan_edits(args, client):
+    ids = planning_ids(client.get("/data").json())
+    errors = []
+    check_batches(client, ids, errors)
+    check_copies(args, client, ids, errors)
+    print(f"copies={args.copies} errors={len(errors)}")
+    for error in errors[:10]:
+        print(f"  {error}")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,204 @@
+import argparse
+import random
+import sys
+from datetime import date, timedelta
+
+try:
+    from .harness import app_client, planning_ids, scratch_database
+except ImportError:
+    from harness import app_client, planning_ids, scratch_database
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Make random plan edits through the API and compare /plan and /plan/range "
+        "with the original lookup (each employee's latest plan date on or before the day).",
+    )
+    parser.add_argument("--operations", type=int, default=600)
+    parser.add_argument("--compare-every", type=int, default=100, help="operations between comparisons")
+    parser.add_argument("--employees", type=int, default=6)
+    parser.add_argument("--days", type=int, default=40, help="length of the window edits are dated in")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    # Cached bodies would hide what the queries return.
+    with scratch_database("planner-intervals-", response_cache_size=0):
+        with app_client() as client:
+            return check_plan_intervals(args, client)
+
+
+def response_row(item: dict) -> tuple:
+    return (
+        item["id"],
+        date.fromisoformat(item["date"]),
+        item["employee"]["id"],
+        (item["article"] or {}).get("id"),
+        (item["machine_group"] or {}).get("id"),
+        item["goal"],
+        item["quantity_done"],
+        item["status"],
+        item["comment"],
+    )
+
+
+def check_plan_intervals(args, client):
+    from sqlalchemy import and_, func, select
+
+    from backend import models
+    from backend.database import engine
+    from backend.main import MAX_PLAN_RANGE_DAYS
+
+    PlanItem = models.PlanItem
+
+    def baseline_plan(connection, target_date: date) -> list:
+        # The lookup /plan used before plan items had valid_to.
+        latest = select(
+            PlanItem.employee_id,
+            func.max(PlanItem.date).label("max_date"),
+        ).where(PlanItem.date <= target_date).group_by(PlanItem.employee_id).subquery()
+        rows = connection.execute(
+            select(
+                PlanItem.id,
+                PlanItem.date,
+                PlanItem.employee_id,
+                PlanItem.article_id,
+                PlanItem.machine_group_id,
+                PlanItem.goal,
+                PlanItem.quantity_done,
+                PlanItem.status,
+                PlanItem.comment,
+            )
+            .join(latest, and_(
+                PlanItem.employee_id == latest.c.employee_id,
+                PlanItem.date == latest.c.max_date,
+            ))
+            .where(PlanItem.machine_group_id.isnot(None))
+            .order_by(PlanItem.id.asc())
+        ).all()
+        return [tuple(row) for row in rows]
+
+    reference_data = client.get("/data").json()
+    ids = planning_ids(reference_data)
+    employee_ids = ids.employees[:args.employees]
+    # Leave groups such as Sjuk are planned like any other group.
+    machine_group_ids = [group["id"] for group in reference_data["machine_groups"]]
+    rng = random.Random(args.seed)
+    first_day = date.today()
+
+    def random_day() -> date:
+        return first_day + timedelta(days=rng.randrange(args.days))
+
+    def new_item(leave: bool = False) -> dict:
+        item = {
+            "employee_id": rng.choice(employee_ids),
+            "goal": rng.randint(0, 200),
+            "date": str(random_day()),
+            "status": rng.choice(["planned", "active", "done"]),
+            "comment": rng.choice([None, "Morgon", "Kväll"]),
+        }
+        # Without a machine group the item is a leave entry for the whole day.
+        if not leave:
+            item["article_id"] = rng.choice(ids.articles)
+            item["machine_group_id"] = rng.choice(machine_group_ids)
+        return item
+
+    def item_changes() -> dict:
+        return {
+            "goal": rng.randint(0, 200),
+            "status": rng.choice(["planned", "active", "done"]),
+            "quantity_done": rng.randint(0, 50),
+        }
+
+    def existing_ids() -> list:
+        with engine.connect() as connection:
+            return list(connection.execute(select(PlanItem.id).order_by(PlanItem.id)).scalars())
+
+    def new_batch() -> dict:
+        item_ids = existing_ids()
+        rng.shuffle(item_ids)
+        return {
+            "delete": item_ids[:2],
+            "update": [{"id": item_id, **item_changes()} for item_id in item_ids[2:3]],
+            "create": [new_item(leave=rng.random() < 0.2) for _ in range(rng.randint(1, 4))],
+        }
+
+    operations = [
+        (0.35, lambda: client.post("/plan", json=new_item())),
+        (0.10, lambda: client.post("/plan", json=new_item(leave=True))),
+        (0.15, lambda: client.put(f"/plan/{rng.choice(existing_ids())}", json=item_changes())),
+        (0.20, lambda: client.delete(f"/plan/{rng.choice(existing_ids())}")),
+        (0.12, lambda: client.post("/plan/batch", json=new_batch())),
+        (0.08, lambda: client.post("/plan/copy", json={
+            "source_start": str(random_day()),
+            "target_start": str(random_day()),
+            "days": rng.randint(1, 7),
+        })),
+    ]
+
+    errors = []
+    counts = {"operations": 0, "rejected": 0, "days": 0, "ranges": 0}
+    # Days before the first plan and long after the last one are compared too.
+    compared_days = [first_day + timedelta(days=offset) for offset in range(-3, args.days + 3)]
+    compared_days.append(first_day + timedelta(days=args.days + 365))
+
+    def compare():
+        with engine.connect() as connection:
+            expected = {day: baseline_plan(connection, day) for day in compared_days}
+        for day in compared_days:
+            response = client.get(f"/plan?target_date={day}")
+            response.raise_for_status()
+            counts["days"] += 1
+            actual = [response_row(item) for item in response.json()]
+            if actual != expected[day]:
+                errors.append(
+                    f"after {counts['operations']} operations: /plan on {day} returned items "
+                    f"{[row[0] for row in actual]}, expected {[row[0] for row in expected[day]]}"
+                )
+
+        starts = [compared_days[0]] + [rng.choice(compared_days[:-1]) for _ in range(5)]
+        for start in starts:
+            days = rng.randint(1, MAX_PLAN_RANGE_DAYS)
+            response = client.get(f"/plan/range?start={start}&days={days}")
+            response.raise_for_status()
+            counts["ranges"] += 1
+            with engine.connect() as connection:
+                for day_text, items in response.json().items():
+                    day = date.fromisoformat(day_text)
+                    actual = [response_row(item) for item in items]
+                    if actual != baseline_plan(connection, day):
+                        errors.append(
+                            f"after {counts['operations']} operations: /plan/range from {start} "
+                            f"for {days} days differs on {day}"
+                        )
+
+    weights = [weight for weight, _ in operations]
+    for index in range(args.operations):
+        if not existing_ids():
+            send = operations[0][1]
+        else:
+            send = rng.choices([operation for _, operation in operations], weights)[0]
+        response = send()
+        counts["operations"] += 1
+        if response.status_code in (400, 422):
+            # Max jobs per day and copies onto their own source are refused.
+            counts["rejected"] += 1
+        elif response.status_code >= 300:
+            errors.append(f"operation {index}: HTTP {response.status_code} {response.text[:200]}")
+        if (index + 1) % args.compare_every == 0 or index + 1 == args.operations:
+            compare()
+
+    print(
+        f"operations={counts['operations']} rejected={counts['rejected']} "
+        f"plan_items={len(existing_ids())} days_compared={counts['days']} "
+        f"ranges_compared={counts['ranges']} errors={len(errors)}"
+    )
+    for error in errors[:10]:
+        print(f"  {error}")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+from datetime import date, timedelta
+from typing import Iterable, Tuple
+
+from sqlalchemy import Date, and_, text
+from sqlalchemy.sql.expression import UnaryExpression
+from sqlalchemy.sql.operators import custom_op
+
+try:
+    from .models import PLAN_OPEN_END, PlanItem
+except ImportError:
+    from models import PLAN_OPEN_END, PlanItem
+
+# An employee's items on one date stay effective until the day before that
+# employee's next plan date, or open-ended when there is none.
+VALID_TO = (
+    "COALESCE(("
+    "SELECT date(MIN(next_item.date), '-1 day') FROM plan_items AS next_item "
+    "WHERE next_item.employee_id = plan_items.employee_id AND next_item.date > plan_items.date"
+    f"), '{PLAN_OPEN_END.isoformat()}')"
+)
+
+
+def effective_between(start: date, end: date):
+    """Filter for plan items effective on any day from start through end.
+
+    The unary plus on `date` stops SQLite from choosing the single-column date
+    index, which would walk the whole history before `end`; the range scan on
+    (valid_to, date) only visits plans still effective on `start`."""
+    unindexed_date = UnaryExpression(PlanItem.date, operator=custom_op("+"), type_=Date())
+    return and_(PlanItem.valid_to >= start, unindexed_date <= end)
+
+
+def refresh_plan_intervals(connection, keys: Iterable[Tuple[int, date]]):
+    """Recompute valid_to after items were added to or removed from the given
+    (employee_id, date) days: only that day and the employee's previous plan
+    date can change."""
+    params = [
+        {"employee_id": employee_id, "day": day.isoformat()}
+        for employee_id, day in set(keys)
+    ]
+    if not params:
+        return
+    connection.execute(
+        text(
+            f"UPDATE plan_items SET valid_to = {VALID_TO} "
+            "WHERE employee_id = :employee_id AND date IN (:day, ("
+            "SELECT MAX(date) FROM plan_items WHERE employee_id = :employee_id AND date < :day))"
+        ),
+        params,
+    )
+
+
+def refresh_plan_intervals_from(connection, start: date):
+    """Recompute valid_to for every plan still effective on the day before start."""
+    connection.execute(
+        text(f"UPDATE plan_items SET valid_to = {VALID_TO} WHERE valid_to >= :day_before"),
+        {"day_before": (start - timedelta(days=1)).isoformat()},
+    )
+
+
+def rebuild_plan_intervals(connection):
+    connection.execute(text(f"UPDATE plan_items SET valid_to = {VALID_TO}"))
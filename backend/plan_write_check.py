@@ -0,0 +1,132 @@
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import date, timedelta
+
+try:
+    from .harness import app_client, planning_ids, scratch_database
+except ImportError:
+    from harness import app_client, planning_ids, scratch_database
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Let parallel planners create plan items on the same few days and "
+        "article/machine group pairs, then check the max-jobs rule and default goals held "
+        "and report saves per second.",
+    )
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--employees", type=int, default=4, help="employees the writers share")
+    parser.add_argument("--days", type=int, default=3, help="dates the writers share")
+    parser.add_argument("--pairs", type=int, default=2, help="article/machine group pairs the writers share")
+    # Leave entries clear the day again, so the days keep filling up to the limit.
+    parser.add_argument("--leave-share", type=float, default=0.25,
+                        help="fraction of saves that are leave entries replacing the day")
+    parser.add_argument("--profile", default=os.environ.get("PLANNER_SQLITE_PROFILE", "wal"))
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    with scratch_database("planner-writes-", sqlite_profile=args.profile):
+        with app_client() as client:
+            return check_plan_writes(args, client)
+
+
+def check_plan_writes(args, client):
+    from sqlalchemy import event, text
+
+    from backend.database import async_engine, engine
+    from backend.main import MAX_JOBS_PER_DAY
+
+    ids = planning_ids(client.get("/data").json())
+    employee_ids = ids.employees[:args.employees]
+    pairs = [(ids.articles[index], ids.machine_groups[index]) for index in range(args.pairs)]
+    days = [date.today() + timedelta(days=offset) for offset in range(args.days)]
+
+    statements = Counter()
+
+    def count_statement(_conn, _cursor, _statement, _parameters, _context, _executemany):
+        statements["total"] += 1
+
+    event.listen(engine, "before_cursor_execute", count_statement)
+    if async_engine is not None:
+        event.listen(async_engine.sync_engine, "before_cursor_execute", count_statement)
+
+    counts = Counter()
+    errors = []
+    lock = threading.Lock()
+    deadline = time.monotonic() + args.seconds
+
+    def writer(seed):
+        rng = random.Random(seed)
+        while time.monotonic() < deadline:
+            payload = {
+                "employee_id": rng.choice(employee_ids),
+                "goal": rng.randint(0, 200),
+                "date": str(rng.choice(days)),
+                "status": "planned",
+            }
+            # Without a machine group the item is a leave entry for the whole day.
+            if rng.random() >= args.leave_share:
+                payload["article_id"], payload["machine_group_id"] = rng.choice(pairs)
+            try:
+                response = client.post("/plan", json=payload)
+            except Exception as exc:
+                with lock:
+                    errors.append(f"save: {exc}")
+                continue
+            with lock:
+                if response.status_code == 201:
+                    counts["saved"] += 1
+                elif response.status_code == 400:
+                    counts["rejected"] += 1
+                else:
+                    errors.append(f"save: HTTP {response.status_code} {response.text[:200]}")
+
+    threads = [threading.Thread(target=writer, args=(seed,)) for seed in range(args.writers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    requests = counts["saved"] + counts["rejected"] + len(errors)
+
+    with engine.connect() as connection:
+        over_limit = connection.execute(text(
+            "SELECT employee_id, date, COUNT(*) FROM plan_items WHERE machine_group_id IS NOT NULL "
+            "GROUP BY employee_id, date HAVING COUNT(*) > :limit"
+        ), {"limit": MAX_JOBS_PER_DAY}).all()
+        mixed_days = connection.execute(text(
+            "SELECT employee_id, date FROM plan_items GROUP BY employee_id, date "
+            "HAVING COUNT(*) > 1 AND SUM(machine_group_id IS NULL) > 0"
+        )).all()
+        duplicate_goals = connection.execute(text(
+            "SELECT article_id, machine_group_id FROM default_goals "
+            "GROUP BY article_id, machine_group_id HAVING COUNT(*) > 1"
+        )).all()
+    for employee_id, day, jobs in over_limit:
+        errors.append(f"employee {employee_id} has {jobs} jobs on {day}")
+    for employee_id, day in mixed_days:
+        errors.append(f"employee {employee_id} has a leave entry and other items on {day}")
+    for article_id, machine_group_id in duplicate_goals:
+        errors.append(f"several default goals for article {article_id}, machine group {machine_group_id}")
+
+    print(
+        f"profile={args.profile} writers={args.writers} saved={counts['saved']} "
+        f"rejected_max_jobs={counts['rejected']} saves_per_second={counts['saved'] / elapsed:.1f} "
+        f"statements_per_request={statements['total'] / max(requests, 1):.1f} errors={len(errors)}"
+    )
+    for error in errors[:10]:
+        print(f"  {error}")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+import asyncio
+import cProfile
+import functools
+import hmac
+import io
+import itertools
+import json
+import os
+import pstats
+import random
+import re
+import time
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import event
+
+# Off unless a token is configured: then no middleware, SQL listener or
+# endpoint wrapper is installed at all.
+PROFILE_TOKEN = os.environ.get("PLANNER_PROFILE_TOKEN", "")
+PROFILING_ENABLED = bool(PROFILE_TOKEN)
+PROFILE_HEADER = "x-planner-profile"
+SAMPLE_RATE = float(os.environ.get("PLANNER_PROFILE_SAMPLE_RATE", 0))
+PROFILE_DIR = Path(
+    os.environ.get("PLANNER_PROFILE_DIR", Path(__file__).resolve().parent.parent / "profiles")
+)
+KEEP_PROFILES = int(os.environ.get("PLANNER_PROFILE_KEEP", 50))
+# The listing and download routes are never profiled themselves.
+UNPROFILED_PREFIX = "/profiles"
+PROFILE_NAME_PATTERN = re.compile(r"^[0-9T-]+\.(prof|json)$")
+TOP_FUNCTIONS = 40
+MAX_PARAMETERS_LENGTH = 300
+
+_sequence = itertools.count()
+
+
+class RequestProfile:
+    """cProfile data and SQL statements of one request."""
+
+    def __init__(self, scope, reason: str):
+        self.method = scope["method"]
+        self.path = scope["path"]
+        self.query_string = scope.get("query_string", b"").decode("latin-1")
+        self.reason = reason
+        self.started_at = datetime.now()
+        self.profiler = cProfile.Profile()
+        self.statements = []
+
+    def run(self, function, *args, **kwargs):
+        # Sync endpoints run in a threadpool thread and cProfile only sees the
+        # thread it is enabled in, so it wraps the endpoint body, not the request.
+        return self.profiler.runcall(function, *args, **kwargs)
+
+
+current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("current_profile", default=None)
+
+
+def profiled(endpoint):
+    """Run endpoint under the request's profiler when the request is profiled."""
+
+    @functools.wraps(endpoint)
+    def run_endpoint(*args, **kwargs):
+        profile = current_profile.get()
+        if profile is None:
+            return endpoint(*args, **kwargs)
+        return profile.run(endpoint, *args, **kwargs)
+
+    return run_endpoint
+
+
+def token_matches(value: Optional[str]) -> bool:
+    return bool(value) and hmac.compare_digest(value.encode(), PROFILE_TOKEN.encode())
+
+
+def header_value(scope, name: str) -> Optional[str]:
+    for key, value in scope.get("headers", ()):
+        if key.decode("latin-1").lower() == name:
+            return value.decode("latin-1")
+    return None
+
+
+def profile_reason(scope) -> Optional[str]:
+    if scope["path"].startswith(UNPROFILED_PREFIX):
+        return None
+    if token_matches(header_value(scope, PROFILE_HEADER)):
+        return "header"
+    if SAMPLE_RATE and random.random() < SAMPLE_RATE:
+        return "sample"
+    return None
+
+
+def write_profile(profile: RequestProfile, status: int, seconds: float, directory: Path = PROFILE_DIR):
+    directory.mkdir(parents=True, exist_ok=True)
+    name = f"{profile.started_at:%Y%m%dT%H%M%S}-{os.getpid()}-{next(_sequence)}"
+    profile.profiler.dump_stats(directory / f"{name}.prof")
+
+    summary = io.StringIO()
+    stats = pstats.Stats(profile.profiler, stream=summary)
+    stats.sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+    sql_ms = sum(statement["ms"] for statement in profile.statements)
+    report = {
+        "name": name,
+        "method": profile.method,
+        "path": profile.path,
+        "query_string": profile.query_string,
+        "reason": profile.reason,
+        "status": status,
+        "started_at": profile.started_at.isoformat(timespec="milliseconds"),
+        "duration_ms": round(seconds * 1000, 3),
+        "sql_count": len(profile.statements),
+        "sql_ms": round(sql_ms, 3),
+        "statements": profile.statements,
+        "top_functions": summary.getvalue(),
+    }
+    (directory / f"{name}.json").write_text(json.dumps(report, indent=1), encoding="utf-8")
+    rotate_profiles(directory)
+    return name
+
+
+def rotate_profiles(directory: Path = PROFILE_DIR, keep: int = KEEP_PROFILES):
+    reports = sorted(directory.glob("*.json"), key=lambda path: path.stat().st_mtime, reverse=True)
+    for report in reports[keep:]:
+        report.unlink(missing_ok=True)
+        report.with_suffix(".prof").unlink(missing_ok=True)
+
+
+def list_profiles(directory: Path = PROFILE_DIR) -> list:
+    """Newest first, without the statements and function listing."""
+    if not directory.is_dir():
+        return []
+    profiles = []
+    for path in sorted(directory.glob("*.json"), key=lambda path: path.stat().st_mtime, reverse=True):
+        try:
+            report = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue  # rotated away or half written by another worker
+        report.pop("statements", None)
+        report.pop("top_functions", None)
+        profiles.append(report)
+    return profiles
+
+
+def profile_path(file_name: str, directory: Path = PROFILE_DIR) -> Optional[Path]:
+    if not PROFILE_NAME_PATTERN.match(file_name):
+        return None
+    path = directory / file_name
+    return path if path.is_file() else None
+
+
+class ProfilingMiddleware:
+    """Profile requests that carry the token header, or a sampled fraction."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        reason = profile_reason(scope) if scope["type"] == "http" else None
+        if reason is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(scope, reason)
+        token = current_profile.set(profile)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            current_profile.reset(token)
+            await asyncio.to_thread(write_profile, profile, status, time.perf_counter() - started)
+
+
+def capture_statements(engine):
+    """Record SQL text, parameters and timing for profiled requests."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def start_statement(conn, _cursor, _statement, _parameters, _context, _executemany):
+        if current_profile.get() is not None:
+            conn.info.setdefault("profile_statement_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def finish_statement(conn, _cursor, statement, parameters, _context, executemany):
+        profile = current_profile.get()
+        if profile is None or not conn.info.get("profile_statement_started"):
+            return
+        elapsed = time.perf_counter() - conn.info["profile_statement_started"].pop()
+        profile.statements.append({
+            "sql": " ".join(statement.split()),
+            "parameters": repr(parameters)[:MAX_PARAMETERS_LENGTH],
+            "executemany": executemany,
+            "ms": round(elapsed * 1000, 3),
+        })
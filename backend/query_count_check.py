@@ -0,0 +1,104 @@
+import argparse
+import sys
+from datetime import date, timedelta
+
+try:
+    from .harness import app_client, planning_ids, scratch_database
+except ImportError:
+    from harness import app_client, planning_ids, scratch_database
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Count the SQL statements /plan and /plan/range run at a small and a large "
+        "plan size and fail if the count grows with the plan.",
+    )
+    parser.add_argument("--small", type=int, default=3, help="employees planned in the first round")
+    parser.add_argument("--large", type=int, default=20, help="employees planned in the second round")
+    parser.add_argument("--days", type=int, default=7)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    # Cached bodies would skip the queries being counted.
+    with scratch_database("planner-queries-", response_cache_size=0):
+        return check_query_counts(args)
+
+
+def check_query_counts(args):
+    from sqlalchemy import event
+
+    from backend.database import async_engine, engine
+    from backend.main import MAX_JOBS_PER_DAY
+
+    statements = []
+
+    def count_statement(_conn, _cursor, statement, _parameters, _context, _executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count_statement)
+    if async_engine is not None:
+        event.listen(async_engine.sync_engine, "before_cursor_execute", count_statement)
+
+    start = date.today()
+    urls = {
+        "/plan": f"/plan?target_date={start}",
+        "/plan/range": f"/plan/range?start={start}&days={args.days}",
+    }
+
+    with app_client() as client:
+        ids = planning_ids(client.get("/data").json())
+        if len(ids.employees) < args.large:
+            sys.exit(f"Only {len(ids.employees)} employees are seeded; pass a smaller --large.")
+
+        def plan_employees(first: int, last: int):
+            # Four jobs on the first day and one on each later day, so the
+            # responses have many items, articles and machine groups to load.
+            for index, employee_id in enumerate(ids.employees[first:last], start=first):
+                for offset in range(args.days):
+                    for job in range(MAX_JOBS_PER_DAY if offset == 0 else 1):
+                        response = client.post("/plan", json={
+                            "employee_id": employee_id,
+                            "article_id": ids.articles[(index + offset + job) % len(ids.articles)],
+                            "machine_group_id": ids.machine_groups[(index + job) % len(ids.machine_groups)],
+                            "goal": 10 + offset,
+                            "date": str(start + timedelta(days=offset)),
+                        })
+                        response.raise_for_status()
+
+        def count_queries():
+            counts, items = {}, {}
+            for name, url in urls.items():
+                client.get(url).raise_for_status()  # warm the reference registry
+                statements.clear()
+                response = client.get(url)
+                response.raise_for_status()
+                counts[name] = len(statements)
+                body = response.json()
+                items[name] = len(body) if isinstance(body, list) else sum(map(len, body.values()))
+            return counts, items
+
+        plan_employees(0, args.small)
+        small_counts, small_items = count_queries()
+        plan_employees(args.small, args.large)
+        large_counts, large_items = count_queries()
+
+    errors = []
+    for name in urls:
+        print(
+            f"{name:<12} {small_items[name]:>5} items: {small_counts[name]} statements, "
+            f"{large_items[name]:>5} items: {large_counts[name]} statements"
+        )
+        if small_counts[name] != large_counts[name]:
+            errors.append(f"{name} ran {small_counts[name]} then {large_counts[name]} statements")
+        if large_items[name] <= small_items[name]:
+            errors.append(f"{name} did not return more items for the larger plan")
+    print(f"errors={len(errors)}")
+    for error in errors:
+        print(f"  {error}")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+import argparse
+import re
+import sys
+from datetime import date, timedelta
+
+try:
+    from .harness import app_client, planning_ids, scratch_database
+except ImportError:
+    from harness import app_client, planning_ids, scratch_database
+
+# Tables that stay small however long the plan history gets; a full scan of
+# any other table (plan_items, daily_summary, throughput_daily) fails the check.
+SMALL_TABLES = {
+    "employees", "articles", "machine_groups", "default_goals", "throughput_rates",
+    "import_watermarks", "schema_version", "reference_stamp", "data_stamp",
+}
+EXPLAINED_STATEMENTS = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+SCAN_PATTERN = re.compile(r"^SCAN (\w+)")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Send the plan, history, default goal and attainment requests, run "
+        "EXPLAIN QUERY PLAN on every statement they execute and fail on a full scan "
+        "(covering-index scans included) of a table that grows with the plan history.",
+    )
+    parser.add_argument("--employees", type=int, default=20)
+    parser.add_argument("--years", type=int, default=1)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    # Cached bodies would skip the queries being checked.
+    with scratch_database("planner-plans-", response_cache_size=0):
+        with app_client() as client:
+            return check_query_plans(args, client)
+
+
+def scanned_table(detail: str):
+    """The table a SCAN step reads, or None; aliases such as plan_items_1 are
+    reported under their table."""
+    match = SCAN_PATTERN.match(detail)
+    if match is None or detail.startswith("SCAN CONSTANT ROW"):
+        return None
+    return re.sub(r"_\d+$", "", match.group(1))
+
+
+def check_query_plans(args, client):
+    from sqlalchemy import event
+
+    from backend.database import engine
+    from backend.rollup import set_horizon
+    from backend.synthetic_data import generate
+
+    with engine.begin() as connection:
+        generate(connection, args.employees, args.years, end=date.today() + timedelta(days=14))
+    ids = planning_ids(client.get("/data").json())
+    employee_id, article_id, machine_group_id = ids.employees[0], ids.articles[0], ids.machine_groups[0]
+    today = date.today()
+    tomorrow = today + timedelta(days=1)
+
+    statements = {}
+
+    def record_statement(_conn, _cursor, statement, parameters, _context, executemany):
+        if statement.lstrip().upper().startswith(EXPLAINED_STATEMENTS):
+            # executemany passes a list of rows; RETURNING inserts go row by row.
+            if executemany and isinstance(parameters, list):
+                parameters = parameters[0]
+            statements.setdefault(statement, parameters)
+
+    def employee_history_page():
+        first = client.get(f"/employees/{employee_id}/plan-history?limit=5").json()
+        return f"/employees/{employee_id}/plan-history?limit=5&before={first['next_before']}"
+
+    def attainment_after_catch_up():
+        # The first request of a day extends the rollup for every employee.
+        with engine.begin() as connection:
+            set_horizon(connection, today - timedelta(days=7))
+        return client.get(f"/analytics/attainment?from={today - timedelta(days=7)}&to={today}")
+
+    def create_job(day: date) -> int:
+        response = client.post("/plan", json={
+            "employee_id": employee_id, "article_id": article_id,
+            "machine_group_id": machine_group_id, "goal": 10, "date": str(day),
+        })
+        response.raise_for_status()
+        return response.json()["id"]
+
+    # Each entry: (name, function sending the request); the statements it
+    # runs are collected and explained after it returns.
+    requests = [
+        ("GET /plan", lambda: client.get(f"/plan?target_date={today}")),
+        ("GET /plan/range", lambda: client.get(f"/plan/range?start={today}&days=14")),
+        ("GET /employees/{id}/plan-history", lambda: client.get(employee_history_page())),
+        ("GET /plan/history?machine_group_id", lambda: client.get(
+            f"/plan/history?machine_group_id={machine_group_id}&limit=5&before={today}_0"
+        )),
+        ("GET /plan/history?article_id", lambda: client.get(
+            f"/plan/history?article_id={article_id}&limit=5&before={today}_0"
+        )),
+        ("GET /default-goal", lambda: client.get(
+            f"/default-goal?article_id={article_id}&machine_group_id={machine_group_id}"
+            f"&employee_id={employee_id}"
+        )),
+        ("POST /plan", lambda: create_job(tomorrow)),
+        ("PUT /plan/{id}", lambda: client.put(f"/plan/{create_job(today)}", json={"goal": 5})),
+        ("DELETE /plan/{id}", lambda: client.delete(f"/plan/{create_job(tomorrow)}")),
+        ("POST /plan/batch", lambda: client.post("/plan/batch", json={"create": [{
+            "employee_id": ids.employees[1], "article_id": article_id,
+            "machine_group_id": machine_group_id, "goal": 3, "date": str(tomorrow),
+        }]})),
+        ("POST /plan/copy", lambda: client.post("/plan/copy", json={
+            "source_start": str(today), "target_start": str(today + timedelta(days=7)), "days": 7,
+        })),
+        ("GET /analytics/attainment, extending the rollup", attainment_after_catch_up),
+    ] + [
+        (f"GET /analytics/attainment?group_by={group_by}", lambda group_by=group_by: client.get(
+            f"/analytics/attainment?from={today - timedelta(days=90)}&to={today}&group_by={group_by}"
+        ))
+        for group_by in ("day", "week", "month", "employee", "machine_group", "article")
+    ]
+
+    failures = []
+    explained = 0
+    for name, send in requests:
+        statements.clear()
+        event.listen(engine, "before_cursor_execute", record_statement)
+        try:
+            response = send()
+        finally:
+            event.remove(engine, "before_cursor_execute", record_statement)
+        if hasattr(response, "raise_for_status"):
+            response.raise_for_status()
+
+        scans = []
+        with engine.connect() as connection:
+            for statement, parameters in statements.items():
+                plan = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+                explained += 1
+                for row in plan:
+                    table = scanned_table(row[-1])
+                    if table is not None and table not in SMALL_TABLES:
+                        scans.append((" ".join(statement.split()), row[-1]))
+        print(f"{'SCAN' if scans else 'OK  '} {name} ({len(statements)} statements)")
+        for statement, detail in scans:
+            print(f"       {detail}: {statement[:160]}")
+        failures += scans
+
+    print(f"statements={explained} scans={len(failures)}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
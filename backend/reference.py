@@ -0,0 +1,85 @@
+import os
+import time
+from typing import Dict, NamedTuple
+
+from sqlalchemy import select, text
+from sqlalchemy.engine import Row
+
+try:
+    from .models import Article, Employee, MachineGroup
+    from .workers import MULTI_WORKER
+except ImportError:
+    from models import Article, Employee, MachineGroup
+    from workers import MULTI_WORKER
+
+# Triggers on the reference tables bump this counter (see migrations.py), so
+# changes made by other processes are noticed without reloading the tables.
+REFERENCE_STAMP_TABLE = "reference_stamp"
+REFERENCE_TABLE_NAMES = ("employees", "articles", "machine_groups")
+# With several workers another process may have just written, so check every time.
+REFRESH_SECONDS = float(
+    os.environ.get("PLANNER_REFERENCE_REFRESH_SECONDS", 0 if MULTI_WORKER else 5)
+)
+
+
+class ReferenceSnapshot(NamedTuple):
+    """Id maps of the reference tables, each in name order."""
+
+    version: int
+    employees: Dict[int, Row]
+    articles: Dict[int, Row]
+    machine_groups: Dict[int, Row]
+
+
+def read_reference_stamp(db) -> int:
+    return db.execute(text(f"SELECT version FROM {REFERENCE_STAMP_TABLE} WHERE id = 1")).scalar() or 0
+
+
+def load_reference_snapshot(db, version: int) -> ReferenceSnapshot:
+    def load(*columns):
+        rows = db.execute(select(*columns).order_by(columns[1].asc(), columns[0].asc())).all()
+        return {row.id: row for row in rows}
+
+    return ReferenceSnapshot(
+        version=version,
+        employees=load(Employee.id, Employee.name, Employee.number),
+        articles=load(Article.id, Article.name),
+        machine_groups=load(MachineGroup.id, MachineGroup.name),
+    )
+
+
+class ReferenceRegistry:
+    """In-memory employees, articles and machine groups.
+
+    Writes in this process call invalidate(); writes from other processes are
+    picked up by re-reading the stamp at most every refresh_seconds. No lock is
+    taken: in async mode loads interleave on one thread, and a duplicate load
+    is harmless."""
+
+    def __init__(self, refresh_seconds: float = REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self._snapshot = None
+        self._checked_at = 0.0
+        self._generation = 0
+
+    def invalidate(self):
+        self._generation += 1
+        self._snapshot = None
+
+    def snapshot(self, db) -> ReferenceSnapshot:
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() - self._checked_at < self.refresh_seconds:
+            return snapshot
+
+        generation = self._generation
+        version = read_reference_stamp(db)
+        if snapshot is None or snapshot.version != version:
+            snapshot = load_reference_snapshot(db, version)
+        # A write committed while loading may not be in this snapshot.
+        if generation == self._generation:
+            self._snapshot = snapshot
+            self._checked_at = time.monotonic()
+        return snapshot
+
+
+reference_registry = ReferenceRegistry()
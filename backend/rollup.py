@@ -0,0 +1,168 @@
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Iterable, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, select, update
+
+try:
+    from .models import DailySummary, ImportWatermark, PlanItem, TaskStatus
+    from .plan_intervals import effective_between
+except ImportError:
+    from models import DailySummary, ImportWatermark, PlanItem, TaskStatus
+    from plan_intervals import effective_between
+
+# The rollup holds each day's effective plan (the carry-forward rule used by
+# /plan) up to a horizon recorded as an ImportWatermark row.
+WATERMARK_SOURCE = "daily_summary"
+INSERT_BATCH_SIZE = 5000
+
+
+def get_horizon(connection) -> Optional[date]:
+    return connection.execute(
+        select(ImportWatermark.last_date).where(ImportWatermark.source == WATERMARK_SOURCE)
+    ).scalar()
+
+
+def set_horizon(connection, horizon: date):
+    updated = connection.execute(
+        update(ImportWatermark)
+        .where(ImportWatermark.source == WATERMARK_SOURCE)
+        .values(last_date=horizon)
+    ).rowcount
+    if not updated:
+        connection.execute(
+            insert(ImportWatermark).values(source=WATERMARK_SOURCE, last_date=horizon, rows_imported=0)
+        )
+
+
+def load_plan_rows(connection, start: date, end: date, employee_ids=None):
+    """Plan rows that are effective between start and end: each employee's
+    plan on start plus every change inside the window."""
+    conditions = [effective_between(start, end)]
+    if employee_ids is not None:
+        conditions.append(PlanItem.employee_id.in_(employee_ids))
+    return connection.execute(
+        select(
+            PlanItem.employee_id,
+            PlanItem.date,
+            PlanItem.machine_group_id,
+            PlanItem.article_id,
+            PlanItem.goal,
+            PlanItem.quantity_done,
+            PlanItem.status,
+        ).where(*conditions)
+    ).all()
+
+
+def build_summary_rows(plan_rows, start: date, end: date):
+    rows_by_employee = defaultdict(lambda: defaultdict(list))
+    for row in plan_rows:
+        rows_by_employee[row.employee_id][row.date].append(row)
+
+    days = [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+    for employee_id, rows_by_date in rows_by_employee.items():
+        change_dates = sorted(rows_by_date)
+        position = 0
+        effective_date = None
+        for day in days:
+            while position < len(change_dates) and change_dates[position] <= day:
+                effective_date = change_dates[position]
+                position += 1
+            if effective_date is None:
+                continue
+
+            totals = {}
+            for row in rows_by_date[effective_date]:
+                if row.machine_group_id is None:
+                    continue
+                key = (row.machine_group_id, row.article_id)
+                summary = totals.setdefault(key, {
+                    "date": day,
+                    "employee_id": employee_id,
+                    "machine_group_id": row.machine_group_id,
+                    "article_id": row.article_id,
+                    "goal": 0,
+                    "quantity_done": 0,
+                    "item_count": 0,
+                    "planned_count": 0,
+                    "active_count": 0,
+                    "done_count": 0,
+                })
+                summary["goal"] += row.goal or 0
+                # Produced quantities are recorded on the item's own date, so they
+                # are only counted there and not repeated on carried-forward days.
+                if effective_date == day:
+                    summary["quantity_done"] += row.quantity_done or 0
+                summary["item_count"] += 1
+                if row.status == TaskStatus.PLANNED.value:
+                    summary["planned_count"] += 1
+                elif row.status == TaskStatus.ACTIVE.value:
+                    summary["active_count"] += 1
+                elif row.status == TaskStatus.DONE.value:
+                    summary["done_count"] += 1
+            yield from totals.values()
+
+
+def rebuild_range(connection, start: date, end: date, employee_ids=None):
+    if end < start:
+        return
+    conditions = [DailySummary.date >= start, DailySummary.date <= end]
+    if employee_ids is not None:
+        conditions.append(DailySummary.employee_id.in_(employee_ids))
+    connection.execute(delete(DailySummary).where(*conditions))
+
+    batch = []
+    for row in build_summary_rows(load_plan_rows(connection, start, end, employee_ids), start, end):
+        batch.append(row)
+        if len(batch) >= INSERT_BATCH_SIZE:
+            connection.execute(insert(DailySummary), batch)
+            batch = []
+    if batch:
+        connection.execute(insert(DailySummary), batch)
+
+
+def refresh_daily_summary(connection, keys: Iterable[Tuple[int, date]]):
+    """Recompute the rollup after writes to the given (employee_id, date) pairs.
+
+    Runs inside the caller's transaction; a change on a date carries forward,
+    so each touched employee is rebuilt from that date up to the horizon.
+    """
+    earliest = {}
+    for employee_id, day in keys:
+        if employee_id not in earliest or day < earliest[employee_id]:
+            earliest[employee_id] = day
+    horizon = get_horizon(connection)
+    if not earliest or horizon is None:
+        return
+
+    start = min(earliest.values())
+    if start <= horizon:
+        rebuild_range(connection, start, horizon, set(earliest))
+
+
+def refresh_daily_summary_range(connection, start: date):
+    """Recompute the rollup for every employee after a bulk change starting at `start`."""
+    horizon = get_horizon(connection)
+    if horizon is not None and start <= horizon:
+        rebuild_range(connection, start, horizon)
+
+
+def extend_daily_summary(connection, through: date):
+    """Materialize the rollup up to `through` if it is not already."""
+    horizon = get_horizon(connection)
+    if horizon is not None and horizon >= through:
+        return False
+    if horizon is None:
+        first_date = connection.execute(select(func.min(PlanItem.date))).scalar()
+        start = first_date or through
+    else:
+        start = horizon + timedelta(days=1)
+    rebuild_range(connection, start, through)
+    set_horizon(connection, through)
+    return True
+
+
+def rebuild_all(connection, through: date = None):
+    connection.execute(delete(DailySummary))
+    connection.execute(delete(ImportWatermark).where(ImportWatermark.source == WATERMARK_SOURCE))
+    extend_daily_summary(connection, through or date.today())
@@ -0,0 +1,64 @@
+import json
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import bindparam, func, insert, select, update
+
+try:
+    from .models import Article, Employee, MachineGroup
+except ImportError:
+    from models import Article, Employee, MachineGroup
+
+REFERENCE_DATA_PATH = (
+    Path(__file__).resolve().parent.parent / "frontend" / "src" / "data" / "initialData.json"
+)
+REFERENCE_TABLES = (
+    (Employee, "employees", ("id", "name", "number")),
+    (Article, "articles", ("id", "name")),
+    (MachineGroup, "machine_groups", ("id", "name")),
+)
+
+
+def repair_mojibake(value: Optional[str]) -> Optional[str]:
+    if value is None or "\u00c3" not in value:
+        return value
+
+    try:
+        return value.encode("latin1").decode("utf-8")
+    except (UnicodeEncodeError, UnicodeDecodeError):
+        return value
+
+
+def seed_reference_data(connection):
+    """Fill empty reference tables from the frontend's initialData.json."""
+    if not REFERENCE_DATA_PATH.exists():
+        return
+
+    with REFERENCE_DATA_PATH.open(encoding="utf-8") as handle:
+        reference_data = json.load(handle)
+
+    for model, key, columns in REFERENCE_TABLES:
+        if connection.execute(select(func.count()).select_from(model)).scalar():
+            continue
+        rows = [{column: row[column] for column in columns} for row in reference_data[key]]
+        if rows:
+            connection.execute(insert(model), rows)
+
+
+def repair_reference_names(connection):
+    for model, _key, _columns in REFERENCE_TABLES:
+        rows = connection.execute(
+            select(model.id, model.name).where(model.name.contains("\u00c3"))
+        ).all()
+        repaired = [
+            {"row_id": row_id, "repaired_name": repair_mojibake(name)}
+            for row_id, name in rows
+            if repair_mojibake(name) != name
+        ]
+        if repaired:
+            connection.execute(
+                update(model)
+                .where(model.id == bindparam("row_id"))
+                .values(name=bindparam("repaired_name")),
+                repaired,
+            )
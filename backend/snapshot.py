@@ -0,0 +1,204 @@
+import argparse
+import gzip
+import json
+import sys
+import time
+from datetime import datetime
+
+try:
+    from .compact import json_dumps, orjson
+    from .database import Base
+    from .harness import use_database
+    from .migrations import get_schema_version
+    from .plan_intervals import rebuild_plan_intervals
+    from .rollup import rebuild_all
+except ImportError:
+    from compact import json_dumps, orjson
+    from database import Base
+    from harness import use_database
+    from migrations import get_schema_version
+    from plan_intervals import rebuild_plan_intervals
+    from rollup import rebuild_all
+
+# A snapshot is NDJSON: a header line, then per table a {"table", "columns"}
+# line followed by one JSON array per row, then an "end" line with row counts
+# so a truncated file is rejected instead of half restored.
+SNAPSHOT_FORMAT = "planner-snapshot"
+SNAPSHOT_FORMAT_VERSION = 1
+BATCH_SIZE = 5000
+
+json_loads = orjson.loads if orjson is not None else json.loads
+
+
+def snapshot_tables():
+    """Model tables in foreign key order; schema_version and the stamp tables
+    belong to the target database and are not copied."""
+    return list(Base.metadata.sorted_tables)
+
+
+def open_snapshot(path: str, mode: str):
+    if path == "-":
+        return sys.stdout.buffer if "w" in mode else sys.stdin.buffer
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "b", compresslevel=6)
+    return open(path, mode + "b")
+
+
+def export_snapshot(connection, handle) -> dict:
+    """Stream every table to handle; memory use is bounded by BATCH_SIZE rows.
+
+    Pass a connection with no transaction open: the export runs in one read
+    transaction of its own, so a running backend's writes cannot land between
+    two tables."""
+    # The driver would otherwise run each SELECT in its own implicit read.
+    connection.exec_driver_sql("BEGIN")
+    try:
+        return write_tables(connection, handle)
+    finally:
+        connection.exec_driver_sql("ROLLBACK")
+
+
+def write_tables(connection, handle) -> dict:
+    counts = {}
+    handle.write(json_dumps({
+        "format": SNAPSHOT_FORMAT,
+        "version": SNAPSHOT_FORMAT_VERSION,
+        "schema_version": get_schema_version(connection),
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+    }) + b"\n")
+    for table in snapshot_tables():
+        # orjson only accepts exact str keys, not SQLAlchemy's quoted_name.
+        table_name = str(table.name)
+        columns = [str(column.name) for column in table.columns]
+        handle.write(json_dumps({"table": table_name, "columns": columns}) + b"\n")
+        # Raw rows keep SQLite's stored values (ISO dates), so nothing is re-encoded.
+        result = connection.exec_driver_sql(
+            f"SELECT {', '.join(columns)} FROM {table_name} ORDER BY id"
+        )
+        count = 0
+        while True:
+            rows = result.fetchmany(BATCH_SIZE)
+            if not rows:
+                break
+            handle.write(b"".join(json_dumps(list(row)) + b"\n" for row in rows))
+            count += len(rows)
+        counts[table_name] = count
+    handle.write(json_dumps({"end": counts}) + b"\n")
+    return counts
+
+
+def read_header(line: bytes, schema_version: int):
+    header = json_loads(line) if line else {}
+    if header.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError("Not a planner snapshot.")
+    if header.get("version") != SNAPSHOT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported snapshot format version {header.get('version')}.")
+    if header.get("schema_version", 0) > schema_version:
+        raise ValueError(
+            f"Snapshot is from schema version {header['schema_version']}, "
+            f"this database is at {schema_version}; upgrade the backend first."
+        )
+
+
+def restore_snapshot(connection, handle) -> dict:
+    """Replace the contents of every table with the snapshot in handle.
+
+    Run it inside one transaction: any error, including a truncated file,
+    leaves the database as it was. Snapshots from an older schema are accepted;
+    columns and tables they lack are rebuilt afterwards."""
+    tables = {str(table.name): table for table in snapshot_tables()}
+    read_header(handle.readline(), get_schema_version(connection))
+
+    for table in reversed(list(tables.values())):
+        connection.exec_driver_sql(f"DELETE FROM {table.name}")
+
+    counts, restored_columns = {}, {}
+    statement, batch, table_name, footer = None, [], None, None
+
+    def flush():
+        if batch:
+            connection.exec_driver_sql(statement, batch)
+            counts[table_name] += len(batch)
+            batch.clear()
+
+    for line in handle:
+        value = json_loads(line)
+        if isinstance(value, list):
+            if statement is None:
+                raise ValueError("Snapshot row before any table header.")
+            batch.append(tuple(value))
+            if len(batch) >= BATCH_SIZE:
+                flush()
+            continue
+
+        flush()
+        if "end" in value:
+            footer = value["end"]
+            break
+        table_name, columns = value["table"], value["columns"]
+        table = tables.get(table_name)
+        if table is None:
+            raise ValueError(f"Snapshot table {table_name} does not exist in this database.")
+        unknown = set(columns) - set(table.columns.keys())
+        if unknown:
+            raise ValueError(f"Snapshot columns {sorted(unknown)} do not exist in {table_name}.")
+        statement = (
+            f"INSERT INTO {table_name} ({', '.join(columns)}) "
+            f"VALUES ({', '.join('?' for _ in columns)})"
+        )
+        counts[table_name] = 0
+        restored_columns[table_name] = set(columns)
+
+    if footer is None:
+        raise ValueError("Snapshot is truncated: no end marker.")
+    if footer != counts:
+        raise ValueError(f"Snapshot row counts {footer} do not match the rows read {counts}.")
+
+    if "valid_to" not in restored_columns.get("plan_items", ()):
+        rebuild_plan_intervals(connection)
+    if "daily_summary" not in restored_columns:
+        rebuild_all(connection)
+    return counts
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Export the whole planner database to NDJSON, or restore it from an export.",
+    )
+    parser.add_argument("command", choices=("export", "restore"))
+    parser.add_argument("database", help="SQLite file to export from or restore into")
+    parser.add_argument("snapshot", help="NDJSON file (gzip-compressed when it ends in .gz, - for stdio)")
+    parser.add_argument("--force", action="store_true",
+                        help="restore even if the database already has plan items")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    use_database(args.database)
+
+    from backend.database import engine
+    from backend.main import initialize_database
+
+    initialize_database()
+    started = time.perf_counter()
+    if args.command == "export":
+        with engine.connect() as connection, open_snapshot(args.snapshot, "w") as handle:
+            counts = export_snapshot(connection, handle)
+        action = "Exported"
+    else:
+        with engine.begin() as connection, open_snapshot(args.snapshot, "r") as handle:
+            has_plans = connection.exec_driver_sql("SELECT 1 FROM plan_items LIMIT 1").first()
+            if has_plans and not args.force:
+                sys.exit(f"{args.database} already has plan items; pass --force to replace them.")
+            try:
+                counts = restore_snapshot(connection, handle)
+            except ValueError as error:
+                sys.exit(f"Restore failed, database unchanged: {error}")
+        action = "Restored"
+    summary = ", ".join(f"{count} {table}" for table, count in counts.items())
+    print(f"{action} {summary} in {time.perf_counter() - started:.1f} s.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import hashlib
+import os
+from datetime import date
+from pathlib import Path
+
+try:
+    from .models import ImportWatermark
+except ImportError:
+    from models import ImportWatermark
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_CSV_PATH = ROOT_DIR / "Stämplingslogg-2026-01-15.csv"
+DATE_COLUMN = "Datum"
+EMPLOYEE_NUMBER_COLUMN = "Anställningsnummer"
+EMPLOYEE_NAME_COLUMN = "Namn"
+ARTICLE_DESCRIPTION_COLUMN = "Artikelbenämning"
+PRODUCTION_GROUP_COLUMN = "Produktionsgrupp"
+QUANTITY_COLUMN = "Antal"
+HOURS_COLUMN = "Tid"
+OPERATION_COLUMN = "Operationsbenämning"
+CHUNK_SIZE = int(os.environ.get("PLANNER_IMPORT_CHUNK_SIZE", 50000))
+
+
+def resolve_csv_path():
+    csv_path = Path(os.environ.get("PLANNER_IMPORT_CSV", DEFAULT_CSV_PATH))
+    if not csv_path.is_absolute():
+        csv_path = ROOT_DIR / csv_path
+    return csv_path
+
+
+def hash_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for block in iter(lambda: handle.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def iter_log_chunks(source, columns, since: date = None, chunk_size: int = CHUNK_SIZE):
+    """Yield DataFrame chunks of the log, limited to `columns` and rows dated >= `since`.
+
+    `source` is a path or binary file object. Only one chunk is held in memory
+    at a time, whatever the file size.
+    """
+    import pandas as pd
+
+    columns = list(dict.fromkeys([DATE_COLUMN, *columns]))
+    reader = pd.read_csv(
+        source,
+        encoding="utf-8-sig",
+        dtype=str,
+        usecols=columns,
+        chunksize=chunk_size,
+    )
+    for chunk in reader:
+        if since is not None:
+            # Datum is ISO formatted, so string comparison orders correctly.
+            chunk = chunk[chunk[DATE_COLUMN] >= since.isoformat()]
+        if not chunk.empty:
+            yield chunk
+
+
+def parse_decimal(series):
+    """Convert Swedish decimal strings ("28,00") to floats, treating blanks as 0."""
+    import pandas as pd
+
+    return pd.to_numeric(series.str.replace(",", ".", regex=False), errors="coerce").fillna(0.0)
+
+
+def get_watermark(db, source: str):
+    return db.query(ImportWatermark).filter(ImportWatermark.source == source).first()
+
+
+def save_watermark(db, source: str, file_hash: str, last_date, rows_imported: int):
+    watermark = get_watermark(db, source)
+    if watermark is None:
+        watermark = ImportWatermark(source=source, rows_imported=0)
+        db.add(watermark)
+    watermark.file_hash = file_hash
+    if last_date is not None and (watermark.last_date is None or last_date > watermark.last_date):
+        watermark.last_date = last_date
+    watermark.rows_imported = (watermark.rows_imported or 0) + rows_imported
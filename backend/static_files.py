@@ -0,0 +1,169 @@
+import gzip
+import logging
+import mimetypes
+import os
+import re
+import sys
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional
+
+try:
+    import brotli  # listed in requirements.txt; without it only .br files already on disk are sent
+except ImportError:
+    brotli = None
+
+try:
+    from .cache import make_etag
+except ImportError:
+    from cache import make_etag
+
+MEMORY_LIMIT_BYTES = int(os.environ.get("PLANNER_STATIC_MEMORY_LIMIT_BYTES", 256 * 1024))
+COMPRESS_MIN_BYTES = 1024
+COMPRESSIBLE_SUFFIXES = {
+    ".html", ".js", ".mjs", ".css", ".json", ".webmanifest", ".svg", ".txt", ".map", ".xml", ".ico",
+}
+# Vite writes content-hashed names such as assets/index-D3x9a_Qk.js.
+HASHED_ASSET_PATTERN = re.compile(r"^assets/.+-[A-Za-z0-9_-]{8,}\.[A-Za-z0-9]+$")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+ENCODING_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+logger = logging.getLogger("planner.static")
+
+mimetypes.add_type("application/manifest+json", ".webmanifest")
+mimetypes.add_type("text/javascript", ".mjs")
+
+
+class Variant(NamedTuple):
+    etag: str
+    size: int
+    body: Optional[bytes]
+    path: Optional[Path]
+
+
+class StaticAsset(NamedTuple):
+    media_type: str
+    cache_control: str
+    variants: Dict[str, Variant]
+
+
+def compress(encoding: str, body: bytes, thorough: bool = False) -> Optional[bytes]:
+    # Startup favours speed; write_precompressed() spends the time once at build.
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=9 if thorough else 6, mtime=0)
+    if encoding == "br" and brotli is not None:
+        return brotli.compress(body, quality=11 if thorough else 5)
+    return None
+
+
+def make_variant(body: bytes, encoding: str, path: Optional[Path]) -> Variant:
+    etag = make_etag(body)
+    if encoding != "identity":
+        # Each encoding is a different representation, so it needs its own ETag.
+        etag = f'{etag[:-1]}-{encoding}"'
+    keep = body if path is None or len(body) <= MEMORY_LIMIT_BYTES else None
+    return Variant(etag=etag, size=len(body), body=keep, path=path)
+
+
+def build_asset(dist_dir: Path, path: Path, thorough: bool = False) -> StaticAsset:
+    relative_path = path.relative_to(dist_dir).as_posix()
+    body = path.read_bytes()
+    variants = {"identity": make_variant(body, "identity", path)}
+
+    if path.suffix in COMPRESSIBLE_SUFFIXES and len(body) >= COMPRESS_MIN_BYTES:
+        for encoding, suffix in ENCODING_SUFFIXES.items():
+            precompressed = path.with_name(path.name + suffix)
+            if precompressed.is_file() and not thorough:
+                variants[encoding] = make_variant(precompressed.read_bytes(), encoding, precompressed)
+                continue
+            compressed = compress(encoding, body, thorough)
+            if compressed is not None and len(compressed) < len(body):
+                variants[encoding] = make_variant(compressed, encoding, None)
+
+    media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+    immutable = HASHED_ASSET_PATTERN.match(relative_path) is not None
+    return StaticAsset(
+        media_type=media_type,
+        cache_control=IMMUTABLE_CACHE_CONTROL if immutable else REVALIDATE_CACHE_CONTROL,
+        variants=variants,
+    )
+
+
+def build_manifest(dist_dir: Path, thorough: bool = False) -> Dict[str, StaticAsset]:
+    """Map every file under dist_dir (by relative path) to its served variants."""
+    manifest = {}
+    for path in sorted(dist_dir.rglob("*")):
+        if not path.is_file() or path.suffix in (".br", ".gz"):
+            continue
+        manifest[path.relative_to(dist_dir).as_posix()] = build_asset(dist_dir, path, thorough)
+    return manifest
+
+
+def accepted_encodings(accept_encoding: Optional[str]) -> set:
+    accepted = set()
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        quality = params.strip()
+        if quality.startswith("q="):
+            try:
+                if float(quality[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        if name:
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+def choose_variant(asset: StaticAsset, accept_encoding: Optional[str]):
+    accepted = accepted_encodings(accept_encoding)
+    for encoding in ("br", "gzip"):
+        if encoding in asset.variants and (encoding in accepted or "*" in accepted):
+            return encoding, asset.variants[encoding]
+    return "identity", asset.variants["identity"]
+
+
+class StaticSite:
+    """Asset manifest for the built frontend, loaded once at startup."""
+
+    def __init__(self, dist_dir: Path):
+        self.dist_dir = dist_dir
+        self._manifest = None
+
+    def load(self):
+        self._manifest = build_manifest(self.dist_dir) if self.dist_dir.is_dir() else {}
+        # Files that got a gzip variant would have had a brotli one too.
+        without_brotli = sum(
+            1 for asset in self._manifest.values() if "gzip" in asset.variants and "br" not in asset.variants
+        )
+        if brotli is None and without_brotli:
+            logger.warning(
+                "brotli is not installed: %d static files are served without a br variant "
+                "(python -m pip install -r backend/requirements.txt)",
+                without_brotli,
+            )
+
+    def get(self, relative_path: str) -> Optional[StaticAsset]:
+        if self._manifest is None:
+            self.load()
+        return self._manifest.get(relative_path)
+
+
+def write_precompressed(dist_dir: Path):
+    """Write .gz (and .br when brotli is installed) next to compressible files."""
+    written = 0
+    for relative_path, asset in build_manifest(dist_dir, thorough=True).items():
+        source = dist_dir / relative_path
+        for encoding, suffix in ENCODING_SUFFIXES.items():
+            variant = asset.variants.get(encoding)
+            if variant is not None and variant.path is None:
+                source.with_name(source.name + suffix).write_bytes(variant.body)
+                written += 1
+    return written
+
+
+if __name__ == "__main__":
+    target = Path(sys.argv[1]) if len(sys.argv) > 1 else (
+        Path(__file__).resolve().parent.parent / "frontend" / "dist"
+    )
+    print(f"Wrote {write_precompressed(target)} precompressed files to {target}")
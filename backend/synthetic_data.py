@@ -0,0 +1,175 @@
+import argparse
+import random
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import func, insert, select
+
+try:
+    from .constants import SPECIAL_MACHINE_GROUP_NAMES, SPECIFIC_ARTICLES, SPECIFIC_GROUPS
+    from .harness import use_database
+    from .models import Article, DefaultGoal, Employee, MachineGroup, PlanItem, TaskStatus
+    from .plan_intervals import rebuild_plan_intervals
+    from .rollup import rebuild_all
+except ImportError:
+    from constants import SPECIAL_MACHINE_GROUP_NAMES, SPECIFIC_ARTICLES, SPECIFIC_GROUPS
+    from harness import use_database
+    from models import Article, DefaultGoal, Employee, MachineGroup, PlanItem, TaskStatus
+    from plan_intervals import rebuild_plan_intervals
+    from rollup import rebuild_all
+
+INSERT_BATCH_SIZE = 20000
+
+
+def ensure_reference_names(connection, model, names):
+    existing = set(connection.execute(select(model.name)).scalars())
+    missing = [{"name": name} for name in names if name not in existing]
+    if missing:
+        connection.execute(insert(model), missing)
+    return dict(connection.execute(select(model.name, model.id)).all())
+
+
+def ensure_employees(connection, count: int):
+    existing = connection.execute(select(func.count()).select_from(Employee)).scalar()
+    missing = [
+        {"number": f"S{index:05d}", "name": f"Syntetisk {index}"}
+        for index in range(existing, count)
+    ]
+    if missing:
+        connection.execute(insert(Employee), missing)
+    return list(connection.execute(select(Employee.id).order_by(Employee.id)).scalars())
+
+
+def generate(
+    connection,
+    employees: int = 500,
+    years: int = 3,
+    change_rate: float = 0.3,
+    seed: int = 0,
+    end: date = None,
+) -> dict:
+    """Fill the database with a reproducible factory-scale plan history.
+
+    Every employee gets a plan on the first day; afterwards each employee's
+    plan changes on a weekday with probability change_rate and carries
+    forward otherwise, like the planners use it."""
+    rng = random.Random(seed)
+    end = end or date.today()
+    start = end - timedelta(days=365 * years)
+
+    article_ids = list(ensure_reference_names(connection, Article, SPECIFIC_ARTICLES).values())
+    group_ids_by_name = ensure_reference_names(connection, MachineGroup, SPECIFIC_GROUPS)
+    production_group_ids = [
+        group_id for name, group_id in group_ids_by_name.items() if name not in SPECIAL_MACHINE_GROUP_NAMES
+    ]
+    absence_group_ids = [
+        group_id for name, group_id in group_ids_by_name.items() if name in SPECIAL_MACHINE_GROUP_NAMES
+    ]
+    employee_ids = ensure_employees(connection, employees)
+
+    default_goals = {
+        (article_id, group_id): rng.randint(20, 200)
+        for article_id in article_ids
+        for group_id in production_group_ids
+    }
+    existing_goals = set(
+        connection.execute(select(DefaultGoal.article_id, DefaultGoal.machine_group_id)).all()
+    )
+    new_goals = [
+        {"article_id": article_id, "machine_group_id": group_id, "goal": goal}
+        for (article_id, group_id), goal in default_goals.items()
+        if (article_id, group_id) not in existing_goals
+    ]
+    if new_goals:
+        connection.execute(insert(DefaultGoal), new_goals)
+
+    statuses = [status.value for status in TaskStatus]
+    plan_items = 0
+    batch = []
+
+    def flush():
+        nonlocal plan_items
+        if batch:
+            connection.execute(insert(PlanItem), batch)
+            plan_items += len(batch)
+            batch.clear()
+
+    for offset in range((end - start).days + 1):
+        day = start + timedelta(days=offset)
+        if offset and day.weekday() >= 5:
+            continue
+        for employee_id in employee_ids:
+            if offset and rng.random() > change_rate:
+                continue
+            if absence_group_ids and rng.random() < 0.03:
+                batch.append({
+                    "date": day,
+                    "employee_id": employee_id,
+                    "article_id": None,
+                    "machine_group_id": rng.choice(absence_group_ids),
+                    "goal": 0,
+                    "quantity_done": 0,
+                    "status": TaskStatus.ACTIVE.value,
+                })
+                continue
+            for _ in range(rng.randint(1, 3)):
+                article_id = rng.choice(article_ids)
+                group_id = rng.choice(production_group_ids)
+                goal = default_goals[(article_id, group_id)]
+                batch.append({
+                    "date": day,
+                    "employee_id": employee_id,
+                    "article_id": article_id,
+                    "machine_group_id": group_id,
+                    "goal": goal,
+                    "quantity_done": rng.randint(0, goal) if day < end else 0,
+                    "status": rng.choice(statuses),
+                })
+        if len(batch) >= INSERT_BATCH_SIZE:
+            flush()
+    flush()
+
+    rebuild_plan_intervals(connection)
+    rebuild_all(connection, end)
+    return {
+        "employees": len(employee_ids),
+        "articles": len(article_ids),
+        "machine_groups": len(group_ids_by_name),
+        "plan_items": plan_items,
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Fill a planner database with synthetic factory-scale plan history.",
+    )
+    parser.add_argument("database", help="SQLite file to create or extend")
+    parser.add_argument("--employees", type=int, default=500)
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--change-rate", type=float, default=0.3,
+                        help="probability that an employee's plan changes on a weekday")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    use_database(args.database)
+
+    from backend.database import engine
+    from backend.main import initialize_database
+
+    initialize_database()
+    started = time.perf_counter()
+    with engine.begin() as connection:
+        summary = generate(connection, args.employees, args.years, args.change_rate, args.seed)
+    print(
+        f"Generated {summary['plan_items']} plan items for {summary['employees']} employees "
+        f"from {summary['start']} to {summary['end']} in {time.perf_counter() - started:.1f} s."
+    )
+
+
+if __name__ == "__main__":
+    main()
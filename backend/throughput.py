@@ -0,0 +1,247 @@
+import os
+import re
+from datetime import date
+from typing import Optional
+
+from sqlalchemy import and_, delete, func, insert, literal, null, or_, select, tuple_, update
+
+try:
+    from .constants import SPECIFIC_GROUPS
+    from .models import Article, Employee, MachineGroup, ThroughputDay, ThroughputRate
+    from .stamplingslogg import (
+        ARTICLE_DESCRIPTION_COLUMN,
+        DATE_COLUMN,
+        EMPLOYEE_NUMBER_COLUMN,
+        HOURS_COLUMN,
+        OPERATION_COLUMN,
+        QUANTITY_COLUMN,
+        parse_decimal,
+    )
+except ImportError:
+    from constants import SPECIFIC_GROUPS
+    from models import Article, Employee, MachineGroup, ThroughputDay, ThroughputRate
+    from stamplingslogg import (
+        ARTICLE_DESCRIPTION_COLUMN,
+        DATE_COLUMN,
+        EMPLOYEE_NUMBER_COLUMN,
+        HOURS_COLUMN,
+        OPERATION_COLUMN,
+        QUANTITY_COLUMN,
+        parse_decimal,
+    )
+
+THROUGHPUT_COLUMNS = [
+    EMPLOYEE_NUMBER_COLUMN, ARTICLE_DESCRIPTION_COLUMN, OPERATION_COLUMN, QUANTITY_COLUMN, HOURS_COLUMN,
+]
+# Checked in order: "VW Slutkontroll/Packning" is final inspection, and
+# "Vävskärning / Injicering" is cut for and booked on the injection press.
+OPERATION_GROUP_PATTERNS = [
+    ("Slutkontroll", re.compile(r"SLUTKONTROLL")),
+    ("Packning", re.compile(r"PACKNING")),
+    ("Lackering", re.compile(r"LACKERING")),
+    ("Slipning", re.compile(r"SLIPNING")),
+    ("Fräsning", re.compile(r"FRÄS")),
+    ("Limning", re.compile(r"LIMNING")),
+    ("Injicering", re.compile(r"INJICERING|^PRESS \d")),
+    ("Skärning", re.compile(r"SKÄRNING|TILLSKUREN")),
+]
+# Planned goals are per working day.
+SHIFT_HOURS = float(os.environ.get("PLANNER_SHIFT_HOURS", 8))
+# Below this many log rows an employee's own rate is too noisy to suggest.
+MIN_EMPLOYEE_SAMPLES = int(os.environ.get("PLANNER_MIN_EMPLOYEE_SAMPLES", 20))
+
+
+def match_machine_group_name(operation: str) -> Optional[str]:
+    """Map a log `Operationsbenämning` such as "Press 6" to a planner machine group."""
+    text = " ".join(operation.split()).upper()
+    for name, pattern in OPERATION_GROUP_PATTERNS:
+        if pattern.search(text):
+            return name if name in SPECIFIC_GROUPS else None
+    return None
+
+
+class ThroughputAggregator:
+    """Sums pieces, hours and log rows per (date, employee number, article,
+    machine group) over log chunks.
+
+    tap() passes the chunks through, so the actuals import reads the file once."""
+
+    def __init__(self, match_article_name):
+        self.match_article_name = match_article_name
+        self.first_date = None
+        self.last_date = None
+        self._article_lookup = {}
+        self._group_lookup = {}
+        self._partials = []
+
+    def tap(self, chunks):
+        for chunk in chunks:
+            self.add(chunk)
+            yield chunk
+
+    def add(self, chunk):
+        import pandas as pd
+
+        dates = chunk[DATE_COLUMN].dropna()
+        if not dates.empty:
+            first_date, last_date = dates.min(), dates.max()
+            if self.first_date is None or first_date < self.first_date:
+                self.first_date = first_date
+            if self.last_date is None or last_date > self.last_date:
+                self.last_date = last_date
+
+        chunk = chunk.dropna(subset=[ARTICLE_DESCRIPTION_COLUMN, OPERATION_COLUMN, DATE_COLUMN])
+        for description in chunk[ARTICLE_DESCRIPTION_COLUMN].unique():
+            if description not in self._article_lookup:
+                self._article_lookup[description] = self.match_article_name(description)
+        for operation in chunk[OPERATION_COLUMN].unique():
+            if operation not in self._group_lookup:
+                self._group_lookup[operation] = match_machine_group_name(operation)
+
+        frame = pd.DataFrame({
+            "date": chunk[DATE_COLUMN],
+            "number": chunk[EMPLOYEE_NUMBER_COLUMN].fillna("").str.strip(),
+            "article": chunk[ARTICLE_DESCRIPTION_COLUMN].map(self._article_lookup),
+            "group": chunk[OPERATION_COLUMN].map(self._group_lookup),
+            "quantity": parse_decimal(chunk[QUANTITY_COLUMN]),
+            "hours": parse_decimal(chunk[HOURS_COLUMN]),
+        }).dropna(subset=["article", "group"])
+        if not frame.empty:
+            self._partials.append(
+                frame.groupby(["date", "number", "article", "group"], sort=False).agg(
+                    quantity=("quantity", "sum"),
+                    hours=("hours", "sum"),
+                    samples=("quantity", "size"),
+                )
+            )
+
+    def totals(self):
+        import pandas as pd
+
+        if not self._partials:
+            return pd.DataFrame(columns=["quantity", "hours", "samples"])
+        return pd.concat(self._partials).groupby(level=[0, 1, 2, 3]).sum()
+
+
+def rate_rows(key_filter, per_employee: bool):
+    day = ThroughputDay
+    group_columns = [day.article_id, day.machine_group_id]
+    if per_employee:
+        group_columns.append(day.employee_id)
+    quantity, hours = func.sum(day.quantity), func.sum(day.hours)
+    query = select(
+        day.article_id,
+        day.machine_group_id,
+        day.employee_id if per_employee else null(),
+        quantity,
+        hours,
+        func.sum(day.samples),
+        # NULLIF leaves the rate empty rather than dividing by zero hours.
+        quantity / func.nullif(hours, literal(0.0)),
+    ).where(key_filter)
+    if per_employee:
+        query = query.where(day.employee_id.isnot(None))
+    return query.group_by(*group_columns)
+
+
+def refresh_throughput_rates(connection, keys):
+    """Recompute the rate rows of the given (article_id, machine_group_id) pairs in SQL."""
+    keys = list(keys)
+    if not keys:
+        return
+    columns = [
+        ThroughputRate.article_id,
+        ThroughputRate.machine_group_id,
+        ThroughputRate.employee_id,
+        ThroughputRate.quantity,
+        ThroughputRate.hours,
+        ThroughputRate.samples,
+        ThroughputRate.pieces_per_hour,
+    ]
+    # SQLite caps the number of bound parameters; two per key stays well under it.
+    for start in range(0, len(keys), 400):
+        batch = keys[start:start + 400]
+        connection.execute(delete(ThroughputRate).where(
+            tuple_(ThroughputRate.article_id, ThroughputRate.machine_group_id).in_(batch)
+        ))
+        key_filter = tuple_(ThroughputDay.article_id, ThroughputDay.machine_group_id).in_(batch)
+        for per_employee in (False, True):
+            connection.execute(
+                insert(ThroughputRate).from_select(columns, rate_rows(key_filter, per_employee))
+            )
+
+
+def apply_throughput(connection, aggregator: ThroughputAggregator) -> int:
+    """Replace throughput_daily for the days the import covered and refresh the
+    rates that changed; returns the daily rows written."""
+    if aggregator.first_date is None:
+        return 0
+    first_date = date.fromisoformat(aggregator.first_date)
+    last_date = date.fromisoformat(aggregator.last_date)
+    in_range = and_(ThroughputDay.date >= first_date, ThroughputDay.date <= last_date)
+
+    employee_ids = dict(connection.execute(select(Employee.number, Employee.id)).all())
+    article_ids = dict(connection.execute(select(Article.name, Article.id)).all())
+    group_ids = dict(connection.execute(select(MachineGroup.name, MachineGroup.id)).all())
+    rows = []
+    for (day, number, article_name, group_name), total in aggregator.totals().iterrows():
+        article_id, group_id = article_ids.get(article_name), group_ids.get(group_name)
+        if article_id is None or group_id is None:
+            continue
+        rows.append({
+            "date": date.fromisoformat(day),
+            "employee_id": employee_ids.get(number),
+            "article_id": article_id,
+            "machine_group_id": group_id,
+            "quantity": float(total["quantity"]),
+            "hours": float(total["hours"]),
+            "samples": int(total["samples"]),
+        })
+
+    # Rates of pairs that only had rows in the replaced days must change too.
+    keys = set(connection.execute(
+        select(ThroughputDay.article_id, ThroughputDay.machine_group_id).where(in_range).distinct()
+    ).all())
+    connection.execute(delete(ThroughputDay).where(in_range))
+    if rows:
+        connection.execute(insert(ThroughputDay), rows)
+    keys.update((row["article_id"], row["machine_group_id"]) for row in rows)
+    refresh_throughput_rates(connection, sorted(keys))
+    return len(rows)
+
+
+def forget_employee_throughput(connection, employee_id: int):
+    """Keep a deleted employee's pieces in the overall rates, but not their own rates."""
+    connection.execute(
+        update(ThroughputDay).where(ThroughputDay.employee_id == employee_id).values(employee_id=None)
+    )
+    connection.execute(delete(ThroughputRate).where(ThroughputRate.employee_id == employee_id))
+
+
+def suggest_goal(connection, article_id: int, machine_group_id: int, employee_id: int = None) -> dict:
+    """Suggested goal for one shift from the rate index; at most two indexed rows are read."""
+    rows = connection.execute(
+        select(
+            ThroughputRate.employee_id,
+            ThroughputRate.pieces_per_hour,
+            ThroughputRate.samples,
+            ThroughputRate.hours,
+        ).where(
+            ThroughputRate.article_id == article_id,
+            ThroughputRate.machine_group_id == machine_group_id,
+            or_(ThroughputRate.employee_id.is_(None), ThroughputRate.employee_id == employee_id),
+        )
+    ).all()
+    by_employee = {row.employee_id: row for row in rows}
+    basis, rate = "employee", by_employee.get(employee_id) if employee_id is not None else None
+    if rate is None or rate.samples < MIN_EMPLOYEE_SAMPLES or rate.pieces_per_hour is None:
+        basis, rate = "all", by_employee.get(None)
+    if rate is None or rate.pieces_per_hour is None:
+        return {"suggested_goal": None, "pieces_per_hour": None, "samples": 0, "hours": 0.0, "basis": None}
+    return {
+        "suggested_goal": int(round(rate.pieces_per_hour * SHIFT_HOURS)),
+        "pieces_per_hour": round(rate.pieces_per_hour, 2),
+        "samples": rate.samples,
+        "hours": round(rate.hours, 2),
+        "basis": basis,
+    }
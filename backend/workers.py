@@ -0,0 +1,82 @@
+import asyncio
+import logging
+import os
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+# uvicorn --workers N (or WEB_CONCURRENCY=N) starts N processes that share the
+# database but nothing in memory, so every process must learn about the other
+# processes' writes from the database itself.
+WORKERS = int(os.environ.get("PLANNER_WORKERS", os.environ.get("WEB_CONCURRENCY", 1)))
+MULTI_WORKER = WORKERS > 1
+CHANGE_POLL_SECONDS = float(os.environ.get("PLANNER_CHANGE_POLL_SECONDS", 1))
+
+# Triggers on every table a response is built from bump this counter (see
+# migrations.py). PRAGMA data_version is not used: it is per connection and
+# only counts other connections' commits, so pooled connections disagree.
+DATA_STAMP_TABLE = "data_stamp"
+DATA_STAMP_TABLE_NAMES = ("plan_items", "default_goals", "employees", "articles", "machine_groups")
+
+logger = logging.getLogger("planner.workers")
+
+
+def read_data_stamp(db) -> int:
+    return db.execute(text(f"SELECT version FROM {DATA_STAMP_TABLE} WHERE id = 1")).scalar() or 0
+
+
+@contextmanager
+def initialization_lock(database_path: Path, timeout: float = 300):
+    """Let one process at a time create tables, migrate and seed.
+
+    The lock is an exclusive transaction on a small side database, so it works
+    wherever SQLite does and is released if the holder dies."""
+    lock = sqlite3.connect(
+        str(database_path.with_name(database_path.name + ".init-lock")),
+        timeout=timeout,
+        isolation_level=None,
+    )
+    try:
+        lock.execute("BEGIN EXCLUSIVE")
+        yield
+    finally:
+        lock.close()
+
+
+class ChangeWatcher:
+    """Tells this worker's /events clients about writes it did not make:
+    other workers, imports, restores and the actuals CLI.
+
+    Local writes already publish their own event and note the stamp they
+    produced; any stamp beyond the last one seen is someone else's write and
+    becomes a resync event."""
+
+    def __init__(self, poll_seconds: float = CHANGE_POLL_SECONDS):
+        self.poll_seconds = poll_seconds
+        self._seen = None
+
+    def note(self, stamp: int):
+        if self._seen is None or stamp > self._seen:
+            self._seen = stamp
+
+    async def run(self, read_stamp, broker, resync_event: dict):
+        while True:
+            await asyncio.sleep(self.poll_seconds)
+            if not broker.client_count:
+                # Nobody to tell; start over when a client connects.
+                self._seen = None
+                continue
+            try:
+                stamp = await asyncio.to_thread(read_stamp)
+            except OperationalError as exc:
+                logger.warning("Could not read the data stamp: %s", exc)
+                continue
+            if self._seen is not None and stamp > self._seen:
+                broker.publish(resync_event)
+            self.note(stamp)
+
+
+change_watcher = ChangeWatcher()
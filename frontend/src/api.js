@@ -1,5 +1,6 @@
 import axios from 'axios';
 import {
+  applyMockPlanBatch,
   createMockEmployee,
   createMockPlanItem,
   deleteMockEmployee,
@@ -7,6 +8,7 @@ import {
   getMockData,
   getMockDefaultGoal,
   getMockPlan,
+  getMockPlanRange,
   updateMockPlanItem,
 } from './mockApi';
 
@@ -34,6 +36,10 @@ const apiWrapper = {
   get: async (url) => {
     if (useMock) {
       if (url === '/data') return getMockData();
+      if (url.startsWith('/plan/range')) {
+        const params = new URLSearchParams(url.split('?')[1]);
+        return getMockPlanRange(params.get('start'), params.get('days'));
+      }
       if (url.startsWith('/plan')) {
         const params = new URLSearchParams(url.split('?')[1]);
         const targetDate = params.get('target_date');
@@ -49,6 +55,7 @@ const apiWrapper = {
   post: async (url, data) => {
     if (useMock) {
       if (url === '/plan') return createMockPlanItem(data);
+      if (url === '/plan/batch') return applyMockPlanBatch(data);
       if (url === '/employees') return createMockEmployee(data);
     }
     return api.post(url, data);
@@ -75,5 +82,22 @@ const apiWrapper = {
   },
 };
 
+export const subscribeToChanges = (onChange) => {
+  if (useMock || typeof window.EventSource === 'undefined') {
+    return null;
+  }
+
+  const source = new window.EventSource(`${resolveApiBaseUrl()}/events`);
+  const handleEvent = (event) => onChange(event.type);
+  ['connected', 'plan_item', 'employee', 'resync'].forEach((type) => {
+    source.addEventListener(type, handleEvent);
+  });
+  source.onopen = () => onChange('open');
+  // EventSource reconnects by itself; this only reports that the stream is down.
+  source.onerror = () => onChange('error');
+
+  return () => source.close();
+};
+
 export const isMockMode = useMock;
 export default apiWrapper;
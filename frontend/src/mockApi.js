@@ -1,5 +1,5 @@
 import initialData from './data/initialData.json';
-import { todayLocalDate } from './dateUtils';
+import { addDays, formatLocalDate, todayLocalDate } from './dateUtils';
 
 if (!localStorage.getItem('planner_plan')) {
   localStorage.setItem('planner_plan', JSON.stringify([]));
@@ -95,6 +95,19 @@ export const getMockPlan = (targetDate) => {
   return Promise.resolve({ data: populatedPlan });
 };
 
+export const getMockPlanRange = async (start, days) => {
+  const startDate = start || todayLocalDate();
+  const dayCount = Number.parseInt(days, 10) || 7;
+  const planByDate = {};
+
+  for (let offset = 0; offset < dayCount; offset += 1) {
+    const targetDate = formatLocalDate(addDays(startDate, offset));
+    planByDate[targetDate] = (await getMockPlan(targetDate)).data;
+  }
+
+  return { data: planByDate };
+};
+
 export const createMockPlanItem = (item) => {
   let plan = JSON.parse(localStorage.getItem('planner_plan') || '[]');
 
@@ -182,8 +195,26 @@ export const deleteMockPlanItem = (id) => {
   return Promise.resolve({ data: { ok: true } });
 };
 
+// Same order as the backend: deletes, then updates, then creates.
+export const applyMockPlanBatch = async (batch) => {
+  const deleted = [];
+  for (const id of batch.delete || []) {
+    await deleteMockPlanItem(id);
+    deleted.push(id);
+  }
+  const updated = [];
+  for (const { id, ...updates } of batch.update || []) {
+    updated.push((await updateMockPlanItem(id, updates)).data);
+  }
+  const created = [];
+  for (const item of batch.create || []) {
+    created.push((await createMockPlanItem(item)).data);
+  }
+  return { data: { deleted, updated, created } };
+};
+
 export const getMockDefaultGoal = (articleId, machineGroupId) => {
   const goals = JSON.parse(localStorage.getItem('planner_default_goals') || '{}');
-  const goal = goals[`${articleId}-${machineGroupId}`] || 0;
+  const goal = goals[`${articleId}-${machineGroupId}`] ?? null;
   return Promise.resolve({ data: { goal } });
 };
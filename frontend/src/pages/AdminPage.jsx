@@ -1,4 +1,4 @@
-import { useCallback, useEffect, useState } from 'react';
+import { useCallback, useEffect, useRef, useState } from 'react';
 import { Link } from 'react-router-dom';
 import clsx from 'clsx';
 
@@ -6,6 +6,9 @@ import api, { isMockMode } from '../api';
 import ManagePersonnelModal from '../components/ManagePersonnelModal';
 import { addDays, formatLocalDate, parseLocalDate, todayLocalDate } from '../dateUtils';
 
+// Goal and comment edits made within this long of each other are saved in one batch.
+const SAVE_DELAY_MS = 500;
+
 function getWeek(dateValue) {
   const date = new Date(Date.UTC(
     dateValue.getFullYear(),
@@ -29,6 +32,8 @@ function AdminPage() {
   const [selectedArticle, setSelectedArticle] = useState('');
   const [goal, setGoal] = useState('0');
   const [comment, setComment] = useState('');
+  const pendingUpdates = useRef(new Map());
+  const saveTimeoutId = useRef(null);
 
   const fetchData = useCallback(async (targetDate) => {
     try {
@@ -45,10 +50,33 @@ function AdminPage() {
     }
   }, []);
 
+  // Sends the queued goal and comment edits in one /plan/batch request;
+  // resolves to whether there was anything to save.
+  const savePendingUpdates = useCallback(async () => {
+    window.clearTimeout(saveTimeoutId.current);
+    const updates = [...pendingUpdates.current].map(([id, changes]) => ({ id, ...changes }));
+    pendingUpdates.current.clear();
+    if (updates.length === 0) {
+      return false;
+    }
+
+    try {
+      await api.post('/plan/batch', { update: updates });
+    } catch (error) {
+      console.error('Kunde inte spara ändringar', error);
+    }
+    return true;
+  }, []);
+
   useEffect(() => {
     setLoading(true);
-    void fetchData(selectedDate);
-  }, [fetchData, selectedDate]);
+    // Edits made on the previous date are saved before the new date is shown.
+    void savePendingUpdates().then(() => fetchData(selectedDate));
+  }, [fetchData, savePendingUpdates, selectedDate]);
+
+  useEffect(() => () => {
+    void savePendingUpdates();
+  }, [savePendingUpdates]);
 
   useEffect(() => {
     if (!selectedGroup || !selectedArticle) {
@@ -68,11 +96,13 @@ function AdminPage() {
 
     const loadDefaultGoal = async () => {
       try {
+        const employeeParam = addingForEmployee ? `&employee_id=${addingForEmployee}` : '';
         const res = await api.get(
-          `/default-goal?article_id=${selectedArticle}&machine_group_id=${selectedGroup}`,
+          `/default-goal?article_id=${selectedArticle}&machine_group_id=${selectedGroup}${employeeParam}`,
         );
         if (!cancelled) {
-          setGoal(String(res.data.goal ?? 0));
+          // Fall back to the rate from the stamping log when no goal was saved yet.
+          setGoal(String(res.data.goal ?? res.data.suggested_goal ?? 0));
         }
       } catch (error) {
           console.error('Kunde inte hämta standardmål', error);
@@ -84,7 +114,7 @@ function AdminPage() {
     return () => {
       cancelled = true;
     };
-  }, [data.machine_groups, selectedArticle, selectedGroup]);
+  }, [addingForEmployee, data.machine_groups, selectedArticle, selectedGroup]);
 
   const startAdding = (employeeId) => {
     setAddingForEmployee(employeeId);
@@ -130,6 +160,7 @@ function AdminPage() {
     }
 
     try {
+      await savePendingUpdates();
       await api.post('/plan', {
         employee_id: addingForEmployee,
         article_id: isSpecialGroup ? null : articleId,
@@ -153,6 +184,7 @@ function AdminPage() {
     }
 
     try {
+      await savePendingUpdates();
       await api.post('/plan', {
         employee_id: task.employee.id,
         date: selectedDate,
@@ -167,21 +199,31 @@ function AdminPage() {
     }
   };
 
-  const updateGoal = async (id, newGoal) => {
-    try {
-      await api.put(`/plan/${id}`, { goal: newGoal });
-      await fetchData(selectedDate);
-    } catch (error) {
-      console.error('Kunde inte uppdatera mål', error);
-    }
+  const queueUpdate = (id, changes) => {
+    pendingUpdates.current.set(id, { ...pendingUpdates.current.get(id), ...changes });
+    window.clearTimeout(saveTimeoutId.current);
+    saveTimeoutId.current = window.setTimeout(async () => {
+      if (await savePendingUpdates()) {
+        await fetchData(selectedDate);
+      }
+    }, SAVE_DELAY_MS);
   };
 
-  const updateComment = async (id, newComment) => {
+  const copyPreviousWeek = async () => {
+    if (!window.confirm('Ersätt de kommande 7 dagarna med planen från veckan innan?')) {
+      return;
+    }
+
     try {
-      await api.put(`/plan/${id}`, { comment: newComment });
+      await savePendingUpdates();
+      await api.post('/plan/copy', {
+        source_start: formatLocalDate(addDays(selectedDate, -7)),
+        target_start: selectedDate,
+        days: 7,
+      });
       await fetchData(selectedDate);
     } catch (error) {
-      console.error('Kunde inte uppdatera kommentar', error);
+      console.error('Kunde inte kopiera plan', error);
     }
   };
 
@@ -226,6 +268,14 @@ function AdminPage() {
             >
               Personal
             </button>
+            {!isMockMode && (
+              <button
+                onClick={copyPreviousWeek}
+                className="rounded bg-gray-200 px-3 py-1.5 text-sm font-medium text-gray-700 hover:bg-gray-300"
+              >
+                Kopiera förra veckan
+              </button>
+            )}
             <div className="flex flex-col items-end">
               <div className="mb-1 text-sm font-bold text-gray-700">
                 {selectedDateObject.toLocaleDateString('sv-SE', { weekday: 'long' })} v.{getWeek(selectedDateObject)}
@@ -370,7 +420,7 @@ function AdminPage() {
                                   }
 
                                   if (parsedGoal !== task.goal) {
-                                    void updateGoal(task.id, parsedGoal);
+                                    queueUpdate(task.id, { goal: parsedGoal });
                                   }
                                 }}
                               />
@@ -388,7 +438,7 @@ function AdminPage() {
                           onBlur={(event) => {
                             const nextValue = event.target.value;
                             if (nextValue !== (task.comment || '')) {
-                              void updateComment(task.id, nextValue);
+                              queueUpdate(task.id, { comment: nextValue });
                             }
                           }}
                         />
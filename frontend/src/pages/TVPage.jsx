@@ -2,8 +2,12 @@ import { useEffect, useState } from 'react';
 import { Link } from 'react-router-dom';
 import clsx from 'clsx';
 
-import api, { isMockMode } from '../api';
-import { addDays, formatLocalDate, parseLocalDate, todayLocalDate } from '../dateUtils';
+import api, { isMockMode, subscribeToChanges } from '../api';
+import { parseLocalDate, todayLocalDate } from '../dateUtils';
+
+// Used until the event stream has delivered an event, and again while it is down.
+const FALLBACK_POLL_MS = 30000;
+const SAFETY_POLL_MS = 300000;
 
 function buildTaskSignature(items) {
   return [...items]
@@ -204,18 +208,13 @@ function TVPage() {
     const loadPlans = async () => {
       try {
         const today = todayLocalDate();
-        const dates = [];
-        for (let offset = 0; offset < 7; offset += 1) {
-          dates.push(formatLocalDate(addDays(today, offset)));
-        }
-
-        const [dataRes, ...planResponses] = await Promise.all([
+        const [dataRes, rangeRes] = await Promise.all([
           api.get('/data'),
-          ...dates.map(async (targetDate) => ({
-            date: targetDate,
-            items: (await api.get(`/plan?target_date=${targetDate}`)).data,
-          })),
+          api.get(`/plan/range?start=${today}&days=7`),
         ]);
+        const planResponses = Object.entries(rangeRes.data)
+          .map(([date, items]) => ({ date, items }))
+          .sort((left, right) => left.date.localeCompare(right.date));
 
         if (!isActive) {
           return;
@@ -234,14 +233,52 @@ function TVPage() {
       }
     };
 
+    let reloadTimeoutId = null;
+    const scheduleReload = () => {
+      window.clearTimeout(reloadTimeoutId);
+      reloadTimeoutId = window.setTimeout(() => {
+        void loadPlans();
+      }, 250);
+    };
+
+    let intervalId = null;
+    let pollInterval = null;
+    const pollEvery = (milliseconds) => {
+      if (milliseconds === pollInterval) {
+        return;
+      }
+      pollInterval = milliseconds;
+      window.clearInterval(intervalId);
+      intervalId = window.setInterval(() => {
+        void loadPlans();
+      }, milliseconds);
+    };
+
     void loadPlans();
-    const intervalId = window.setInterval(() => {
-      void loadPlans();
-    }, 30000);
+    pollEvery(FALLBACK_POLL_MS);
+    const unsubscribe = subscribeToChanges((type) => {
+      if (type === 'error') {
+        pollEvery(FALLBACK_POLL_MS);
+        return;
+      }
+      if (type === 'open') {
+        // Catch up on changes missed while disconnected. An open connection
+        // alone proves little: a buffering proxy may never pass events on.
+        scheduleReload();
+        return;
+      }
+      // Events arrive, so polling is only a safety net (e.g. the date rolling over).
+      pollEvery(SAFETY_POLL_MS);
+      if (type !== 'connected') {
+        scheduleReload();
+      }
+    });
 
     return () => {
       isActive = false;
+      window.clearTimeout(reloadTimeoutId);
       window.clearInterval(intervalId);
+      unsubscribe?.();
     };
   }, []);
 
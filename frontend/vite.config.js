@@ -43,6 +43,7 @@ export default defineConfig({
       '/plan': 'http://127.0.0.1:8000',
       '/default-goal': 'http://127.0.0.1:8000',
       '/employees': 'http://127.0.0.1:8000',
+      '/events': 'http://127.0.0.1:8000',
     },
   },
   preview: {